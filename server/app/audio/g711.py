@@ -0,0 +1,40 @@
+"""G.711 mu-law companding between PCM16 and 8-bit codes, via lookup tables."""
+
+import numpy as np
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 32635
+
+
+def _build_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + MULAW_BIAS) << exponent) - MULAW_BIAS
+    return np.where(codes & 0x80, -magnitude, magnitude).astype("<i2")
+
+
+def _build_encode_table() -> np.ndarray:
+    # Indexed by the PCM16 sample reinterpreted as uint16, so encoding is a single gather
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + MULAW_BIAS
+    # Position of the highest set bit above bit 7 selects the segment
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+MULAW_DECODE_TABLE = _build_decode_table()
+MULAW_ENCODE_TABLE = _build_encode_table()
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    """Encodes little-endian PCM16 audio to mu-law, one byte per sample."""
+    samples = np.frombuffer(pcm, dtype="<u2", count=len(pcm) // 2)
+    return MULAW_ENCODE_TABLE[samples].tobytes()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    """Decodes mu-law audio to little-endian PCM16."""
+    return MULAW_DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)].tobytes()
@@ -0,0 +1,225 @@
+"""Sampled per-call audio quality metrics: level, clipping, silence and SNR."""
+
+import base64
+import binascii
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+# Levels are measured over 10 ms blocks and kept in a 1 dB histogram from -100 to 0 dBFS
+BLOCK_MS = 10
+HISTOGRAM_FLOOR_DBFS = -100
+# Samples at or above this magnitude (about -0.2 dBFS) count as clipped; mu-law peaks at 32124
+CLIP_THRESHOLD = 32000
+# Blocks with an RMS of at most one LSB (about -90 dBFS) are digital silence, not line noise
+DIGITAL_SILENCE_ENERGY = 1.0
+# Noise floor and speech level percentiles of the block levels, for the SNR estimate
+NOISE_PERCENTILE = 0.1
+SPEECH_PERCENTILE = 0.95
+
+Audio = Union[bytes, bytearray, memoryview, str]
+
+
+class AudioStreamStats:
+    """
+    Level statistics for one direction of a call, in constant memory.
+
+    Each analyzed frame is split into 10 ms blocks whose levels go into a
+    1 dB histogram; the silence ratio, active level and SNR estimate (speech
+    percentile minus noise-floor percentile) are read from it at the end.
+    Digitally silent blocks (zeros, or frames the sender marks silent) count
+    towards the silence ratio only: they carry no line noise, and in the
+    histogram they would pull the noise-floor percentile down to the floor.
+    """
+
+    __slots__ = (
+        "sample_rate",
+        "silence_dbfs",
+        "frames",
+        "frames_analyzed",
+        "samples",
+        "clipped",
+        "peak",
+        "active_energy",
+        "active_blocks",
+        "silent_blocks",
+        "_block",
+        "_histogram",
+    )
+
+    def __init__(self, sample_rate: int, silence_dbfs: float):
+        self.sample_rate = sample_rate
+        self.silence_dbfs = silence_dbfs
+        self.frames = 0
+        self.frames_analyzed = 0
+        self.samples = 0
+        self.clipped = 0
+        self.peak = 0
+        self.active_energy = 0.0
+        self.active_blocks = 0
+        self.silent_blocks = 0
+        self._block = sample_rate * BLOCK_MS // 1000
+        self._histogram = np.zeros(-HISTOGRAM_FLOOR_DBFS, dtype=np.int64)
+
+    def analyze(self, audio: Audio, silent: bool = False) -> None:
+        """
+        Adds one frame of PCM16 audio (raw or base64) to the statistics.
+
+        Args:
+            audio: The frame's samples
+            silent: The sender marked the frame silent, e.g. ACS ``silent``
+        """
+        if isinstance(audio, str):
+            try:
+                audio = base64.b64decode(audio)
+            except binascii.Error:
+                return
+        samples = np.frombuffer(audio, dtype="<i2", count=len(audio) // 2)
+        if samples.size == 0:
+            return
+        self.frames_analyzed += 1
+        self.samples += samples.size
+        if silent:
+            self.silent_blocks += -(-samples.size // self._block)
+            return
+        magnitude = np.abs(samples.astype(np.int32))
+        self.clipped += int(np.count_nonzero(magnitude >= CLIP_THRESHOLD))
+        self.peak = max(self.peak, int(magnitude.max()))
+
+        # Mean-square level per 10 ms block; a short tail is its own block
+        squares = np.square(samples, dtype=np.float64)
+        whole = samples.size // self._block * self._block
+        energies = squares[:whole].reshape(-1, self._block).mean(axis=1)
+        if whole < samples.size:
+            energies = np.append(energies, squares[whole:].mean())
+        digital_silence = energies <= DIGITAL_SILENCE_ENERGY
+        if digital_silence.any():
+            self.silent_blocks += int(np.count_nonzero(digital_silence))
+            energies = energies[~digital_silence]
+        levels = 10.0 * np.log10(energies / (32768.0 * 32768.0) + 1e-12)
+        bins = np.clip(
+            np.floor(levels).astype(np.int64) - HISTOGRAM_FLOOR_DBFS,
+            0,
+            self._histogram.size - 1,
+        )
+        self._histogram += np.bincount(bins, minlength=self._histogram.size)
+        active = levels >= self.silence_dbfs
+        self.active_blocks += int(np.count_nonzero(active))
+        self.active_energy += float(energies[active].sum())
+
+    def _percentile_dbfs(self, fraction: float) -> float:
+        cumulative = np.cumsum(self._histogram)
+        index = int(np.searchsorted(cumulative, fraction * cumulative[-1]))
+        return float(index + HISTOGRAM_FLOOR_DBFS)
+
+    def summary(self) -> Dict[str, Any]:
+        """Rounded figures for the conversation log."""
+        blocks = int(self._histogram.sum())
+        total_blocks = blocks + self.silent_blocks
+        result: Dict[str, Any] = {
+            "frames": self.frames,
+            "frames_analyzed": self.frames_analyzed,
+        }
+        if not total_blocks:
+            return result
+        result.update(
+            {
+                "level_dbfs": round(
+                    10.0
+                    * np.log10(
+                        self.active_energy / self.active_blocks / (32768.0 * 32768.0)
+                    ),
+                    1,
+                )
+                if self.active_blocks
+                else None,
+                "peak_dbfs": round(20.0 * np.log10(max(self.peak, 1) / 32768.0), 1),
+                "clipping_ratio": round(self.clipped / self.samples, 5),
+                "silence_ratio": round(1.0 - self.active_blocks / total_blocks, 3),
+                "snr_db": round(
+                    self._percentile_dbfs(SPEECH_PERCENTILE)
+                    - self._percentile_dbfs(NOISE_PERCENTILE),
+                    1,
+                )
+                if blocks
+                else None,
+            }
+        )
+        return result
+
+
+class AudioQualityMeter:
+    """
+    Caller and assistant audio statistics for one call.
+
+    Only every ``sample_every``-th frame per direction is analyzed, so the
+    cost on the media path is a counter increment for the rest; base64
+    frames are decoded only when analyzed.
+    """
+
+    __slots__ = ("sample_every", "caller", "assistant")
+
+    def __init__(
+        self,
+        sample_every: int = 5,
+        caller_sample_rate: int = 24000,
+        assistant_sample_rate: int = 24000,
+        silence_dbfs: float = -50.0,
+    ):
+        self.sample_every = sample_every
+        self.caller = AudioStreamStats(caller_sample_rate, silence_dbfs)
+        self.assistant = AudioStreamStats(assistant_sample_rate, silence_dbfs)
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], caller_sample_rate: int = 24000
+    ) -> Optional["AudioQualityMeter"]:
+        """
+        Build a meter from ``AUDIO_QUALITY_*`` settings.
+
+        Args:
+            config: Application config mapping
+            caller_sample_rate: Sample rate of the caller audio as received
+
+        Returns:
+            An ``AudioQualityMeter``, or None when AUDIO_QUALITY_SAMPLE_EVERY is 0
+        """
+        sample_every = int(config.get("AUDIO_QUALITY_SAMPLE_EVERY", 5))
+        if sample_every <= 0:
+            return None
+        return cls(
+            sample_every=sample_every,
+            caller_sample_rate=caller_sample_rate,
+            silence_dbfs=float(config.get("AUDIO_QUALITY_SILENCE_DBFS", -50.0)),
+        )
+
+    def set_caller_sample_rate(self, sample_rate: int) -> None:
+        """Sets the caller audio rate once the route is known, before any caller audio."""
+        self.caller = AudioStreamStats(sample_rate, self.caller.silence_dbfs)
+
+    def caller_audio(self, audio: Audio, silent: bool = False) -> None:
+        """Counts a caller frame, analyzing it if it is sampled; ``silent`` as marked by ACS."""
+        stats = self.caller
+        stats.frames += 1
+        if stats.frames % self.sample_every == 0:
+            stats.analyze(audio, silent)
+
+    def assistant_audio(self, audio: Audio) -> None:
+        """Counts an assistant frame, analyzing it if it is sampled."""
+        stats = self.assistant
+        stats.frames += 1
+        if stats.frames % self.sample_every == 0:
+            stats.analyze(audio)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-direction summaries for the conversation log."""
+        caller = self.caller.summary()
+        assistant = self.assistant.summary()
+        # Output has no meaningful noise floor; silence is the gaps between responses
+        assistant.pop("snr_db", None)
+        assistant.pop("silence_ratio", None)
+        return {
+            "sample_every": self.sample_every,
+            "caller": caller,
+            "assistant": assistant,
+        }
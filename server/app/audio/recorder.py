@@ -0,0 +1,405 @@
+"""Per-call stereo recordings (caller left, assistant right) written off the event loop."""
+
+import base64
+import binascii
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from app.monitoring.metrics import TimingStats
+
+logger = logging.getLogger(__name__)
+
+# Voice Live rate; caller audio is recorded after the inbound resampler
+RECORDING_SAMPLE_RATE = 24000
+CHANNEL_CALLER = 0
+CHANNEL_ASSISTANT = 1
+# Stereo PCM16
+FRAME_BYTES = 4
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+RECORDING_FORMATS = ("wav", "flac")
+
+# Writer queue operations
+_OPEN, _AUDIO, _TRUNCATE, _CLOSE = range(4)
+
+Audio = Union[bytes, bytearray, memoryview, str]
+
+
+def _sample_count(audio: Audio) -> int:
+    """PCM16 samples in raw audio, or in base64 text without decoding it."""
+    if isinstance(audio, str):
+        return (len(audio) * 3 // 4 - audio[-2:].count("=")) // 2
+    return len(audio) // 2
+
+
+def wav_header(
+    frames: int, channels: int = 2, sample_rate: int = RECORDING_SAMPLE_RATE
+) -> bytes:
+    """Canonical 44-byte PCM16 WAV header for the given number of frames."""
+    data_bytes = frames * channels * 2
+    return WAV_HEADER.pack(
+        b"RIFF",
+        36 + data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        channels,
+        sample_rate,
+        sample_rate * channels * 2,
+        channels * 2,
+        16,
+        b"data",
+        data_bytes,
+    )
+
+
+class CallRecording:
+    """
+    Event-loop side of one call's recording.
+
+    Each method only computes where the audio belongs on the call's timeline
+    and queues a reference to the buffer (a memoryview, or the base64 text
+    as received, decoded by the writer thread). Caller audio is taken to end
+    when it arrives; assistant audio starts when it arrives or when the
+    audio queued before it has finished playing, whichever is later.
+    """
+
+    __slots__ = (
+        "recorder",
+        "recording_id",
+        "path",
+        "started",
+        "dropped",
+        "_caller_cursor",
+        "_assistant_cursor",
+    )
+
+    def __init__(self, recorder: "CallRecorder", recording_id: int, path: Path):
+        self.recorder = recorder
+        self.recording_id = recording_id
+        self.path = path
+        self.started = time.monotonic()
+        self.dropped = 0
+        self._caller_cursor = 0
+        self._assistant_cursor = 0
+
+    def _now(self) -> int:
+        return int((time.monotonic() - self.started) * RECORDING_SAMPLE_RATE)
+
+    def caller(self, audio: Audio) -> None:
+        """Records caller audio (PCM16 at 24 kHz, raw or base64)."""
+        samples = _sample_count(audio)
+        start = max(self._caller_cursor, self._now() - samples)
+        self._caller_cursor = start + samples
+        self._put(CHANNEL_CALLER, start, audio)
+
+    def assistant(self, audio: Audio) -> None:
+        """Records assistant audio (PCM16 at 24 kHz, raw or base64)."""
+        start = max(self._assistant_cursor, self._now())
+        self._assistant_cursor = start + _sample_count(audio)
+        self._put(CHANNEL_ASSISTANT, start, audio)
+
+    def truncate_assistant(self) -> None:
+        """Drops assistant audio not yet played, e.g. when the caller barges in."""
+        now = self._now()
+        if self._assistant_cursor > now:
+            self.recorder._submit(
+                (self.recording_id, _TRUNCATE, now, self._assistant_cursor)
+            )
+            self._assistant_cursor = now
+
+    def _put(self, channel: int, start: int, audio: Audio) -> None:
+        if not isinstance(audio, str):
+            audio = memoryview(audio)
+        if not self.recorder._submit_audio(
+            (self.recording_id, _AUDIO, start, (channel, audio))
+        ):
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Finishes the file; conversion and upload happen in the background."""
+        self.recorder._submit((self.recording_id, _CLOSE, 0, self.dropped))
+
+
+class _RecordingFile:
+    """Writer-thread state of one recording: a WAV file filled in place as audio arrives."""
+
+    __slots__ = ("path", "file", "frames")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, "w+b")
+        self.file.write(wav_header(0))
+        self.frames = 0
+
+    def place(self, channel: int, start: int, samples: np.ndarray) -> None:
+        """Writes one channel's samples at ``start``, keeping the other channel's audio."""
+        count = len(samples)
+        block = np.zeros((count, 2), dtype="<i2")
+        overlap = min(start + count, self.frames) - start
+        offset = WAV_HEADER.size + start * FRAME_BYTES
+        if overlap > 0:
+            self.file.seek(offset)
+            block[:overlap] = np.frombuffer(
+                self.file.read(overlap * FRAME_BYTES), dtype="<i2"
+            ).reshape(-1, 2)
+        block[:, channel] = samples
+        # Writing past the end leaves the gap as zeros, i.e. silence
+        self.file.seek(offset)
+        self.file.write(block.tobytes())
+        self.frames = max(self.frames, start + count)
+
+    def finish(self) -> None:
+        """Writes the final header and closes the file."""
+        self.file.seek(0)
+        self.file.write(wav_header(self.frames))
+        self.file.close()
+
+
+class CallRecorder:
+    """
+    Records both sides of calls through one background writer thread.
+
+    The event loop only queues buffer references; decoding, placement on
+    the timeline, file I/O, FLAC conversion and upload all happen on other
+    threads. At most ``max_queued_chunks`` audio chunks wait for the writer
+    (about 10 MB at the default), and audio beyond that is dropped and
+    counted rather than applying backpressure to the call; a dropped chunk
+    becomes silence in the file.
+
+    With ``upload`` set, finished files are uploaded to the conversation-log
+    storage container under ``recordings/`` using the sync Blob SDK on a
+    separate thread, so slow uploads do not stall the writer.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        file_format: str = "wav",
+        max_queued_chunks: int = 2000,
+        storage_account_url: Optional[str] = None,
+        storage_container: str = "conversation-logs",
+        client_id: Optional[str] = None,
+    ):
+        if file_format not in RECORDING_FORMATS:
+            raise ValueError(
+                f"RECORDING_FORMAT must be one of {RECORDING_FORMATS}, got {file_format!r}"
+            )
+        if file_format == "flac":
+            try:
+                import soundfile  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError(
+                    "RECORDING_FORMAT=flac needs the soundfile package (pip install soundfile)"
+                ) from e
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format
+        self.max_queued_chunks = max_queued_chunks
+        self.storage_account_url = storage_account_url
+        self.storage_container = storage_container
+        self.client_id = client_id
+
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped_chunks = 0
+        self.bytes_written = 0
+        self.uploads = 0
+        self.upload_failures = 0
+        # Written by the writer thread only
+        self.write_stats = TimingStats()
+
+        self._next_id = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._files: Dict[int, _RecordingFile] = {}
+        self._uploader = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-upload")
+            if storage_account_url
+            else None
+        )
+        self._blob_service = None
+        self._writer = threading.Thread(
+            target=self._run, name="call-recorder", daemon=True
+        )
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["CallRecorder"]:
+        """Builds the recorder when RECORDING_DIR is set, otherwise returns None."""
+        if not config.get("RECORDING_DIR"):
+            return None
+        upload = config.get("RECORDING_UPLOAD") and config.get(
+            "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"
+        )
+        return cls(
+            Path(config["RECORDING_DIR"]),
+            file_format=config.get("RECORDING_FORMAT", "wav"),
+            max_queued_chunks=int(config.get("RECORDING_QUEUE_CHUNKS", 2000)),
+            storage_account_url=config.get("AZURE_STORAGE_ACCOUNT_URL")
+            if upload
+            else None,
+            storage_container=config.get(
+                "AZURE_STORAGE_CONTAINER", "conversation-logs"
+            ),
+            client_id=config.get("AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"),
+        )
+
+    def open(self, name: str) -> CallRecording:
+        """Starts a recording written to ``<name>.wav`` in the recording directory."""
+        self._next_id += 1
+        self.started += 1
+        recording = CallRecording(
+            self, self._next_id, self.directory / f"{name}.{self.file_format}"
+        )
+        self._submit((self._next_id, _OPEN, 0, self.directory / f"{name}.wav"))
+        return recording
+
+    def _submit(self, item: tuple) -> None:
+        self._queue.put(item)
+
+    def _submit_audio(self, item: tuple) -> bool:
+        if self._queue.qsize() >= self.max_queued_chunks:
+            self.dropped_chunks += 1
+            return False
+        self._queue.put(item)
+        return True
+
+    def close(self) -> None:
+        """Finishes queued work and stops the threads; blocking, so call it from a thread."""
+        self._queue.put(None)
+        self._writer.join()
+        if self._uploader:
+            self._uploader.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            recording_id, op, start, payload = item
+            try:
+                self._handle(recording_id, op, start, payload)
+            except Exception:
+                logger.exception("[CallRecorder] Recording %d failed", recording_id)
+                recording = self._files.pop(recording_id, None)
+                if recording:
+                    self.failed += 1
+                    recording.file.close()
+
+        # Unfinished calls at shutdown still get a valid file
+        for recording_id in list(self._files):
+            self._handle(recording_id, _CLOSE, 0, 0)
+
+    def _handle(self, recording_id: int, op: int, start: int, payload: Any) -> None:
+        if op == _OPEN:
+            self._files[recording_id] = _RecordingFile(payload)
+            return
+        recording = self._files.get(recording_id)
+        if recording is None:
+            return
+        if op == _AUDIO:
+            began = time.perf_counter()
+            channel, audio = payload
+            if isinstance(audio, str):
+                try:
+                    audio = base64.b64decode(audio)
+                except binascii.Error:
+                    return
+            recording.place(channel, start, np.frombuffer(audio, dtype="<i2"))
+            self.write_stats.record((time.perf_counter() - began) * 1000)
+        elif op == _TRUNCATE:
+            end = min(payload, recording.frames)
+            if end > start:
+                recording.place(
+                    CHANNEL_ASSISTANT, start, np.zeros(end - start, dtype="<i2")
+                )
+        elif op == _CLOSE:
+            del self._files[recording_id]
+            recording.finish()
+            path = self._convert(recording.path)
+            self.completed += 1
+            self.bytes_written += path.stat().st_size
+            logger.info(
+                "[CallRecorder] Wrote %s (%.1fs, %d chunks dropped)",
+                path,
+                recording.frames / RECORDING_SAMPLE_RATE,
+                payload,
+            )
+            if self._uploader:
+                self._uploader.submit(self._upload, path)
+
+    def _convert(self, wav_path: Path) -> Path:
+        if self.file_format == "wav":
+            return wav_path
+        import soundfile
+
+        flac_path = wav_path.with_suffix(".flac")
+        with soundfile.SoundFile(
+            flac_path, "w", RECORDING_SAMPLE_RATE, 2, "PCM_16", format="FLAC"
+        ) as out:
+            for block in soundfile.blocks(
+                str(wav_path), blocksize=RECORDING_SAMPLE_RATE * 10, dtype="int16"
+            ):
+                out.write(block)
+        os.remove(wav_path)
+        return flac_path
+
+    def _upload(self, path: Path) -> None:
+        try:
+            if self._blob_service is None:
+                from azure.identity import ManagedIdentityCredential
+                from azure.storage.blob import BlobServiceClient
+
+                # Small single-put limit so large files stream as blocks instead of being read whole
+                self._blob_service = BlobServiceClient(
+                    account_url=self.storage_account_url,
+                    credential=ManagedIdentityCredential(client_id=self.client_id),
+                    max_single_put_size=4 * 1024 * 1024,
+                )
+            from azure.storage.blob import ContentSettings
+
+            blob = self._blob_service.get_blob_client(
+                self.storage_container, f"recordings/{path.name}"
+            )
+            with open(path, "rb") as f:
+                blob.upload_blob(
+                    f,
+                    overwrite=True,
+                    content_settings=ContentSettings(
+                        content_type=f"audio/{self.file_format}"
+                    ),
+                )
+            self.uploads += 1
+            logger.info(
+                "[CallRecorder] Uploaded %s to %s/recordings",
+                path.name,
+                self.storage_container,
+            )
+        except Exception:
+            self.upload_failures += 1
+            logger.exception("[CallRecorder] Failed to upload %s", path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Recording counts, queue depth, drops and writer timings for the metrics endpoint."""
+        return {
+            "active": len(self._files),
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": self._queue.qsize(),
+            "dropped_chunks": self.dropped_chunks,
+            "bytes_written": self.bytes_written,
+            "uploads": self.uploads,
+            "upload_failures": self.upload_failures,
+            "chunk_write_ms": self.write_stats.as_dict(),
+        }
@@ -0,0 +1,89 @@
+"""Streaming polyphase resampler for PCM16 mono audio."""
+
+import math
+from typing import Dict
+
+import numpy as np
+
+# Number of input samples each output sample is computed from
+DEFAULT_TAPS_PER_PHASE = 16
+
+
+class StreamingResampler:
+    """
+    Converts PCM16 mono audio between two sample rates, one frame at a time.
+
+    Uses a Kaiser-windowed sinc low-pass filter split into polyphase branches.
+    The filter history and output phase are carried across calls, so frames
+    can be fed as they arrive without clicks or drift at frame boundaries.
+    """
+
+    def __init__(
+        self, in_rate: int, out_rate: int, taps_per_phase: int = DEFAULT_TAPS_PER_PHASE
+    ):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        divisor = math.gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.taps_per_phase = taps_per_phase
+        self.passthrough = self.up == self.down
+
+        # Prototype filter at the upsampled rate; cutoff at the lower of the two Nyquist rates
+        num_taps = taps_per_phase * self.up
+        cutoff = 0.5 / max(self.up, self.down) * 0.92
+        n = np.arange(num_taps) - (num_taps - 1) / 2.0
+        prototype = 2.0 * cutoff * np.sinc(2.0 * cutoff * n) * np.kaiser(num_taps, 8.0)
+        prototype *= self.up / prototype.sum()
+
+        # phases[p, j] multiplies the input sample j steps before the current one
+        self._phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._offsets = np.arange(taps_per_phase - 1, -1, -1)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears filter history, e.g. when a new response starts."""
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        # Position of the next output sample on the upsampled time axis, relative to the next input frame
+        self._next_pos = 0
+
+    def process(self, audio_bytes: bytes) -> bytes:
+        """Resamples one frame of little-endian PCM16 audio."""
+        if self.passthrough:
+            return audio_bytes
+
+        samples = np.frombuffer(audio_bytes, dtype="<i2", count=len(audio_bytes) // 2)
+        if samples.size == 0:
+            return b""
+
+        buffer = np.concatenate((self._history, samples.astype(np.float32)))
+        end = samples.size * self.up
+        positions = np.arange(self._next_pos, end, self.down)
+        if positions.size:
+            base = positions // self.up
+            phase = positions % self.up
+            windows = buffer[base[:, None] + self._offsets[None, :]]
+            output = np.einsum("ij,ij->i", windows, self._phases[phase])
+            self._next_pos = int(positions[-1]) + self.down - end
+        else:
+            output = np.empty(0, dtype=np.float32)
+            self._next_pos -= end
+
+        self._history = buffer[-(self.taps_per_phase - 1) :]
+        return np.clip(np.rint(output), -32768, 32767).astype("<i2").tobytes()
+
+
+# ACS media streaming formats, keyed by the AudioFormat value used when answering a call
+ACS_AUDIO_FORMAT_RATES: Dict[str, int] = {
+    "pcm16KMono": 16000,
+    "pcm24KMono": 24000,
+}
+
+
+def validate_acs_audio_format(name: str) -> str:
+    """Returns ``name`` if it is a supported ACS_AUDIO_FORMAT, otherwise raises ValueError."""
+    if name not in ACS_AUDIO_FORMAT_RATES:
+        raise ValueError(
+            f"Unknown ACS_AUDIO_FORMAT {name!r}; available: {sorted(ACS_AUDIO_FORMAT_RATES)}"
+        )
+    return name
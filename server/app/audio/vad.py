@@ -0,0 +1,149 @@
+"""Energy-based voice activity gate for raw PCM16 audio streams."""
+
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Full-scale reference for 16-bit PCM, used to convert RMS to dBFS
+PCM16_FULL_SCALE = 32768.0
+
+
+class EnergyVad:
+    """
+    Drops silent PCM16 chunks before they are encoded and sent upstream.
+
+    A chunk is voiced when its RMS level is at or above ``threshold_dbfs``.
+    Once speech is detected, chunks keep flowing for ``hangover_ms`` after the
+    last voiced chunk so that trailing silence still reaches the server-side
+    turn detection (keep it longer than the session's ``silence_duration_ms``).
+    Up to ``prefix_padding_ms`` of the most recent silent audio is held back
+    and flushed in front of the first voiced chunk so word onsets are not
+    clipped.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        threshold_dbfs: float = -50.0,
+        hangover_ms: int = 600,
+        prefix_padding_ms: int = 300,
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_dbfs = threshold_dbfs
+        self.hangover_ms = hangover_ms
+        self.prefix_padding_ms = prefix_padding_ms
+
+        # Compare mean-square energy against a precomputed threshold to avoid a sqrt/log per chunk
+        threshold_rms = PCM16_FULL_SCALE * (10.0 ** (threshold_dbfs / 20.0))
+        self._threshold_energy = threshold_rms * threshold_rms
+
+        self._hangover_samples = sample_rate * hangover_ms // 1000
+        self._prefix_samples = sample_rate * prefix_padding_ms // 1000
+        self._prefix: Deque[bytes] = deque()
+        self._prefix_len = 0
+        self._samples_since_voice: Optional[int] = None
+
+        self.chunks_in = 0
+        self.chunks_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], route: str, sample_rate: int = 24000
+    ) -> Optional["EnergyVad"]:
+        """
+        Build a gate from ``<ROUTE>_VAD_*`` settings.
+
+        Args:
+            config: Application config mapping
+            route: Route prefix, e.g. ``"WEB"``
+            sample_rate: Sample rate of the PCM16 stream on this route
+
+        Returns:
+            An ``EnergyVad`` instance, or None when gating is disabled for the route
+        """
+        if not config.get(f"{route}_VAD_ENABLED"):
+            return None
+        return cls(
+            sample_rate=sample_rate,
+            threshold_dbfs=float(config.get(f"{route}_VAD_THRESHOLD_DBFS", -50.0)),
+            hangover_ms=int(config.get(f"{route}_VAD_HANGOVER_MS", 600)),
+            prefix_padding_ms=int(config.get(f"{route}_VAD_PREFIX_PADDING_MS", 300)),
+        )
+
+    def is_voiced(self, audio_bytes: bytes) -> bool:
+        """Returns True when the chunk's RMS energy reaches the threshold."""
+        # Zero-copy view over the incoming buffer; a trailing odd byte is ignored
+        samples = np.frombuffer(audio_bytes, dtype="<i2", count=len(audio_bytes) // 2)
+        if samples.size == 0:
+            return False
+        as_float = samples.astype(np.float32)
+        energy = float(np.dot(as_float, as_float)) / samples.size
+        return energy >= self._threshold_energy
+
+    def process(self, audio_bytes: bytes) -> bytes:
+        """
+        Gates one chunk of PCM16 audio.
+
+        Returns:
+            The bytes to forward (possibly including held-back prefix audio),
+            or empty bytes when the chunk should be dropped
+        """
+        num_samples = len(audio_bytes) // 2
+        self.chunks_in += 1
+        self.bytes_in += len(audio_bytes)
+
+        if self.is_voiced(audio_bytes):
+            self._samples_since_voice = 0
+            if self._prefix:
+                self._prefix.append(audio_bytes)
+                audio_bytes = b"".join(self._prefix)
+                self._prefix.clear()
+                self._prefix_len = 0
+            return self._emit(audio_bytes)
+
+        if self._samples_since_voice is not None:
+            self._samples_since_voice += num_samples
+            if self._samples_since_voice <= self._hangover_samples:
+                return self._emit(audio_bytes)
+            self._samples_since_voice = None
+
+        self._hold(audio_bytes, num_samples)
+        return b""
+
+    def reset(self) -> None:
+        """Clears hangover and prefix state."""
+        self._prefix.clear()
+        self._prefix_len = 0
+        self._samples_since_voice = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns counters describing how much audio was dropped."""
+        return {
+            "chunks_in": self.chunks_in,
+            "chunks_out": self.chunks_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    def _emit(self, audio_bytes: bytes) -> bytes:
+        self.chunks_out += 1
+        self.bytes_out += len(audio_bytes)
+        return audio_bytes
+
+    def _hold(self, audio_bytes: bytes, num_samples: int) -> None:
+        """Keeps the most recent silent audio, bounded by the prefix padding."""
+        if self._prefix_samples <= 0:
+            return
+        self._prefix.append(audio_bytes)
+        self._prefix_len += num_samples
+        while (
+            self._prefix
+            and self._prefix_len - len(self._prefix[0]) // 2 >= self._prefix_samples
+        ):
+            self._prefix_len -= len(self._prefix.popleft()) // 2
@@ -1,34 +1,108 @@
 """Handler for processing ACS (Azure Communication Services) call and callback events."""
 
+import asyncio
+import hashlib
 import json
 import logging
+import time
 import uuid
+import zlib
+from collections import defaultdict
+from typing import Optional
 from urllib.parse import urlencode, urlparse, urlunparse
 
-from azure.communication.callautomation import (AudioFormat,
-                                                MediaStreamingAudioChannelType,
-                                                MediaStreamingContentType,
-                                                MediaStreamingOptions,
-                                                StreamingTransportType)
-from azure.communication.callautomation.aio import CallAutomationClient
-from azure.eventgrid import EventGridEvent, SystemEventNames
+from app.handler.admission_control import AdmissionController
+from app.handler.call_setup import CallSetupManager
+from app.handler.call_state import REPLICA_NAME, create_call_state_store
+from app.handler.session_profiles import SessionProfiles
+from app.handler.ttl_cache import TtlCache
+from app.monitoring.logging_config import bind_call_context, call_log_context
+from app.monitoring.metrics import TimingStats, timing_table
 from quart import Response
 
 logger = logging.getLogger(__name__)
 
+# Call status recorded in the shared call state for each ACS callback event
+CALL_STATUS_BY_EVENT = {
+    "Microsoft.Communication.CallConnected": "connected",
+    "Microsoft.Communication.MediaStreamingStarted": "streaming",
+    "Microsoft.Communication.MediaStreamingStopped": "streaming_stopped",
+    "Microsoft.Communication.MediaStreamingFailed": "streaming_failed",
+    "Microsoft.Communication.CallDisconnected": "disconnected",
+}
+
+# Callback events after which a prepared Voice Live session will never be claimed on this call
+SETUP_DISCARD_EVENTS = frozenset(
+    {
+        "Microsoft.Communication.MediaStreamingFailed",
+        "Microsoft.Communication.CallDisconnected",
+    }
+)
+
 
 class AcsEventHandler:
     """Handles ACS event processing and call answering logic."""
 
-    def __init__(self, config):
-        self.acs_client = CallAutomationClient.from_connection_string(
-            config["ACS_CONNECTION_STRING"]
+    def __init__(
+        self,
+        config,
+        admission: Optional[AdmissionController] = None,
+        profiles: Optional[SessionProfiles] = None,
+    ):
+        self.connection_string = config["ACS_CONNECTION_STRING"]
+        self._acs_client = None
+        self.admission = admission
+        self.seen_calls = TtlCache(
+            float(config.get("EVENTGRID_DEDUPE_TTL_SECONDS", 600))
+        )
+        self.call_setups = CallSetupManager(config, profiles)
+        # Read by whichever replica receives the media WebSocket or callbacks for the call
+        self.call_state = create_call_state_store(config)
+
+        # Callbacks are acknowledged at once and handled by a small pool of workers.
+        # Each call is pinned to one worker's queue, so its events run in arrival order.
+        self.callback_worker_count: int = max(1, int(config.get("CALLBACK_WORKERS", 4)))
+        queue_size = max(
+            1,
+            int(config.get("CALLBACK_QUEUE_SIZE", 1000)) // self.callback_worker_count,
         )
+        self.callback_queues = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(self.callback_worker_count)
+        ]
+        self.dropped_callbacks: int = 0
+        self.callback_handling_stats = defaultdict(TimingStats)
+        self.callback_total_stats = defaultdict(TimingStats)
+        self._callback_workers: list = []
+
+    @property
+    def acs_client(self):
+        """
+        Call Automation client, created on first use.
+
+        The Call Automation and EventGrid SDKs are imported here and in the
+        methods using them rather than at module load, keeping them off the
+        cold-start path; the startup warm-up creates the client before the
+        first call.
+        """
+        if self._acs_client is None:
+            from azure.communication.callautomation.aio import CallAutomationClient
+
+            self._acs_client = CallAutomationClient.from_connection_string(
+                self.connection_string
+            )
+        return self._acs_client
+
+    @acs_client.setter
+    def acs_client(self, client) -> None:
+        self._acs_client = client
 
     async def process_incoming_call(self, events: list, host_url, config):
-        """Processes incoming call events and answers calls with media streaming."""
+        """Processes incoming call events and answers every call in the batch concurrently."""
+        from azure.eventgrid import EventGridEvent, SystemEventNames
+
         logger.info("incoming event data")
 
+        incoming_calls = []
         for event_dict in events:
             event = EventGridEvent.from_dict(event_dict)
             logger.info("incoming event data --> %s", event.data)
@@ -45,73 +119,259 @@ class AcsEventHandler:
                 )
 
             if event.event_type == "Microsoft.Communication.IncomingCall":
-                logger.info("Incoming call received: data=%s", event.data)
+                incoming_calls.append(event)
 
-                caller_info = event.data["from"]
-                caller_id = (
-                    caller_info["phoneNumber"]["value"]
-                    if caller_info["kind"] == "phoneNumber"
-                    else caller_info["rawId"]
-                )
+        if not incoming_calls:
+            return Response(status=400)
 
-                logger.info("incoming call handler caller id: %s", caller_id)
-                incoming_call_context = event.data["incomingCallContext"]
-                query_parameters = urlencode({"callerId": caller_id})
-                guid = uuid.uuid4()
+        results = await asyncio.gather(
+            *(
+                self._handle_incoming_call(event, host_url, config)
+                for event in incoming_calls
+            ),
+            return_exceptions=True,
+        )
+        failures = [result for result in results if isinstance(result, Exception)]
+        for failure in failures:
+            logger.error("Failed to answer incoming call: %r", failure)
 
-                callback_events_uri = (
-                    f"{config['ACS_DEV_TUNNEL']}/acs/callbacks"
-                    if config["ACS_DEV_TUNNEL"]
-                    else f"{host_url}/acs/callbacks"
-                )
-                callback_uri = f"{callback_events_uri}/{guid}?{query_parameters}"
+        # A non-2xx status makes EventGrid redeliver the batch; calls already answered are deduplicated
+        return Response(status=500 if failures else 200)
 
-                parsed_url = urlparse(callback_events_uri)
-                websocket_url = urlunparse(
-                    ("wss", parsed_url.netloc, "/acs/ws", "", "", "")
-                )
+    async def _handle_incoming_call(self, event, host_url, config) -> None:
+        """Answers (or sheds) one IncomingCall event, ignoring redeliveries."""
+        from azure.communication.callautomation import (
+            AudioFormat,
+            MediaStreamingAudioChannelType,
+            MediaStreamingContentType,
+            MediaStreamingOptions,
+            StreamingTransportType,
+        )
 
-                logger.info("callback url: %s", callback_uri)
-                logger.info("websocket url: %s", websocket_url)
-
-                media_streaming_options = MediaStreamingOptions(
-                    transport_url=websocket_url,
-                    transport_type=StreamingTransportType.WEBSOCKET,
-                    content_type=MediaStreamingContentType.AUDIO,
-                    audio_channel_type=MediaStreamingAudioChannelType.MIXED,
-                    start_media_streaming=True,
-                    enable_bidirectional=True,
-                    audio_format=AudioFormat.PCM24_K_MONO,
-                )
+        logger.info("Incoming call received: data=%s", event.data)
 
-                result = await self.acs_client.answer_call(
-                    incoming_call_context=incoming_call_context,
-                    operation_context="incomingCall",
-                    callback_url=callback_uri,
-                    media_streaming=media_streaming_options,
-                )
+        incoming_call_context = event.data["incomingCallContext"]
+        dedupe_keys = (
+            f"event:{event.id}",
+            "context:"
+            + hashlib.sha256(incoming_call_context.encode("utf-8")).hexdigest(),
+        )
+        if any(key in self.seen_calls for key in dedupe_keys):
+            logger.info(
+                "Ignoring duplicate IncomingCall delivery: event id %s", event.id
+            )
+            return
+        for key in dedupe_keys:
+            self.seen_calls.add(key)
 
-                logger.info(
-                    "Answered call for connection id: %s", result.call_connection_id
-                )
-                return Response(status=200)
+        caller_info = event.data["from"]
+        caller_id = (
+            caller_info["phoneNumber"]["value"]
+            if caller_info["kind"] == "phoneNumber"
+            else caller_info["rawId"]
+        )
+        logger.info("incoming call handler caller id: %s", caller_id)
+
+        shed_reason = self.admission.check() if self.admission else None
+        if shed_reason:
+            self.admission.record_shed(shed_reason)
+            await self._shed_call(incoming_call_context, config)
+            return
+
+        # Reserve capacity before awaiting so concurrent answers in a batch see each other
+        reservation = self.admission.reserve() if self.admission else None
+
+        query_parameters = urlencode({"callerId": caller_id})
+        guid = uuid.uuid4()
+
+        callback_events_uri = (
+            f"{config['ACS_DEV_TUNNEL']}/acs/callbacks"
+            if config["ACS_DEV_TUNNEL"]
+            else f"{host_url}/acs/callbacks"
+        )
+        callback_uri = f"{callback_events_uri}/{guid}?{query_parameters}"
+
+        # The media WebSocket carries the same context ID so it can pick up the prepared session
+        parsed_url = urlparse(callback_events_uri)
+        websocket_url = urlunparse(
+            (
+                "wss",
+                parsed_url.netloc,
+                "/acs/ws",
+                "",
+                urlencode({"context": str(guid)}),
+                "",
+            )
+        )
+
+        logger.info("callback url: %s", callback_uri)
+        logger.info("websocket url: %s", websocket_url)
 
-        return Response(status=400)
+        media_streaming_options = MediaStreamingOptions(
+            transport_url=websocket_url,
+            transport_type=StreamingTransportType.WEBSOCKET,
+            content_type=MediaStreamingContentType.AUDIO,
+            audio_channel_type=MediaStreamingAudioChannelType.MIXED,
+            start_media_streaming=True,
+            enable_bidirectional=True,
+            audio_format=AudioFormat(
+                config.get("ACS_AUDIO_FORMAT", AudioFormat.PCM24_K_MONO)
+            ),
+        )
+
+        # Prepare the Voice Live session while ACS answers and opens the media stream
+        setup = self.call_setups.start(str(guid), caller_id)
+        call_state = {
+            "caller_id": caller_id,
+            "status": "answering",
+            "answered_by": REPLICA_NAME,
+        }
+        if setup and setup.profile:
+            call_state["profile"] = setup.profile.name
+        await self.call_state.set(str(guid), call_state)
+
+        try:
+            result = await self.acs_client.answer_call(
+                incoming_call_context=incoming_call_context,
+                operation_context="incomingCall",
+                callback_url=callback_uri,
+                media_streaming=media_streaming_options,
+            )
+        except Exception:
+            # Let an EventGrid retry attempt this call again
+            for key in dedupe_keys:
+                self.seen_calls.discard(key)
+            if reservation is not None:
+                self.admission.release(reservation)
+            await self.call_setups.discard(str(guid))
+            await self.call_state.set(str(guid), {"status": "answer_failed"})
+            raise
+
+        await self.call_state.set(
+            str(guid),
+            {"status": "answered", "call_connection_id": result.call_connection_id},
+        )
+        bind_call_context(call_connection_id=result.call_connection_id)
+        logger.info("Answered call for connection id: %s", result.call_connection_id)
+
+    async def _shed_call(self, incoming_call_context: str, config) -> None:
+        """Redirects the call to the overflow target if configured, otherwise rejects it as busy."""
+        from azure.communication.callautomation import (
+            CallRejectReason,
+            CommunicationUserIdentifier,
+            PhoneNumberIdentifier,
+        )
+
+        redirect_target = config.get("ADMISSION_REDIRECT_TARGET")
+        try:
+            if redirect_target:
+                target = (
+                    PhoneNumberIdentifier(redirect_target)
+                    if redirect_target.startswith("+")
+                    else CommunicationUserIdentifier(redirect_target)
+                )
+                await self.acs_client.redirect_call(incoming_call_context, target)
+                logger.info("Redirected shed call to %s", redirect_target)
+            else:
+                await self.acs_client.reject_call(
+                    incoming_call_context, call_reject_reason=CallRejectReason.BUSY
+                )
+                logger.info("Rejected shed call as busy")
+        except Exception:
+            logger.exception("Failed to shed incoming call")
 
     async def process_callback_events(self, context_id: str, raw_events: list, config):
-        """Processes ACS callback events such as call connected, media started, etc."""
+        """Acknowledges ACS callback events immediately and queues them for background handling."""
+        self.start_callback_workers()
+        enqueued_at = time.perf_counter()
+        callback_queue = self.callback_queues[
+            zlib.crc32(context_id.encode("utf-8")) % self.callback_worker_count
+        ]
         for event in raw_events:
-            event_data = event["data"]
-            call_connection_id = event_data["callConnectionId"]
+            try:
+                callback_queue.put_nowait((event, context_id, config, enqueued_at))
+            except asyncio.QueueFull:
+                self.dropped_callbacks += 1
+                logger.warning(
+                    "Callback queue full, dropping %s for context %s (%d dropped)",
+                    event.get("type"),
+                    context_id,
+                    self.dropped_callbacks,
+                )
 
-            logger.info(
-                "Received Event:-> %s, Correlation Id:-> %s, CallConnectionId:-> %s",
-                event["type"],
-                event_data["correlationId"],
-                call_connection_id,
+        return Response(status=200)
+
+    def start_callback_workers(self) -> None:
+        """Starts the background callback workers if they are not running."""
+        if self._callback_workers:
+            return
+        self._callback_workers = [
+            asyncio.create_task(self._callback_worker(callback_queue))
+            for callback_queue in self.callback_queues
+        ]
+
+    async def stop_callback_workers(self) -> None:
+        """Cancels the background callback workers."""
+        workers, self._callback_workers = self._callback_workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _callback_worker(self, callback_queue: asyncio.Queue) -> None:
+        """Handles one queue's callback events in order, recording latency per event type."""
+        while True:
+            event, context_id, config, enqueued_at = await callback_queue.get()
+            started = time.perf_counter()
+            event_type = event.get("type", "unknown")
+            token = bind_call_context(
+                call_connection_id=event.get("data", {}).get("callConnectionId", "")
             )
+            try:
+                await self._handle_callback_event(event, config)
+                status = CALL_STATUS_BY_EVENT.get(event_type)
+                if status:
+                    await self.call_state.set(context_id, {"status": status})
+                if event_type in SETUP_DISCARD_EVENTS and context_id:
+                    await self.call_setups.discard(context_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error handling callback event %s", event_type)
+            finally:
+                call_log_context.reset(token)
+                finished = time.perf_counter()
+                self.callback_handling_stats[event_type].record(
+                    (finished - started) * 1000
+                )
+                self.callback_total_stats[event_type].record(
+                    (finished - enqueued_at) * 1000
+                )
+                callback_queue.task_done()
+
+    def callback_stats(self) -> dict:
+        """Returns callback queue depth, drops and per-event-type latency."""
+        return {
+            "queue_depth": sum(queue.qsize() for queue in self.callback_queues),
+            "dropped": self.dropped_callbacks,
+            "handling_ms": timing_table(self.callback_handling_stats),
+            "queued_to_done_ms": timing_table(self.callback_total_stats),
+        }
 
-            if event["type"] == "Microsoft.Communication.CallConnected":
+    async def _handle_callback_event(self, event: dict, config) -> None:
+        """Processes one ACS callback event such as call connected, media started, etc."""
+        event_data = event["data"]
+        call_connection_id = event_data["callConnectionId"]
+
+        logger.info(
+            "Received Event:-> %s, Correlation Id:-> %s, CallConnectionId:-> %s",
+            event["type"],
+            event_data["correlationId"],
+            call_connection_id,
+        )
+
+        if event["type"] == "Microsoft.Communication.CallConnected":
+            # Remote lookup only for diagnostics; off by default to keep callbacks cheap
+            if config.get("ACS_FETCH_CALL_PROPERTIES"):
                 properties = await self.acs_client.get_call_connection(
                     call_connection_id
                 ).get_call_properties()
@@ -120,51 +380,40 @@ class AcsEventHandler:
                     "MediaStreamingSubscription:--> %s",
                     properties.media_streaming_subscription,
                 )
-                logger.info(
-                    "Received CallConnected event for connection id: %s",
-                    call_connection_id,
-                )
-                logger.info("CORRELATION ID:--> %s", event_data["correlationId"])
-                logger.info("CALL CONNECTION ID:--> %s", call_connection_id)
 
-            elif event["type"] == "Microsoft.Communication.MediaStreamingStarted":
-                update = event_data["mediaStreamingUpdate"]
-                logger.info(
-                    "Media streaming content type:--> %s", update["contentType"]
-                )
-                logger.info(
-                    "Media streaming status:--> %s", update["mediaStreamingStatus"]
-                )
-                logger.info(
-                    "Media streaming status details:--> %s",
-                    update["mediaStreamingStatusDetails"],
-                )
+            logger.info(
+                "Received CallConnected event for connection id: %s",
+                call_connection_id,
+            )
+            logger.info("CORRELATION ID:--> %s", event_data["correlationId"])
+            logger.info("CALL CONNECTION ID:--> %s", call_connection_id)
 
-            elif event["type"] == "Microsoft.Communication.MediaStreamingStopped":
-                update = event_data["mediaStreamingUpdate"]
-                logger.info(
-                    "Media streaming content type:--> %s", update["contentType"]
-                )
-                logger.info(
-                    "Media streaming status:--> %s", update["mediaStreamingStatus"]
-                )
-                logger.info(
-                    "Media streaming status details:--> %s",
-                    update["mediaStreamingStatusDetails"],
-                )
+        elif event["type"] == "Microsoft.Communication.MediaStreamingStarted":
+            update = event_data["mediaStreamingUpdate"]
+            logger.info("Media streaming content type:--> %s", update["contentType"])
+            logger.info("Media streaming status:--> %s", update["mediaStreamingStatus"])
+            logger.info(
+                "Media streaming status details:--> %s",
+                update["mediaStreamingStatusDetails"],
+            )
 
-            elif event["type"] == "Microsoft.Communication.MediaStreamingFailed":
-                result_info = event_data["resultInformation"]
-                logger.info(
-                    "Code:-> %s, Subcode:-> %s",
-                    result_info["code"],
-                    result_info["subCode"],
-                )
-                logger.info("Message:-> %s", result_info["message"])
+        elif event["type"] == "Microsoft.Communication.MediaStreamingStopped":
+            update = event_data["mediaStreamingUpdate"]
+            logger.info("Media streaming content type:--> %s", update["contentType"])
+            logger.info("Media streaming status:--> %s", update["mediaStreamingStatus"])
+            logger.info(
+                "Media streaming status details:--> %s",
+                update["mediaStreamingStatusDetails"],
+            )
 
-            elif event["type"] == "Microsoft.Communication.CallDisconnected":
-                logger.info(
-                    "CallDisconnected event received for: %s", call_connection_id
-                )
+        elif event["type"] == "Microsoft.Communication.MediaStreamingFailed":
+            result_info = event_data["resultInformation"]
+            logger.info(
+                "Code:-> %s, Subcode:-> %s",
+                result_info["code"],
+                result_info["subCode"],
+            )
+            logger.info("Message:-> %s", result_info["message"])
 
-        return Response(status=200)
+        elif event["type"] == "Microsoft.Communication.CallDisconnected":
+            logger.info("CallDisconnected event received for: %s", call_connection_id)
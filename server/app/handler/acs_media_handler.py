@@ -2,19 +2,47 @@
 
 import asyncio
 import base64
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import logging
+import time
 import uuid
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from azure.identity.aio import ManagedIdentityCredential
-from azure.storage.blob import ContentSettings
-from azure.storage.blob.aio import BlobServiceClient
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from app.audio.g711 import mulaw_decode, mulaw_encode
+from app.audio.quality import AudioQualityMeter
+from app.audio.resampler import ACS_AUDIO_FORMAT_RATES, StreamingResampler
+from app.audio.vad import EnergyVad
+from app.handler.call_capture import (
+    DIRECTION_CLIENT_IN,
+    DIRECTION_VOICELIVE_IN,
+    CallCaptureWriter,
+)
+from app.handler.credentials import managed_identity_credential
+from app.handler.event_parser import parse_voicelive_event
+from app.handler.greeting_cache import PrerenderedGreeting
+from app.monitoring.call_metrics import LiveCallMetrics
+from app.monitoring.metrics import TimingStats, timing_table
 from websockets.asyncio.client import connect as ws_connect
 from websockets.typing import Data
 
+if TYPE_CHECKING:
+    from app.audio.recorder import CallRecorder, CallRecording
+    from app.handler.call_setup import CallSetup
+    from app.handler.session_profiles import SessionProfile
+
 logger = logging.getLogger(__name__)
 
 # Event type constants
@@ -22,13 +50,55 @@ SESSION_CREATED = "session.created"
 INPUT_AUDIO_BUFFER_CLEARED = "input_audio_buffer.cleared"
 INPUT_AUDIO_BUFFER_SPEECH_STARTED = "input_audio_buffer.speech_started"
 INPUT_AUDIO_BUFFER_SPEECH_STOPPED = "input_audio_buffer.speech_stopped"
-CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_COMPLETED = "conversation.item.input_audio_transcription.completed"
-CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_FAILED = "conversation.item.input_audio_transcription.failed"
+CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_COMPLETED = (
+    "conversation.item.input_audio_transcription.completed"
+)
+CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_FAILED = (
+    "conversation.item.input_audio_transcription.failed"
+)
 RESPONSE_DONE = "response.done"
 RESPONSE_AUDIO_TRANSCRIPT_DONE = "response.audio_transcript.done"
 RESPONSE_AUDIO_DELTA = "response.audio.delta"
 ERROR = "error"
 
+# Voice Live streams PCM16 mono at 24 kHz in both directions
+VOICE_LIVE_SAMPLE_RATE = 24000
+
+# Audio encodings a web client can request with ?codec=; mu-law halves the bandwidth
+WEB_CODEC_PCM16 = "pcm16"
+WEB_CODEC_MULAW = "mulaw"
+WEB_AUDIO_CODECS = (WEB_CODEC_PCM16, WEB_CODEC_MULAW)
+
+# Voice Live event handlers receive the media handler and the parsed event
+EventHandler = Callable[[Any, Dict[str, Any]], Awaitable[None]]
+
+# Extra handlers (tool calls, analytics, ...) run after the built-in handler for an event type
+EXTRA_EVENT_HANDLERS: Dict[str, List[EventHandler]] = defaultdict(list)
+
+# Process-wide call count and cumulative time per event handler
+DISPATCH_STATS: Dict[str, TimingStats] = defaultdict(TimingStats)
+
+
+def register_event_handler(event_type: str, handler: EventHandler) -> None:
+    """
+    Registers an extra coroutine to run for a Voice Live event type.
+
+    Args:
+        event_type: Voice Live event type, e.g. ``response.function_call_arguments.done``
+        handler: ``async def handler(media_handler, event)``; exceptions are logged and ignored.
+            Audio delta events only carry ``type``, ``response_id``, ``item_id`` and ``delta``.
+    """
+    EXTRA_EVENT_HANDLERS[event_type].append(handler)
+
+
+def dispatch_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns per-handler call counts and timings for the metrics endpoint."""
+    return timing_table(DISPATCH_STATS)
+
+
+# Prompt path -> (modification time, text); an edited file is re-read on the next call
+_PROMPT_CACHE: Dict[Path, Tuple[float, str]] = {}
+
 
 def load_system_prompt(prompt_file: str = "grace_intake_agent.txt") -> str:
     """
@@ -50,10 +120,18 @@ def load_system_prompt(prompt_file: str = "grace_intake_agent.txt") -> str:
     prompt_path = prompts_dir / prompt_file
 
     try:
+        modified = prompt_path.stat().st_mtime
+        cached = _PROMPT_CACHE.get(prompt_path)
+        if cached and cached[0] == modified:
+            return cached[1]
         with open(prompt_path, "r", encoding="utf-8") as f:
             instructions = f.read().strip()
-            logger.info("[ACSMediaHandler] Loaded system prompt from %s (%d chars)",
-                       prompt_path, len(instructions))
+            logger.info(
+                "[ACSMediaHandler] Loaded system prompt from %s (%d chars)",
+                prompt_path,
+                len(instructions),
+            )
+            _PROMPT_CACHE[prompt_path] = (modified, instructions)
             return instructions
     except FileNotFoundError:
         logger.error("[ACSMediaHandler] Prompt file not found: %s", prompt_path)
@@ -62,7 +140,9 @@ def load_system_prompt(prompt_file: str = "grace_intake_agent.txt") -> str:
             "You are Grace, a friendly and knowledgeable intake agent for Mercy House and Sacred Grove. "
             "Help callers with questions about the programs and collect their contact information."
         )
-        logger.warning("[ACSMediaHandler] Using fallback prompt (%d chars)", len(fallback))
+        logger.warning(
+            "[ACSMediaHandler] Using fallback prompt (%d chars)", len(fallback)
+        )
         return fallback
     except Exception as e:
         logger.exception("[ACSMediaHandler] Error loading prompt file: %s", e)
@@ -82,50 +162,223 @@ def session_config():
                 "silence_duration_ms": 250,
                 "remove_filler_words": False,
             },
-            "input_audio_transcription": {
-                "model": "whisper-1"
-            },
+            "input_audio_transcription": {"model": "whisper-1"},
             "input_audio_noise_reduction": {"type": "azure_deep_noise_suppression"},
             "input_audio_echo_cancellation": {"type": "server_echo_cancellation"},
             "voice": {
                 "name": "en-US-Emma2:DragonHDLatestNeural",
                 "type": "azure-standard",
-                "temperature": 0.8
+                "temperature": 0.8,
             },
         },
     }
 
+
+def voicelive_url(endpoint: str, model: str) -> str:
+    """Builds the Voice Live realtime WebSocket URL (http:// endpoints map to ws:// for local stand-ins)."""
+    endpoint = endpoint.rstrip("/")
+    model = model.strip()
+    url = f"{endpoint}/voice-live/realtime?api-version=2025-05-01-preview&model={model}"
+    return url.replace("https://", "wss://").replace("http://", "ws://")
+
+
+async def voicelive_headers(
+    api_key: Optional[str], client_id: Optional[str]
+) -> Dict[str, str]:
+    """
+    Builds the Voice Live connection headers.
+
+    Args:
+        api_key: API key, used when no managed identity is configured
+        client_id: User-assigned managed identity client ID
+
+    Returns:
+        Dict[str, str]: Request ID plus either a bearer token or the API key
+    """
+    headers = {"x-ms-client-request-id": str(uuid.uuid4())}
+
+    if client_id:
+        token = await managed_identity_credential(client_id).get_token(
+            "https://cognitiveservices.azure.com/.default"
+        )
+        headers["Authorization"] = f"Bearer {token.token}"
+        logger.info("[ACSMediaHandler] Connected to Voice Live API by managed identity")
+    else:
+        headers["api-key"] = api_key
+        logger.info("[ACSMediaHandler] Connected to Voice Live API by API key")
+    return headers
+
+
+async def open_voicelive_connection(
+    endpoint: str,
+    model: str,
+    api_key: Optional[str],
+    client_id: Optional[str],
+    connect_options: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Opens a Voice Live realtime WebSocket; see voicelive_url and voicelive_headers.
+
+    ``connect_options`` are extra ``websockets`` connect arguments from the transport profile.
+    """
+    headers = await voicelive_headers(api_key, client_id)
+    return await ws_connect(
+        voicelive_url(endpoint, model),
+        additional_headers=headers,
+        **(connect_options or {}),
+    )
+
+
+class ConversationEvent(NamedTuple):
+    """One conversation log entry, expanded to the JSON layout only when the log is saved."""
+
+    elapsed: float  # seconds since session start
+    gap: Optional[float]  # seconds since the previous event
+    event_type: str
+    speaker: str
+    text: str
+    metadata: Optional[Dict[str, Any]]  # None rather than an empty dict
+
+
 class ACSMediaHandler:
     """Manages audio streaming between client and Azure Voice Live API."""
 
-    def __init__(self, config: Dict[str, Any]):
+    # Fixed attribute layout keeps per-call state small when hundreds of calls share a process
+    __slots__ = (
+        "endpoint",
+        "model",
+        "api_key",
+        "client_id",
+        "connect_options",
+        "storage_account_url",
+        "storage_container",
+        "send_queue",
+        "ws",
+        "send_task",
+        "receiver_task",
+        "incoming_websocket",
+        "is_raw_audio",
+        "web_codec",
+        "web_frame_ms",
+        "web_frame_bytes",
+        "web_frame_mismatches",
+        "input_vad",
+        "audio_quality",
+        "acs_audio_format",
+        "acs_sample_rate",
+        "inbound_resampler",
+        "outbound_resampler",
+        "capture_dir",
+        "capture",
+        "recorder",
+        "recording",
+        "conversation_log_dir",
+        "session_id",
+        "conversation_log",
+        "session_start_time",
+        "session_start_monotonic",
+        "last_event_elapsed",
+        "live_metrics",
+        "current_response_id",
+        "is_first_audio_chunk",
+        "greeting",
+        "greeting_task",
+        "setup",
+        "profile",
+    )
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        greeting: Optional[PrerenderedGreeting] = None,
+        setup: Optional["CallSetup"] = None,
+        profile: Optional["SessionProfile"] = None,
+        recorder: Optional["CallRecorder"] = None,
+    ):
         self.endpoint: str = config["AZURE_VOICE_LIVE_ENDPOINT"]
         self.model: str = config["VOICE_LIVE_MODEL"]
         self.api_key: Optional[str] = config["AZURE_VOICE_LIVE_API_KEY"]
         self.client_id: Optional[str] = config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"]
-        self.storage_account_url: Optional[str] = config.get("AZURE_STORAGE_ACCOUNT_URL")
-        self.storage_container: str = config.get("AZURE_STORAGE_CONTAINER", "conversation-logs")
-        self.send_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self.connect_options: Dict[str, Any] = (
+            config.get("VOICELIVE_CONNECT_OPTIONS") or {}
+        )
+        self.storage_account_url: Optional[str] = config.get(
+            "AZURE_STORAGE_ACCOUNT_URL"
+        )
+        self.storage_container: str = config.get(
+            "AZURE_STORAGE_CONTAINER", "conversation-logs"
+        )
+        self.send_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=int(config.get("VOICELIVE_SEND_QUEUE_SIZE", 100))
+        )
         self.ws: Optional[Any] = None
         self.send_task: Optional[asyncio.Task] = None
         self.receiver_task: Optional[asyncio.Task] = None
         self.incoming_websocket: Optional[Any] = None
         self.is_raw_audio: bool = True
+        self.web_codec: str = WEB_CODEC_PCM16
+        # Web clients send fixed-length frames; mismatches are counted and logged
+        self.web_frame_ms: int = int(config.get("WEB_FRAME_MS", 20))
+        self.web_frame_bytes: int = 0
+        self.web_frame_mismatches: int = 0
+        self.input_vad: Optional[EnergyVad] = None
+        self.audio_quality: Optional[AudioQualityMeter] = AudioQualityMeter.from_config(
+            config
+        )
+        self.acs_audio_format: str = config.get("ACS_AUDIO_FORMAT", "pcm24KMono")
+        self.acs_sample_rate: int = ACS_AUDIO_FORMAT_RATES[self.acs_audio_format]
+        self.inbound_resampler: Optional[StreamingResampler] = None
+        self.outbound_resampler: Optional[StreamingResampler] = None
+        self.capture_dir: Optional[str] = config.get("CALL_CAPTURE_DIR")
+        self.capture: Optional[CallCaptureWriter] = None
+        self.recorder: Optional["CallRecorder"] = recorder
+        self.recording: Optional["CallRecording"] = None
+        self.conversation_log_dir: Path = (
+            Path(config["CONVERSATION_LOG_DIR"])
+            if config.get("CONVERSATION_LOG_DIR")
+            else Path(__file__).parent.parent.parent / "conversation_logs"
+        )
 
         # Conversation tracking
         self.session_id: str = self._generate_guid()
-        self.conversation_log: list = []
+        self.conversation_log: List[ConversationEvent] = []
         self.session_start_time: datetime = datetime.now()
-        self.last_event_time: Optional[datetime] = None
+        self.session_start_monotonic: float = time.monotonic()
+        self.last_event_elapsed: Optional[float] = None
+        self.live_metrics = LiveCallMetrics()
 
         # Audio buffering to prevent crackling
         self.current_response_id: Optional[str] = None
         self.is_first_audio_chunk: bool = True
 
+        # Greeting played from the cache while Voice Live connects
+        self.greeting: Optional[PrerenderedGreeting] = greeting
+        self.greeting_task: Optional[asyncio.Task] = None
+
+        # Voice Live session prepared while the call was being answered
+        self.setup: Optional["CallSetup"] = setup
+
+        # Session configuration profile, stamped into the conversation log for A/B comparison
+        self.profile: Optional["SessionProfile"] = profile or (
+            setup.profile if setup else None
+        )
+
     def _generate_guid(self) -> str:
         return str(uuid.uuid4())
 
-    def _log_conversation_event(self, event_type: str, speaker: str, text: str, metadata: Optional[Dict] = None) -> None:
+    def live_snapshot(self) -> Dict[str, Any]:
+        """Returns this session's live conversation metrics and queue depth."""
+        return {
+            "session_id": self.session_id,
+            "profile": self.profile.name if self.profile else "default",
+            "is_raw_audio": self.is_raw_audio,
+            "send_queue_depth": self.send_queue.qsize(),
+            **self.live_metrics.snapshot(),
+        }
+
+    def _log_conversation_event(
+        self, event_type: str, speaker: str, text: str, metadata: Optional[Dict] = None
+    ) -> None:
         """
         Log a conversation event with timing information.
 
@@ -135,69 +388,211 @@ class ACSMediaHandler:
             text: The transcript text or event description
             metadata: Additional event metadata
         """
-        now = datetime.now()
+        # Calculate time since session start
+        elapsed = time.monotonic() - self.session_start_monotonic
 
         # Calculate time since last event (pause/delay)
         time_since_last = None
-        if self.last_event_time:
-            time_since_last = (now - self.last_event_time).total_seconds()
+        if self.last_event_elapsed is not None:
+            time_since_last = elapsed - self.last_event_elapsed
 
-        # Calculate time since session start
-        elapsed = (now - self.session_start_time).total_seconds()
-
-        event = {
-            "timestamp": now.isoformat(),
-            "elapsed_seconds": round(elapsed, 3),
-            "time_since_last_event": round(time_since_last, 3) if time_since_last else None,
-            "event_type": event_type,
-            "speaker": speaker,
-            "text": text,
-            "metadata": metadata or {}
-        }
-
-        self.conversation_log.append(event)
-        self.last_event_time = now
+        self.conversation_log.append(
+            ConversationEvent(
+                elapsed, time_since_last, event_type, speaker, text, metadata or None
+            )
+        )
+        self.last_event_elapsed = elapsed
 
         logger.debug("[ConversationLog] %s | %s: %s", event_type, speaker, text[:100])
 
+    def _conversation_event_dict(self, event: ConversationEvent) -> Dict[str, Any]:
+        """Expands a logged event to the conversation log JSON layout."""
+        return {
+            "timestamp": (
+                self.session_start_time + timedelta(seconds=event.elapsed)
+            ).isoformat(),
+            "elapsed_seconds": round(event.elapsed, 3),
+            "time_since_last_event": round(event.gap, 3) if event.gap else None,
+            "event_type": event.event_type,
+            "speaker": event.speaker,
+            "text": event.text,
+            "metadata": event.metadata or {},
+        }
+
     async def connect(self) -> None:
         """Connects to Azure Voice Live API via WebSocket."""
+        logger.info(
+            "[ACSMediaHandler] Session profile: %s",
+            self.profile.name if self.profile else "default",
+        )
         try:
-            endpoint = self.endpoint.rstrip("/")
-            model = self.model.strip()
-            url = f"{endpoint}/voice-live/realtime?api-version=2025-05-01-preview&model={model}"
-            url = url.replace("https://", "wss://")
-
-            headers = {"x-ms-client-request-id": self._generate_guid()}
-
-            if self.client_id:
-                # Use async context manager to auto-close the credential
-                async with ManagedIdentityCredential(client_id=self.client_id) as credential:
-                    token = await credential.get_token(
-                        "https://cognitiveservices.azure.com/.default"
-                    )
-                    headers["Authorization"] = f"Bearer {token.token}"
-                    logger.info("[ACSMediaHandler] Connected to Voice Live API by managed identity")
+            # Start the cached greeting right away; the live session catches up behind it
+            if self.greeting:
+                self.greeting_task = asyncio.create_task(self._play_greeting())
+
+            if self.setup:
+                self.ws = await self._connect_from_setup()
+            if self.ws is None:
+                self.ws = await open_voicelive_connection(
+                    self.endpoint,
+                    self.model,
+                    self.api_key,
+                    self.client_id,
+                    self.connect_options,
+                )
+                logger.info("[ACSMediaHandler] WebSocket connection established")
+                await self._send_json(
+                    self.profile.session_update() if self.profile else session_config()
+                )
+            if self.greeting:
+                # Tell the model its greeting was already spoken instead of generating one
+                await self._send_json(
+                    {
+                        "type": "conversation.item.create",
+                        "item": {
+                            "type": "message",
+                            "role": "assistant",
+                            "content": [
+                                {"type": "text", "text": self.greeting.transcript}
+                            ],
+                        },
+                    }
+                )
             else:
-                headers["api-key"] = self.api_key
-                logger.info("[ACSMediaHandler] Connected to Voice Live API by API key")
-
-            self.ws = await ws_connect(url, additional_headers=headers)
-            logger.info("[ACSMediaHandler] WebSocket connection established")
-
-            await self._send_json(session_config())
-            await self._send_json({"type": "response.create"})
+                await self._send_json({"type": "response.create"})
 
             self.receiver_task = asyncio.create_task(self._receiver_loop())
             self.send_task = asyncio.create_task(self._sender_loop())
+            if self.setup:
+                self.setup.finish()
         except Exception as e:
-            logger.exception("[ACSMediaHandler] Failed to connect to Voice Live API: %s", e)
+            logger.exception(
+                "[ACSMediaHandler] Failed to connect to Voice Live API: %s", e
+            )
             raise
 
-    async def init_incoming_websocket(self, socket: Any, is_raw_audio: bool = True) -> None:
-        """Sets up incoming ACS WebSocket."""
+    async def _connect_from_setup(self) -> Optional[Any]:
+        """Takes over the Voice Live socket opened during call setup, or None to connect afresh."""
+        try:
+            ws = await self.setup.wait()
+        except Exception:
+            logger.warning(
+                "[ACSMediaHandler] Call setup failed; connecting directly",
+                exc_info=True,
+            )
+            return None
+        logger.info(
+            "[ACSMediaHandler] Using Voice Live session prepared during call setup"
+        )
+        return ws
+
+    async def _play_greeting(self) -> None:
+        """Streams the pre-rendered greeting to the client through the normal outbound path."""
+        greeting = self.greeting
+        self._log_conversation_event(
+            "transcript",
+            "assistant",
+            greeting.transcript,
+            {"prerendered_greeting": greeting.key},
+        )
+        # 100ms chunks, the same shape as Voice Live audio deltas
+        chunk_bytes = VOICE_LIVE_SAMPLE_RATE // 10 * 2
+        try:
+            for start in range(0, len(greeting.audio), chunk_bytes):
+                chunk = greeting.audio[start : start + chunk_bytes]
+                await self._on_audio_delta(
+                    {
+                        "type": RESPONSE_AUDIO_DELTA,
+                        "response_id": f"greeting-{greeting.key}",
+                        "delta": base64.b64encode(chunk).decode("ascii"),
+                    }
+                )
+            logger.info("[ACSMediaHandler] Played cached greeting %s", greeting.key)
+        except asyncio.CancelledError:
+            logger.info("[ACSMediaHandler] Cached greeting interrupted")
+            raise
+
+    async def init_incoming_websocket(
+        self,
+        socket: Any,
+        is_raw_audio: bool = True,
+        input_vad: Optional[EnergyVad] = None,
+        codec: str = WEB_CODEC_PCM16,
+    ) -> None:
+        """
+        Sets up incoming ACS WebSocket, optionally gating raw audio with a VAD.
+
+        For raw audio (web clients) the requested codec is confirmed, or
+        replaced by PCM16 if unknown, with an AudioFormat message before any
+        audio is exchanged; it also tells the client the frame length to send.
+        """
         self.incoming_websocket = socket
         self.is_raw_audio = is_raw_audio
+        self.input_vad = input_vad
+        if self.audio_quality and not is_raw_audio:
+            # Caller audio is metered as ACS sends it, before resampling
+            self.audio_quality.set_caller_sample_rate(self.acs_sample_rate)
+
+        if is_raw_audio:
+            if codec not in WEB_AUDIO_CODECS:
+                logger.warning(
+                    "[ACSMediaHandler] Unknown web audio codec %r, using %s",
+                    codec,
+                    WEB_CODEC_PCM16,
+                )
+                codec = WEB_CODEC_PCM16
+            self.web_codec = codec
+            bytes_per_sample = 1 if codec == WEB_CODEC_MULAW else 2
+            self.web_frame_bytes = (
+                VOICE_LIVE_SAMPLE_RATE * self.web_frame_ms // 1000 * bytes_per_sample
+            )
+            await self.send_message(
+                json.dumps(
+                    {
+                        "Kind": "AudioFormat",
+                        "AudioFormat": {
+                            "Codec": codec,
+                            "SampleRate": VOICE_LIVE_SAMPLE_RATE,
+                            "FrameMs": self.web_frame_ms,
+                        },
+                    }
+                )
+            )
+
+        if self.capture_dir:
+            capture_dir = Path(self.capture_dir)
+            capture_dir.mkdir(parents=True, exist_ok=True)
+            timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
+            self.capture = CallCaptureWriter(
+                capture_dir / f"capture_{timestamp}_{self.session_id[:8]}.vlcap",
+                {
+                    "session_id": self.session_id,
+                    "session_start": self.session_start_time.isoformat(),
+                    "is_raw_audio": is_raw_audio,
+                    "web_codec": self.web_codec,
+                    "acs_audio_format": self.acs_audio_format,
+                },
+            )
+
+        if self.recorder:
+            timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
+            self.recording = self.recorder.open(
+                f"recording_{timestamp}_{self.session_id[:8]}"
+            )
+
+        # ACS may stream at a lower rate than Voice Live; bridge the two with stateful resamplers
+        if not is_raw_audio and self.acs_sample_rate != VOICE_LIVE_SAMPLE_RATE:
+            self.inbound_resampler = StreamingResampler(
+                self.acs_sample_rate, VOICE_LIVE_SAMPLE_RATE
+            )
+            self.outbound_resampler = StreamingResampler(
+                VOICE_LIVE_SAMPLE_RATE, self.acs_sample_rate
+            )
+            logger.info(
+                "[ACSMediaHandler] Resampling ACS audio %d Hz <-> Voice Live %d Hz",
+                self.acs_sample_rate,
+                VOICE_LIVE_SAMPLE_RATE,
+            )
 
     async def audio_to_voicelive(self, audio_b64: str) -> None:
         """Queues audio data to be sent to Voice Live API."""
@@ -227,113 +622,173 @@ class ACSMediaHandler:
         """Handles incoming events from the Voice Live WebSocket."""
         try:
             async for message in self.ws:
-                event = json.loads(message)
+                if self.capture:
+                    self.capture.record(DIRECTION_VOICELIVE_IN, message)
+                event = parse_voicelive_event(message)
                 event_type = event.get("type")
 
-                match event_type:
-                    case _ if event_type == SESSION_CREATED:
-                        session_id = event.get("session", {}).get("id")
-                        logger.info("[ACSMediaHandler] Session ID: %s", session_id)
-
-                    case _ if event_type == INPUT_AUDIO_BUFFER_CLEARED:
-                        logger.info("[ACSMediaHandler] Input audio buffer cleared")
-
-                    case _ if event_type == INPUT_AUDIO_BUFFER_SPEECH_STARTED:
-                        audio_start_ms = event.get("audio_start_ms")
-                        logger.info(
-                            "[ACSMediaHandler] Voice activity detection started at %s ms",
-                            audio_start_ms,
-                        )
-                        self._log_conversation_event(
-                            "speech_started",
-                            "user",
-                            "User started speaking",
-                            {"audio_start_ms": audio_start_ms}
-                        )
-                        await self.stop_audio()
-
-                    case _ if event_type == INPUT_AUDIO_BUFFER_SPEECH_STOPPED:
-                        logger.info("[ACSMediaHandler] Speech stopped")
-                        self._log_conversation_event(
-                            "speech_stopped",
-                            "user",
-                            "User stopped speaking",
-                            {}
-                        )
-
-                    case _ if event_type == CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_COMPLETED:
-                        transcript = event.get("transcript")
-                        logger.info("[ACSMediaHandler] User: %s", transcript)
-                        self._log_conversation_event(
-                            "transcript",
-                            "user",
-                            transcript,
-                            {"item_id": event.get("item_id")}
-                        )
-
-                    case _ if event_type == CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_FAILED:
-                        error_msg = event.get("error")
-                        logger.warning("[ACSMediaHandler] Transcription error: %s", error_msg)
-
-                    case _ if event_type == RESPONSE_DONE:
-                        response = event.get("response", {})
-                        logger.info("[ACSMediaHandler] Response done: Id=%s", response.get("id"))
-                        if response.get("status_details"):
-                            logger.info(
-                                "[ACSMediaHandler] Status details: %s",
-                                json.dumps(response["status_details"], indent=2),
-                            )
-
-                    case _ if event_type == RESPONSE_AUDIO_TRANSCRIPT_DONE:
-                        transcript = event.get("transcript")
-                        logger.info("[ACSMediaHandler] AI: %s", transcript)
-                        self._log_conversation_event(
-                            "transcript",
-                            "assistant",
-                            transcript,
-                            {"response_id": event.get("response_id"), "item_id": event.get("item_id")}
-                        )
-                        await self.send_message(
-                            json.dumps({"Kind": "Transcription", "Text": transcript})
-                        )
+                # Audio deltas dominate the stream, so skip the table lookup for them
+                if event_type == RESPONSE_AUDIO_DELTA:
+                    handler = ACSMediaHandler._on_audio_delta
+                else:
+                    handler = self._BUILTIN_EVENT_HANDLERS.get(event_type)
+
+                if handler is not None:
+                    start = time.perf_counter()
+                    await handler(self, event)
+                    DISPATCH_STATS[handler.__qualname__].record(
+                        (time.perf_counter() - start) * 1000
+                    )
 
-                    case _ if event_type == RESPONSE_AUDIO_DELTA:
-                        delta = event.get("delta")
-                        response_id = event.get("response_id")
-
-                        # Track response changes to detect first audio chunk
-                        if response_id != self.current_response_id:
-                            self.current_response_id = response_id
-                            self.is_first_audio_chunk = True
-
-                        if self.is_raw_audio:
-                            audio_bytes = base64.b64decode(delta)
-
-                            # Add silence padding to first chunk to prevent crackling
-                            if self.is_first_audio_chunk:
-                                # 50ms of silence at 24kHz, 16-bit, mono = 2400 samples = 4800 bytes
-                                silence_padding = b'\x00' * 2400
-                                audio_bytes = silence_padding + audio_bytes
-                                self.is_first_audio_chunk = False
-                                logger.debug("[ACSMediaHandler] Added silence padding to first audio chunk")
-
-                            await self.send_message(audio_bytes)
-                        else:
-                            await self.voicelive_to_acs(delta, self.is_first_audio_chunk)
-                            if self.is_first_audio_chunk:
-                                self.is_first_audio_chunk = False
-
-                    case _ if event_type == ERROR:
-                        logger.error("[ACSMediaHandler] Voice Live error: %s", event)
-
-                    case _:
-                        logger.debug("[ACSMediaHandler] Other event: %s", event_type)
+                extra_handlers = EXTRA_EVENT_HANDLERS.get(event_type)
+                if extra_handlers:
+                    await self._run_extra_handlers(extra_handlers, event)
+                elif handler is None:
+                    logger.debug("[ACSMediaHandler] Other event: %s", event_type)
         except asyncio.CancelledError:
             logger.info("[ACSMediaHandler] Receiver loop cancelled")
             raise
         except Exception:
             logger.exception("[ACSMediaHandler] Receiver loop error")
 
+    async def _run_extra_handlers(
+        self, handlers: List[EventHandler], event: Dict[str, Any]
+    ) -> None:
+        """Runs registered extra handlers; a failing handler does not stop the receiver loop."""
+        for handler in handlers:
+            start = time.perf_counter()
+            try:
+                await handler(self, event)
+            except Exception:
+                logger.exception(
+                    "[ACSMediaHandler] Event handler %s failed", handler.__qualname__
+                )
+            DISPATCH_STATS[handler.__qualname__].record(
+                (time.perf_counter() - start) * 1000
+            )
+
+    async def _on_session_created(self, event: Dict[str, Any]) -> None:
+        session_id = event.get("session", {}).get("id")
+        logger.info("[ACSMediaHandler] Session ID: %s", session_id)
+
+    async def _on_input_audio_buffer_cleared(self, event: Dict[str, Any]) -> None:
+        logger.info("[ACSMediaHandler] Input audio buffer cleared")
+
+    async def _on_speech_started(self, event: Dict[str, Any]) -> None:
+        self.live_metrics.speech_started()
+        audio_start_ms = event.get("audio_start_ms")
+        logger.info(
+            "[ACSMediaHandler] Voice activity detection started at %s ms",
+            audio_start_ms,
+        )
+        self._log_conversation_event(
+            "speech_started",
+            "user",
+            "User started speaking",
+            {"audio_start_ms": audio_start_ms},
+        )
+        if self.greeting_task and not self.greeting_task.done():
+            self.greeting_task.cancel()
+        await self.stop_audio()
+
+    async def _on_speech_stopped(self, event: Dict[str, Any]) -> None:
+        self.live_metrics.speech_stopped()
+        logger.info("[ACSMediaHandler] Speech stopped")
+        self._log_conversation_event(
+            "speech_stopped",
+            "user",
+            "User stopped speaking",
+        )
+
+    async def _on_input_transcription_completed(self, event: Dict[str, Any]) -> None:
+        transcript = event.get("transcript")
+        logger.info("[ACSMediaHandler] User: %s", transcript)
+        self._log_conversation_event(
+            "transcript", "user", transcript, {"item_id": event.get("item_id")}
+        )
+
+    async def _on_input_transcription_failed(self, event: Dict[str, Any]) -> None:
+        error_msg = event.get("error")
+        logger.warning("[ACSMediaHandler] Transcription error: %s", error_msg)
+
+    async def _on_response_done(self, event: Dict[str, Any]) -> None:
+        response = event.get("response", {})
+        logger.info("[ACSMediaHandler] Response done: Id=%s", response.get("id"))
+        if response.get("status_details"):
+            logger.info(
+                "[ACSMediaHandler] Status details: %s",
+                response["status_details"],
+            )
+
+    async def _on_response_audio_transcript_done(self, event: Dict[str, Any]) -> None:
+        transcript = event.get("transcript")
+        logger.info("[ACSMediaHandler] AI: %s", transcript)
+        self._log_conversation_event(
+            "transcript",
+            "assistant",
+            transcript,
+            {"response_id": event.get("response_id"), "item_id": event.get("item_id")},
+        )
+        await self.send_message(
+            json.dumps({"Kind": "Transcription", "Text": transcript})
+        )
+
+    async def _on_audio_delta(self, event: Dict[str, Any]) -> None:
+        delta = event.get("delta")
+        response_id = event.get("response_id")
+        # Base64 length gives the PCM16 duration without decoding
+        self.live_metrics.assistant_audio(
+            response_id, len(delta or "") * 3 / 4 / (2 * VOICE_LIVE_SAMPLE_RATE)
+        )
+
+        # Track response changes to detect first audio chunk
+        if response_id != self.current_response_id:
+            self.current_response_id = response_id
+            self.is_first_audio_chunk = True
+
+        if self.recording and delta:
+            self.recording.assistant(delta)
+        if self.audio_quality and delta:
+            self.audio_quality.assistant_audio(delta)
+
+        if self.is_raw_audio:
+            audio_bytes = base64.b64decode(delta)
+
+            # Add silence padding to first chunk to prevent crackling
+            if self.is_first_audio_chunk:
+                # 50ms of silence at 24kHz, 16-bit, mono = 2400 samples = 4800 bytes
+                silence_padding = b"\x00" * 2400
+                audio_bytes = silence_padding + audio_bytes
+                self.is_first_audio_chunk = False
+                logger.debug(
+                    "[ACSMediaHandler] Added silence padding to first audio chunk"
+                )
+
+            if self.web_codec == WEB_CODEC_MULAW:
+                audio_bytes = mulaw_encode(audio_bytes)
+            await self.send_message(audio_bytes)
+        else:
+            await self.voicelive_to_acs(delta, self.is_first_audio_chunk)
+            if self.is_first_audio_chunk:
+                self.is_first_audio_chunk = False
+
+    async def _on_error(self, event: Dict[str, Any]) -> None:
+        logger.error("[ACSMediaHandler] Voice Live error: %s", event)
+
+    # Built-in dispatch table for Voice Live events; extra handlers go through register_event_handler
+    _BUILTIN_EVENT_HANDLERS: Dict[str, EventHandler] = {
+        SESSION_CREATED: _on_session_created,
+        INPUT_AUDIO_BUFFER_CLEARED: _on_input_audio_buffer_cleared,
+        INPUT_AUDIO_BUFFER_SPEECH_STARTED: _on_speech_started,
+        INPUT_AUDIO_BUFFER_SPEECH_STOPPED: _on_speech_stopped,
+        CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_COMPLETED: _on_input_transcription_completed,
+        CONVERSATION_ITEM_INPUT_AUDIO_TRANSCRIPTION_FAILED: _on_input_transcription_failed,
+        RESPONSE_DONE: _on_response_done,
+        RESPONSE_AUDIO_TRANSCRIPT_DONE: _on_response_audio_transcript_done,
+        RESPONSE_AUDIO_DELTA: _on_audio_delta,
+        ERROR: _on_error,
+    }
+
     async def send_message(self, message: Data) -> None:
         """Sends data back to client WebSocket."""
         try:
@@ -341,17 +796,26 @@ class ACSMediaHandler:
         except Exception:
             logger.exception("[ACSMediaHandler] Failed to send message")
 
-    async def voicelive_to_acs(self, base64_data: str, add_padding: bool = False) -> None:
+    async def voicelive_to_acs(
+        self, base64_data: str, add_padding: bool = False
+    ) -> None:
         """Converts Voice Live audio delta to ACS audio message."""
         try:
             # Add silence padding to first chunk if requested
-            if add_padding:
+            if add_padding or self.outbound_resampler:
                 audio_bytes = base64.b64decode(base64_data)
-                # 50ms of silence at 24kHz, 16-bit, mono = 2400 samples = 4800 bytes
-                silence_padding = b'\x00' * 2400
-                audio_bytes = silence_padding + audio_bytes
-                base64_data = base64.b64encode(audio_bytes).decode('utf-8')
-                logger.debug("[ACSMediaHandler] Added silence padding to first ACS audio chunk")
+                if add_padding:
+                    # 50ms of silence at 24kHz, 16-bit, mono = 2400 samples = 4800 bytes
+                    silence_padding = b"\x00" * 2400
+                    audio_bytes = silence_padding + audio_bytes
+                    logger.debug(
+                        "[ACSMediaHandler] Added silence padding to first ACS audio chunk"
+                    )
+                if self.outbound_resampler:
+                    if add_padding:
+                        self.outbound_resampler.reset()
+                    audio_bytes = self.outbound_resampler.process(audio_bytes)
+                base64_data = base64.b64encode(audio_bytes).decode("utf-8")
 
             data = {
                 "Kind": "AudioData",
@@ -364,22 +828,67 @@ class ACSMediaHandler:
 
     async def stop_audio(self) -> None:
         """Sends a StopAudio signal to ACS."""
+        if self.recording:
+            self.recording.truncate_assistant()
         stop_audio_data = {"Kind": "StopAudio", "AudioData": None, "StopAudio": {}}
         await self.send_message(json.dumps(stop_audio_data))
 
     async def acs_to_voicelive(self, stream_data: str) -> None:
         """Processes audio from ACS and forwards to Voice Live if not silent."""
+        if self.capture:
+            self.capture.record(DIRECTION_CLIENT_IN, stream_data)
         try:
             data = json.loads(stream_data)
             if data.get("kind") == "AudioData":
                 audio_data = data.get("audioData", {})
+                # Metered before the silence check so frames ACS marks silent count towards the silence ratio
+                if self.audio_quality and audio_data.get("data"):
+                    self.audio_quality.caller_audio(
+                        audio_data["data"], bool(audio_data.get("silent"))
+                    )
                 if not audio_data.get("silent", True):
-                    await self.audio_to_voicelive(audio_data.get("data"))
+                    audio_b64 = audio_data.get("data")
+                    if self.inbound_resampler:
+                        audio_bytes = self.inbound_resampler.process(
+                            base64.b64decode(audio_b64)
+                        )
+                        audio_b64 = base64.b64encode(audio_bytes).decode("ascii")
+                    if self.recording:
+                        self.recording.caller(audio_b64)
+                    await self.audio_to_voicelive(audio_b64)
         except Exception:
             logger.exception("[ACSMediaHandler] Error processing ACS audio")
 
     async def web_to_voicelive(self, audio_bytes: bytes) -> None:
-        """Encodes raw audio bytes and sends to Voice Live API."""
+        """Encodes raw audio bytes and sends to Voice Live API, dropping silence if gated."""
+        if self.capture:
+            self.capture.record(DIRECTION_CLIENT_IN, audio_bytes)
+        if not isinstance(audio_bytes, (bytes, bytearray)):
+            logger.warning("[ACSMediaHandler] Ignoring non-binary web message")
+            return
+        if len(audio_bytes) != self.web_frame_bytes:
+            self.web_frame_mismatches += 1
+            if self.web_frame_mismatches == 1:
+                logger.warning(
+                    "[ACSMediaHandler] Web audio frame of %d bytes, expected %d (%d ms of %s)",
+                    len(audio_bytes),
+                    self.web_frame_bytes,
+                    self.web_frame_ms,
+                    self.web_codec,
+                )
+            if self.web_codec == WEB_CODEC_PCM16 and len(audio_bytes) % 2:
+                # A split sample would shift every later sample by one byte
+                audio_bytes = audio_bytes[:-1]
+        if self.web_codec == WEB_CODEC_MULAW:
+            audio_bytes = mulaw_decode(audio_bytes)
+        if self.audio_quality:
+            self.audio_quality.caller_audio(audio_bytes)
+        if self.recording:
+            self.recording.caller(audio_bytes)
+        if self.input_vad:
+            audio_bytes = self.input_vad.process(audio_bytes)
+            if not audio_bytes:
+                return
         audio_b64 = base64.b64encode(audio_bytes).decode("ascii")
         await self.audio_to_voicelive(audio_b64)
 
@@ -409,7 +918,14 @@ class ACSMediaHandler:
             "total_events": len(self.conversation_log),
             "model": self.model,
             "endpoint": self.endpoint,
-            "conversation": self.conversation_log
+            "profile": self.profile.name if self.profile else "default",
+            "recording": self.recording.path.name if self.recording else None,
+            "audio_quality": self.audio_quality.summary()
+            if self.audio_quality
+            else None,
+            "conversation": [
+                self._conversation_event_dict(event) for event in self.conversation_log
+            ],
         }
 
         conversation_json = json.dumps(conversation_data, indent=2, ensure_ascii=False)
@@ -417,57 +933,94 @@ class ACSMediaHandler:
         # Save to Azure Blob Storage if configured
         if self.storage_account_url and self.client_id:
             try:
-                async with ManagedIdentityCredential(client_id=self.client_id) as credential:
-                    async with BlobServiceClient(
-                        account_url=self.storage_account_url,
-                        credential=credential
-                    ) as blob_service_client:
-                        container_client = blob_service_client.get_container_client(self.storage_container)
-
-                        # Create container if it doesn't exist
-                        try:
-                            await container_client.create_container()
-                            logger.info("[ACSMediaHandler] Created container: %s", self.storage_container)
-                        except Exception:
-                            pass  # Container already exists
-
-                        # Upload blob
-                        blob_client = container_client.get_blob_client(filename)
-                        await blob_client.upload_blob(
-                            conversation_json.encode('utf-8'),
-                            overwrite=True,
-                            content_settings=ContentSettings(content_type='application/json')
+                # Imported on first use; the startup warm-up loads it off the event loop
+                from azure.storage.blob import ContentSettings
+                from azure.storage.blob.aio import BlobServiceClient
+
+                async with BlobServiceClient(
+                    account_url=self.storage_account_url,
+                    credential=managed_identity_credential(self.client_id),
+                ) as blob_service_client:
+                    container_client = blob_service_client.get_container_client(
+                        self.storage_container
+                    )
+
+                    # Create container if it doesn't exist
+                    try:
+                        await container_client.create_container()
+                        logger.info(
+                            "[ACSMediaHandler] Created container: %s",
+                            self.storage_container,
                         )
-                        logger.info("[ACSMediaHandler] Conversation log saved to blob storage: %s/%s",
-                                   self.storage_container, filename)
+                    except Exception:
+                        pass  # Container already exists
+
+                    # Upload blob
+                    blob_client = container_client.get_blob_client(filename)
+                    await blob_client.upload_blob(
+                        conversation_json.encode("utf-8"),
+                        overwrite=True,
+                        content_settings=ContentSettings(
+                            content_type="application/json"
+                        ),
+                    )
+                    logger.info(
+                        "[ACSMediaHandler] Conversation log saved to blob storage: %s/%s",
+                        self.storage_container,
+                        filename,
+                    )
             except Exception as e:
-                logger.exception("[ACSMediaHandler] Error saving to blob storage: %s", e)
+                logger.exception(
+                    "[ACSMediaHandler] Error saving to blob storage: %s", e
+                )
 
         # Also save locally for development/debugging
         try:
-            handler_dir = Path(__file__).parent
-            logs_dir = handler_dir.parent.parent / "conversation_logs"
-            logs_dir.mkdir(exist_ok=True)
+            logs_dir = self.conversation_log_dir
+            logs_dir.mkdir(parents=True, exist_ok=True)
             log_path = logs_dir / filename
 
             with open(log_path, "w", encoding="utf-8") as f:
                 f.write(conversation_json)
 
-            logger.info("[ACSMediaHandler] Conversation log saved locally: %s", log_path)
+            logger.info(
+                "[ACSMediaHandler] Conversation log saved locally: %s", log_path
+            )
             return log_path
 
         except Exception as e:
-            logger.exception("[ACSMediaHandler] Error saving local conversation log: %s", e)
+            logger.exception(
+                "[ACSMediaHandler] Error saving local conversation log: %s", e
+            )
             return None
 
     async def close(self) -> None:
         """Closes WebSocket connection and cancels background tasks."""
         logger.info("[ACSMediaHandler] Closing handler")
 
+        if self.input_vad:
+            logger.info("[ACSMediaHandler] Input VAD stats: %s", self.input_vad.stats())
+
+        if self.web_frame_mismatches:
+            logger.warning(
+                "[ACSMediaHandler] %d web audio frames did not match the %d-byte frame length",
+                self.web_frame_mismatches,
+                self.web_frame_bytes,
+            )
+
+        if self.capture:
+            self.capture.close()
+
+        if self.recording:
+            self.recording.close()
+
         # Save conversation log before closing
         await self.save_conversation_log()
 
         # Cancel background tasks
+        if self.greeting_task and not self.greeting_task.done():
+            self.greeting_task.cancel()
+
         if self.send_task and not self.send_task.done():
             self.send_task.cancel()
             try:
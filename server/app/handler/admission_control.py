@@ -0,0 +1,124 @@
+"""Per-instance admission control for incoming calls."""
+
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.handler.session_registry import SessionRegistry
+from app.monitoring.loop_monitor import LoopLagMonitor
+
+logger = logging.getLogger(__name__)
+
+# Shed reasons reported in logs and metrics
+SHED_MAX_SESSIONS = "max_sessions"
+SHED_LOOP_LAG = "loop_lag"
+
+
+class AdmissionController:
+    """
+    Decides whether this instance can take another call before it is answered.
+
+    Load is the number of active media sessions plus calls answered recently
+    whose media WebSocket has not arrived yet. Those pending reservations are
+    consumed as media sessions register and expire after
+    ``ADMISSION_PENDING_TTL_SECONDS`` if the socket never shows up.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        registry: SessionRegistry,
+        loop_monitor: LoopLagMonitor,
+    ):
+        self.registry = registry
+        self.loop_monitor = loop_monitor
+        self.max_sessions: int = int(config.get("MAX_CONCURRENT_SESSIONS", 0))
+        self.max_loop_lag_ms: float = float(config.get("MAX_LOOP_LAG_MS", 0))
+        self.pending_ttl: float = float(config.get("ADMISSION_PENDING_TTL_SECONDS", 30))
+        # Reservation token -> expiry, oldest first
+        self._pending: "OrderedDict[int, float]" = OrderedDict()
+        self._tokens = itertools.count()
+        self.accepted_count: int = 0
+        self.shed_count: int = 0
+        self.shed_by_reason: Dict[str, int] = {SHED_MAX_SESSIONS: 0, SHED_LOOP_LAG: 0}
+
+    @property
+    def pending_sessions(self) -> int:
+        """Calls answered but not yet streaming media."""
+        self._expire_pending()
+        return len(self._pending)
+
+    def check(self) -> Optional[str]:
+        """
+        Checks whether a new call should be admitted.
+
+        Returns:
+            None to admit the call, or the reason it should be shed
+        """
+        if (
+            self.max_sessions > 0
+            and len(self.registry) + self.pending_sessions >= self.max_sessions
+        ):
+            return SHED_MAX_SESSIONS
+        if (
+            self.max_loop_lag_ms > 0
+            and self.loop_monitor.smoothed_lag_ms >= self.max_loop_lag_ms
+        ):
+            return SHED_LOOP_LAG
+        return None
+
+    def reserve(self) -> int:
+        """
+        Counts an admitted call against capacity until its media session starts.
+
+        Returns:
+            A token identifying the reservation, for ``release``
+        """
+        self.accepted_count += 1
+        token = next(self._tokens)
+        self._pending[token] = time.monotonic() + self.pending_ttl
+        return token
+
+    def release(self, token: int) -> None:
+        """Returns a call's reservation, e.g. when answering it failed."""
+        self.accepted_count -= 1
+        # Already gone if it expired or was taken by a media session
+        self._pending.pop(token, None)
+
+    def session_started(self) -> None:
+        """Converts the oldest pending reservation into an active session."""
+        self._expire_pending()
+        if self._pending:
+            self._pending.popitem(last=False)
+
+    def record_shed(self, reason: str) -> None:
+        """Counts and logs a shed call."""
+        self.shed_count += 1
+        self.shed_by_reason[reason] = self.shed_by_reason.get(reason, 0) + 1
+        logger.warning(
+            "[AdmissionController] Shedding call (%s): active=%d pending=%d loop_lag=%.1fms shed_total=%d",
+            reason,
+            len(self.registry),
+            len(self._pending),
+            self.loop_monitor.smoothed_lag_ms,
+            self.shed_count,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns admission counters for the metrics endpoint."""
+        return {
+            "active_sessions": len(self.registry),
+            "pending_sessions": self.pending_sessions,
+            "max_sessions": self.max_sessions,
+            "max_loop_lag_ms": self.max_loop_lag_ms,
+            "accepted": self.accepted_count,
+            "shed": self.shed_count,
+            "shed_by_reason": dict(self.shed_by_reason),
+        }
+
+    def _expire_pending(self) -> None:
+        now = time.monotonic()
+        while self._pending and next(iter(self._pending.values())) <= now:
+            self._pending.popitem(last=False)
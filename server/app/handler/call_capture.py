@@ -0,0 +1,195 @@
+"""Compact binary capture of a call's media traffic for offline replay."""
+
+import atexit
+import json
+import logging
+import mmap
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"VLCAP001"
+# magic, header length
+FILE_HEADER = struct.Struct("<8sI")
+# direction, is_text, seconds since capture start, payload length
+RECORD_HEADER = struct.Struct("<BBdI")
+
+# Record directions
+DIRECTION_CLIENT_IN = (
+    0  # ACS JSON frame or raw web audio received from the client socket
+)
+DIRECTION_VOICELIVE_IN = 1  # Message received from Voice Live
+
+WRITE_BUFFER_BYTES = 256 * 1024
+# Records waiting for the capture thread, across all calls; more are dropped and counted
+MAX_QUEUED_RECORDS = 20000
+
+_OPEN, _RECORD, _CLOSE = range(3)
+
+
+class CaptureRecord(NamedTuple):
+    """One captured message."""
+
+    direction: int
+    offset: float
+    payload: Union[str, bytes]
+
+
+class CallCaptureWriter:
+    """
+    Appends timestamped client and Voice Live messages to a capture file.
+
+    ``record`` only timestamps the message and queues a reference to it;
+    encoding and file I/O happen on the shared capture thread. If that
+    thread falls ``MAX_QUEUED_RECORDS`` behind, records are dropped and
+    counted rather than stalling the call, and the capture will not replay
+    exactly.
+    """
+
+    def __init__(self, path: Path, metadata: Dict[str, Any]):
+        self.path = path
+        self.records = 0
+        self.dropped = 0
+        self._start = time.monotonic()
+        self._closed = False
+        # Owned by the capture thread
+        self._file = None
+        self._writer = _capture_thread()
+        self._writer.queue.put((self, _OPEN, metadata))
+
+    def record(self, direction: int, payload: Union[str, bytes]) -> None:
+        """Queues one message with its offset from the start of the capture."""
+        if self._closed:
+            return
+        if self._writer.queue.qsize() >= MAX_QUEUED_RECORDS:
+            self.dropped += 1
+            return
+        self._writer.queue.put(
+            (self, _RECORD, (direction, time.monotonic() - self._start, payload))
+        )
+        self.records += 1
+
+    def close(self) -> None:
+        """Queues the flush and close of the capture file."""
+        if not self._closed:
+            self._closed = True
+            self._writer.queue.put((self, _CLOSE, None))
+
+    # Called on the capture thread
+    def _open(self, metadata: Dict[str, Any]) -> None:
+        self._file = open(self.path, "wb", buffering=WRITE_BUFFER_BYTES)
+        header = json.dumps(metadata).encode("utf-8")
+        self._file.write(FILE_HEADER.pack(CAPTURE_MAGIC, len(header)))
+        self._file.write(header)
+
+    def _write(self, direction: int, offset: float, payload: Union[str, bytes]) -> None:
+        if self._file is None:
+            return
+        is_text = isinstance(payload, str)
+        data = payload.encode("utf-8") if is_text else payload
+        self._file.write(RECORD_HEADER.pack(direction, is_text, offset, len(data)))
+        self._file.write(data)
+
+    def _finish(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(
+                "[CallCapture] Wrote %d records to %s (%d dropped)",
+                self.records,
+                self.path,
+                self.dropped,
+            )
+
+
+class _CaptureThread:
+    """Background thread doing the file I/O for every call's capture."""
+
+    def __init__(self):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="call-capture", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Writes everything queued, closes open captures and stops the thread."""
+        self.queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        open_captures = set()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            capture, op, payload = item
+            try:
+                if op == _RECORD:
+                    capture._write(*payload)
+                elif op == _OPEN:
+                    open_captures.add(capture)
+                    capture._open(payload)
+                else:
+                    open_captures.discard(capture)
+                    capture._finish()
+            except Exception:
+                logger.exception("[CallCapture] Capture %s failed", capture.path)
+                open_captures.discard(capture)
+                if capture._file is not None:
+                    capture._file.close()
+                    capture._file = None
+
+        # Calls still running at shutdown keep what was captured so far
+        for capture in open_captures:
+            capture._finish()
+
+
+_capture_writer: Optional[_CaptureThread] = None
+
+
+def _capture_thread() -> _CaptureThread:
+    global _capture_writer
+    if _capture_writer is None:
+        _capture_writer = _CaptureThread()
+    return _capture_writer
+
+
+class CallCaptureReader:
+    """Memory-maps a capture file and iterates its records."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = FILE_HEADER.unpack_from(self._mmap, 0)
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not a call capture file")
+        self._data_start = FILE_HEADER.size + header_len
+        self.metadata: Dict[str, Any] = json.loads(
+            self._mmap[FILE_HEADER.size : self._data_start]
+        )
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        position = self._data_start
+        end = len(self._mmap)
+        while position + RECORD_HEADER.size <= end:
+            direction, is_text, offset, length = RECORD_HEADER.unpack_from(
+                self._mmap, position
+            )
+            position += RECORD_HEADER.size
+            data = self._mmap[position : position + length]
+            position += length
+            yield CaptureRecord(
+                direction, offset, data.decode("utf-8") if is_text else data
+            )
+
+    def close(self) -> None:
+        """Releases the memory map."""
+        self._mmap.close()
@@ -0,0 +1,270 @@
+"""Concurrent Voice Live session setup, started when an ACS call is answered."""
+
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from app.handler.acs_media_handler import (
+    session_config,
+    voicelive_headers,
+    voicelive_url,
+)
+from app.handler.session_profiles import SessionProfile, SessionProfiles
+from app.monitoring.metrics import TimingStats, timing_table
+from websockets.asyncio.client import connect as ws_connect
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Longest caller context appended to the instructions
+MAX_CALLER_CONTEXT_CHARS = 2000
+
+# Process-wide duration of each setup stage
+SETUP_STATS: Dict[str, TimingStats] = defaultdict(TimingStats)
+
+
+def setup_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns per-stage call setup timings for the metrics endpoint."""
+    return timing_table(SETUP_STATS)
+
+
+class CallSetup:
+    """
+    Prepares one call's Voice Live session while ACS is still answering.
+
+    Credential acquisition, prompt loading and the caller-context lookup run
+    concurrently; the Voice Live WebSocket is opened as soon as the
+    credential is ready and receives ``session.update`` once the prompt and
+    caller context are in. The media handler picks up the configured socket
+    when the ACS media WebSocket arrives.
+    """
+
+    def __init__(
+        self,
+        context_id: str,
+        caller_id: str,
+        config: Dict[str, Any],
+        http_client: Optional["httpx.AsyncClient"],
+        profile: Optional[SessionProfile] = None,
+    ):
+        self.context_id = context_id
+        self.caller_id = caller_id
+        self.profile = profile
+        self.started = time.perf_counter()
+        # Stage name -> duration in milliseconds
+        self.stages: Dict[str, float] = {}
+        # Timer dropping the setup if the media WebSocket never claims it
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self._task = asyncio.create_task(self._run(config, http_client))
+
+    async def _timed(self, stage: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[stage] = (time.perf_counter() - start) * 1000
+
+    async def _run(
+        self, config: Dict[str, Any], http_client: Optional["httpx.AsyncClient"]
+    ) -> Any:
+        headers_task = asyncio.create_task(
+            self._timed(
+                "credential",
+                voicelive_headers(
+                    config["AZURE_VOICE_LIVE_API_KEY"],
+                    config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"],
+                ),
+            )
+        )
+        build_session_update = (
+            self.profile.session_update if self.profile else session_config
+        )
+        prompt_task = asyncio.create_task(
+            self._timed("prompt", asyncio.to_thread(build_session_update))
+        )
+        caller_task = asyncio.create_task(
+            self._timed("caller_context", self._lookup_caller(config, http_client))
+        )
+        try:
+            headers = await headers_task
+            ws = await self._timed(
+                "voicelive_connect",
+                ws_connect(
+                    voicelive_url(
+                        config["AZURE_VOICE_LIVE_ENDPOINT"], config["VOICE_LIVE_MODEL"]
+                    ),
+                    additional_headers=headers,
+                    **(config.get("VOICELIVE_CONNECT_OPTIONS") or {}),
+                ),
+            )
+        except BaseException:
+            prompt_task.cancel()
+            caller_task.cancel()
+            raise
+
+        try:
+            session_update, caller_context = await asyncio.gather(
+                prompt_task, caller_task
+            )
+            if caller_context:
+                session_update["session"]["instructions"] += (
+                    f"\n\nCaller context:\n{caller_context}"
+                )
+            await self._timed("session_update", ws.send(json.dumps(session_update)))
+        except BaseException:
+            await ws.close()
+            raise
+        return ws
+
+    async def _lookup_caller(
+        self, config: Dict[str, Any], http_client: Optional["httpx.AsyncClient"]
+    ) -> Optional[str]:
+        """Fetches caller context from CALLER_CONTEXT_URL; failures only lose the context."""
+        url = config.get("CALLER_CONTEXT_URL")
+        if not url or http_client is None:
+            return None
+        try:
+            response = await http_client.get(url, params={"callerId": self.caller_id})
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(
+                "[CallSetup] Caller context lookup failed for %s: %s",
+                self.context_id,
+                e,
+            )
+            return None
+        if "json" in response.headers.get("content-type", ""):
+            context = json.dumps(response.json(), ensure_ascii=False)
+        else:
+            context = response.text.strip()
+        return context[:MAX_CALLER_CONTEXT_CHARS] or None
+
+    def mark(self, stage: str) -> None:
+        """Records the time from the start of setup to a milestone, e.g. the media WebSocket arriving."""
+        self.stages[stage] = (time.perf_counter() - self.started) * 1000
+
+    async def wait(self) -> Any:
+        """Returns the Voice Live WebSocket with the session already configured."""
+        return await self._task
+
+    def finish(self) -> None:
+        """Logs the per-stage breakdown and adds it to the setup metrics."""
+        self.mark("total")
+        for stage, elapsed_ms in self.stages.items():
+            SETUP_STATS[stage].record(elapsed_ms)
+        logger.info(
+            "[CallSetup] %s stages: %s",
+            self.context_id,
+            " ".join(
+                f"{stage}={elapsed_ms:.0f}ms"
+                for stage, elapsed_ms in self.stages.items()
+            ),
+        )
+
+    async def cancel(self) -> None:
+        """Abandons the setup, closing the Voice Live socket if it was opened."""
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except BaseException:
+                pass
+        elif not self._task.cancelled() and self._task.exception() is None:
+            await self._task.result().close()
+
+
+class CallSetupManager:
+    """Tracks setups from answer time until the call's media WebSocket claims them."""
+
+    def __init__(
+        self, config: Dict[str, Any], profiles: Optional[SessionProfiles] = None
+    ):
+        self.config = config
+        self.profiles = profiles
+        self.enabled = bool(
+            config.get("CALL_SETUP_PREPARE", True)
+            and config.get("AZURE_VOICE_LIVE_ENDPOINT")
+        )
+        self.ttl_seconds = float(config.get("CALL_SETUP_TTL_SECONDS", 60))
+        self.expired = 0
+        self._pending: Dict[str, CallSetup] = {}
+        self._http_client: Optional["httpx.AsyncClient"] = None
+
+    def _client(self) -> Optional["httpx.AsyncClient"]:
+        if not self.config.get("CALLER_CONTEXT_URL"):
+            return None
+        if self._http_client is None:
+            # Only needed with CALLER_CONTEXT_URL, so kept out of startup imports
+            import httpx
+
+            self._http_client = httpx.AsyncClient(
+                timeout=float(self.config.get("CALLER_CONTEXT_TIMEOUT_SECONDS", 2))
+            )
+        return self._http_client
+
+    def prepare(self) -> None:
+        """Creates the caller-context HTTP client ahead of the first call."""
+        self._client()
+
+    def start(self, context_id: str, caller_id: str) -> Optional[CallSetup]:
+        """Starts preparing the session for a call being answered, unless disabled."""
+        if not self.enabled:
+            return None
+        profile = self.profiles.assign(caller_id) if self.profiles else None
+        setup = CallSetup(context_id, caller_id, self.config, self._client(), profile)
+        # Per-setup timer, so an unclaimed socket is closed even if no further calls arrive
+        setup.expiry = asyncio.get_running_loop().call_later(
+            self.ttl_seconds, self._expire, context_id
+        )
+        self._pending[context_id] = setup
+        return setup
+
+    def claim(self, context_id: Optional[str]) -> Optional[CallSetup]:
+        """Hands the setup for a context ID to the media WebSocket, if there is one."""
+        setup = self._pending.pop(context_id, None) if context_id else None
+        if setup:
+            setup.expiry.cancel()
+            setup.mark("acs_websocket")
+        return setup
+
+    async def discard(self, context_id: str) -> None:
+        """Drops the setup for a call that was not answered or ended before its media WebSocket arrived."""
+        setup = self._pending.pop(context_id, None)
+        if setup:
+            setup.expiry.cancel()
+            logger.info(
+                "[CallSetup] %s discarded before its media WebSocket arrived",
+                context_id,
+            )
+            await setup.cancel()
+
+    def _expire(self, context_id: str) -> None:
+        setup = self._pending.pop(context_id, None)
+        if setup:
+            self.expired += 1
+            logger.warning(
+                "[CallSetup] %s expired before its media WebSocket arrived", context_id
+            )
+            asyncio.create_task(setup.cancel())
+
+    async def close(self) -> None:
+        """Cancels pending setups and closes the HTTP client."""
+        for context_id in list(self._pending):
+            await self.discard(context_id)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pending and expired setups plus per-stage timings."""
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "expired": self.expired,
+            "stages": setup_stats(),
+        }
@@ -0,0 +1,291 @@
+"""Call metadata shared by the webhook, callback and media WebSocket handlers across replicas."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.monitoring.metrics import TimingStats
+
+logger = logging.getLogger(__name__)
+
+# Identifies this instance in call state; Azure Container Apps sets the replica name
+REPLICA_NAME = os.getenv("CONTAINER_APP_REPLICA_NAME") or socket.gethostname()
+
+# Pause before retrying a failed flush, so an unreachable server is not hammered
+FLUSH_RETRY_SECONDS = 1.0
+
+# Call lifecycle order; ``status`` never moves back to an earlier stage, whatever
+# order the webhook, callback workers and other replicas write it in
+CALL_STATUS_RANKS = {
+    "answering": 0,
+    "answered": 1,
+    "connected": 2,
+    "streaming": 3,
+    "streaming_stopped": 4,
+    "streaming_failed": 4,
+    "answer_failed": 5,
+    "disconnected": 5,
+}
+# Redis field holding the status of each rank, e.g. status:5
+RANKED_STATUS_PREFIX = "status:"
+
+
+def status_rank(status: Optional[str]) -> int:
+    """Position of a status in the call lifecycle; -1 for none."""
+    if status is None:
+        return -1
+    return CALL_STATUS_RANKS.get(status, 0)
+
+
+class InMemoryCallStateStore:
+    """
+    Process-local call state, keyed by the call's context ID.
+
+    Only correct with a single replica (or sticky routing); it is the default
+    and the reference behaviour for other backends. Values are strings; a
+    ``status`` of a lower lifecycle rank than the current one is ignored.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._calls: Dict[str, Dict[str, str]] = {}
+        self._expires: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        """Nothing to connect."""
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+    async def set(self, context_id: str, fields: Dict[str, str]) -> None:
+        """Merges fields into the call's state and refreshes its expiry."""
+        now = time.monotonic()
+        if len(self._calls) % 256 == 0:
+            self._expire(now)
+        state = self._calls.setdefault(context_id, {})
+        if status_rank(fields.get("status")) < status_rank(state.get("status")):
+            fields = {key: value for key, value in fields.items() if key != "status"}
+        state.update(fields)
+        self._expires[context_id] = now + self.ttl_seconds
+
+    async def get(self, context_id: str) -> Optional[Dict[str, str]]:
+        """Returns a copy of the call's state, or None if unknown or expired."""
+        if self._expires.get(context_id, 0.0) < time.monotonic():
+            return None
+        return dict(self._calls[context_id])
+
+    def _expire(self, now: float) -> None:
+        for context_id, expires in list(self._expires.items()):
+            if expires < now:
+                del self._expires[context_id]
+                del self._calls[context_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name and number of calls held."""
+        return {"backend": "memory", "calls": len(self._calls)}
+
+
+class RedisCallStateStore:
+    """
+    Call state in Redis (or any server speaking its protocol), one hash per call.
+
+    Writes are write-behind: ``set`` merges fields into a local pending map
+    and returns without network I/O, and a background task flushes all
+    pending calls every ``flush_interval_ms`` in one pipelined round trip
+    (HSET + EXPIRE per call). A failed batch is merged back into the pending
+    map under any newer writes and retried. ``get`` is an HGETALL, pipelined with any
+    other reads issued meanwhile, with fields not yet written overlaid so a
+    replica always sees its own writes.
+
+    ``status`` is stored in one field per lifecycle rank (``status:<rank>``)
+    and read back as the highest rank present, so concurrent or reordered
+    writes from several replicas can only move a call forward.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: float = 3600,
+        flush_interval_ms: float = 2,
+        key_prefix: str = "callstate:",
+    ):
+        self.url = url
+        self.ttl_seconds = int(ttl_seconds)
+        self.flush_interval = flush_interval_ms / 1000
+        self.key_prefix = key_prefix
+        self.writes = 0
+        self.errors = 0
+        self.flush_stats = TimingStats()
+        self.read_stats = TimingStats()
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._flushing: Dict[str, Dict[str, str]] = {}
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._flusher: Optional[asyncio.Task] = None
+        self._reads: List[Tuple[str, asyncio.Future]] = []
+        self._reader: Optional[asyncio.Task] = None
+        self._redis = None
+
+    async def start(self) -> None:
+        """Creates the client and starts the background flusher."""
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CALL_STATE_BACKEND=redis needs the redis extra (uv sync --extra redis)"
+            ) from e
+        # RESP2 is understood by every Redis-compatible server and client version
+        self._redis = redis.from_url(self.url, decode_responses=True, protocol=2)
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Flushes pending writes and closes the client."""
+        # Stopped by flag rather than cancel(): redis-py can swallow a cancellation mid-pipeline
+        self._closed = True
+        self._wake.set()
+        if self._flusher:
+            await self._flusher
+            self._flusher = None
+        if self._reader:
+            await self._reader
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def set(self, context_id: str, fields: Dict[str, str]) -> None:
+        """Queues fields for the next pipelined flush."""
+        status = fields.get("status")
+        if status is not None:
+            fields = {key: value for key, value in fields.items() if key != "status"}
+            fields[f"{RANKED_STATUS_PREFIX}{status_rank(status)}"] = status
+        self._pending.setdefault(context_id, {}).update(fields)
+        self._wake.set()
+
+    async def get(self, context_id: str) -> Optional[Dict[str, str]]:
+        """Reads the call's hash, overlaying writes not yet flushed."""
+        # Writes flushed while the read is in flight may or may not be in its result
+        local = self._unflushed(context_id)
+        future = asyncio.get_running_loop().create_future()
+        self._reads.append((context_id, future))
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read_batch())
+        state = await future
+        state.update(local)
+        state.update(self._unflushed(context_id))
+        return self._resolve_status(state) or None
+
+    @staticmethod
+    def _resolve_status(state: Dict[str, str]) -> Dict[str, str]:
+        ranked = [
+            (int(key[len(RANKED_STATUS_PREFIX) :]), state.pop(key))
+            for key in list(state)
+            if key.startswith(RANKED_STATUS_PREFIX)
+        ]
+        if ranked:
+            state["status"] = max(ranked)[1]
+        return state
+
+    def _unflushed(self, context_id: str) -> Dict[str, str]:
+        fields = dict(self._flushing.get(context_id, ()))
+        fields.update(self._pending.get(context_id, ()))
+        return fields
+
+    async def _read_batch(self) -> None:
+        # Reads issued while the previous batch was in flight share one pipelined round trip
+        while self._reads:
+            reads, self._reads = self._reads, []
+            start = time.perf_counter()
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for context_id, _ in reads:
+                        pipe.hgetall(self.key_prefix + context_id)
+                    results = await pipe.execute()
+            except Exception:
+                # Callers fall back to what this replica knows rather than failing the call
+                self.errors += 1
+                logger.exception(
+                    "[CallState] Failed to read %d calls from %s", len(reads), self.url
+                )
+                results = [{} for _ in reads]
+            else:
+                self.read_stats.record((time.perf_counter() - start) * 1000)
+            for (_, future), state in zip(reads, results):
+                if not future.done():
+                    future.set_result(state)
+        self._reader = None
+
+    async def _flush_loop(self) -> None:
+        while not self._closed:
+            await self._wake.wait()
+            if not self._closed:
+                # Short delay so writes from concurrent calls share a round trip
+                await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            if not await self._flush() and not self._closed:
+                await asyncio.sleep(FLUSH_RETRY_SECONDS)
+
+    async def _flush(self) -> bool:
+        if not self._pending:
+            return True
+        pending = self._flushing = self._pending
+        self._pending = {}
+        start = time.perf_counter()
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for context_id, fields in pending.items():
+                    key = self.key_prefix + context_id
+                    pipe.hset(key, mapping=fields)
+                    pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception:
+            self.errors += 1
+            logger.exception(
+                "[CallState] Failed to write %d calls to %s; will retry",
+                len(pending),
+                self.url,
+            )
+            # Requeue the batch; fields set since it was taken are newer and win
+            for context_id, fields in pending.items():
+                newer = self._pending.get(context_id)
+                if newer:
+                    fields.update(newer)
+                self._pending[context_id] = fields
+            self._wake.set()
+            return False
+        finally:
+            self._flushing = {}
+        self.flush_stats.record((time.perf_counter() - start) * 1000)
+        self.writes += len(pending)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name, flush and read timings, and write counts."""
+        return {
+            "backend": "redis",
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "errors": self.errors,
+            "flush_ms": self.flush_stats.as_dict(),
+            "read_batch_ms": self.read_stats.as_dict(),
+        }
+
+
+def create_call_state_store(config: Dict[str, Any]):
+    """Builds the store selected by CALL_STATE_BACKEND (memory or redis)."""
+    backend = config.get("CALL_STATE_BACKEND", "memory")
+    ttl_seconds = float(config.get("CALL_STATE_TTL_SECONDS", 3600))
+    if backend == "memory":
+        return InMemoryCallStateStore(ttl_seconds)
+    if backend == "redis":
+        url = config.get("CALL_STATE_REDIS_URL")
+        if not url:
+            raise ValueError("CALL_STATE_BACKEND=redis requires CALL_STATE_REDIS_URL")
+        return RedisCallStateStore(
+            url, ttl_seconds, float(config.get("CALL_STATE_FLUSH_MS", 2))
+        )
+    raise ValueError(
+        f"Unknown CALL_STATE_BACKEND {backend!r}; expected memory or redis"
+    )
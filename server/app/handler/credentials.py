@@ -0,0 +1,33 @@
+"""Process-wide Azure credentials, created on first use."""
+
+from typing import Any, Dict
+
+# Managed identity client ID -> credential
+_CREDENTIALS: Dict[str, Any] = {}
+
+
+def managed_identity_credential(client_id: str) -> Any:
+    """
+    Returns the shared ``ManagedIdentityCredential`` for a user-assigned identity.
+
+    One instance per identity lets the SDK's token cache serve every call
+    instead of each connection fetching a token from the identity endpoint.
+    azure-identity is imported here rather than at module load, as it is
+    among the slowest imports at startup.
+    """
+    credential = _CREDENTIALS.get(client_id)
+    if credential is None:
+        from azure.identity.aio import ManagedIdentityCredential
+
+        credential = _CREDENTIALS[client_id] = ManagedIdentityCredential(
+            client_id=client_id
+        )
+    return credential
+
+
+async def close_credentials() -> None:
+    """Closes the shared credentials at shutdown."""
+    credentials = list(_CREDENTIALS.values())
+    _CREDENTIALS.clear()
+    for credential in credentials:
+        await credential.close()
@@ -0,0 +1,72 @@
+"""Fast parsing of Voice Live messages, with a shortcut for audio deltas."""
+
+import json
+import re
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library parser is used otherwise
+    orjson = None
+
+AUDIO_DELTA_TYPE = "response.audio.delta"
+
+# Only the first "type" key is inspected; unescaped quotes cannot occur inside string values
+_TYPE_PATTERN = re.compile(r'"type"\s*:\s*"([^"\\]*)"')
+_DELTA_PATTERN = re.compile(r'"delta"\s*:\s*"')
+_RESPONSE_ID_PATTERN = re.compile(r'"response_id"\s*:\s*"([^"\\]*)"')
+_ITEM_ID_PATTERN = re.compile(r'"item_id"\s*:\s*"([^"\\]*)"')
+
+
+def loads(message: Union[str, bytes]) -> Dict[str, Any]:
+    """Parses a JSON message with orjson when installed, else the json module."""
+    if orjson is not None:
+        return orjson.loads(message)
+    return json.loads(message)
+
+
+def _search_around(pattern: re.Pattern, message: str, start: int, end: int):
+    """Searches the message outside the [start, end) span holding the audio payload."""
+    match = pattern.search(message, 0, start)
+    if match is None:
+        match = pattern.search(message, end)
+    return match.group(1) if match else None
+
+
+def parse_voicelive_event(message: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Parses a Voice Live message, skipping the full JSON parse for audio deltas.
+
+    ``response.audio.delta`` messages are the bulk of the stream and are
+    mostly base64 payload. For those, the type, ``response_id``, ``item_id``
+    and ``delta`` are sliced out of the text directly; the other fields of
+    the event are not included. Any other message, or a delta that does not
+    have the expected shape, is parsed in full.
+
+    Args:
+        message: Text (or binary) WebSocket message from Voice Live
+
+    Returns:
+        Dict[str, Any]: The event, with at least a ``type`` key when present
+    """
+    if isinstance(message, str):
+        type_match = _TYPE_PATTERN.search(message)
+        if type_match is not None and type_match.group(1) == AUDIO_DELTA_TYPE:
+            delta_match = _DELTA_PATTERN.search(message)
+            if delta_match is not None:
+                delta_start = delta_match.end()
+                delta_end = message.find('"', delta_start)
+                delta = message[delta_start:delta_end]
+                # Escaped characters (e.g. "\/") need the real decoder
+                if delta_end != -1 and "\\" not in delta:
+                    return {
+                        "type": AUDIO_DELTA_TYPE,
+                        "response_id": _search_around(
+                            _RESPONSE_ID_PATTERN, message, delta_start, delta_end
+                        ),
+                        "item_id": _search_around(
+                            _ITEM_ID_PATTERN, message, delta_start, delta_end
+                        ),
+                        "delta": delta,
+                    }
+    return loads(message)
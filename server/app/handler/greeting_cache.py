@@ -0,0 +1,148 @@
+"""Pre-rendered greeting audio, so callers hear the agent before Voice Live is connected."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Voice Live output format: PCM16 mono at 24 kHz
+GREETING_SAMPLE_RATE = 24000
+
+
+class PrerenderedGreeting(NamedTuple):
+    """Greeting audio (24 kHz PCM16 mono) and what was said."""
+
+    key: str
+    audio: bytes
+    transcript: str
+
+
+def greeting_key(session_update: Dict[str, Any]) -> str:
+    """Hashes the parts of the session configuration that shape the greeting."""
+    session = session_update.get("session", {})
+    material = json.dumps(
+        {"instructions": session.get("instructions"), "voice": session.get("voice")},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+class GreetingCache:
+    """
+    Disk-backed cache of the opening greeting, one entry per prompt and voice.
+
+    The greeting is synthesized once by Voice Live with the regular session
+    configuration and stored as ``greeting_<key>.pcm`` plus a JSON sidecar
+    holding the transcript. ``load`` reads the entry for the current
+    configuration into memory; a changed prompt or voice yields a new key.
+    """
+
+    def __init__(self, cache_dir: Path, render_timeout: float = 30.0):
+        self.cache_dir = Path(cache_dir)
+        self.render_timeout = render_timeout
+
+    def _paths(self, key: str):
+        return (
+            self.cache_dir / f"greeting_{key}.pcm",
+            self.cache_dir / f"greeting_{key}.json",
+        )
+
+    def load(self, session_update: Dict[str, Any]) -> Optional[PrerenderedGreeting]:
+        """Loads the cached greeting for this configuration, if one has been rendered."""
+        key = greeting_key(session_update)
+        audio_path, meta_path = self._paths(key)
+        if not audio_path.exists() or not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        greeting = PrerenderedGreeting(
+            key, audio_path.read_bytes(), meta.get("transcript", "")
+        )
+        logger.info(
+            "[GreetingCache] Loaded greeting %s (%.1fs of audio)",
+            key,
+            len(greeting.audio) / (2 * GREETING_SAMPLE_RATE),
+        )
+        return greeting
+
+    async def render(
+        self, session_update: Dict[str, Any], connect: Callable[[], Awaitable[Any]]
+    ) -> PrerenderedGreeting:
+        """
+        Has Voice Live speak the greeting and stores the audio.
+
+        Args:
+            session_update: The ``session.update`` message used for live calls
+            connect: Coroutine function returning an open Voice Live WebSocket
+
+        Returns:
+            PrerenderedGreeting: The new cache entry
+        """
+        key = greeting_key(session_update)
+        ws = await connect()
+        try:
+            await ws.send(json.dumps(session_update))
+            await ws.send(json.dumps({"type": "response.create"}))
+            audio, transcript = await asyncio.wait_for(
+                self._collect(ws), self.render_timeout
+            )
+        finally:
+            await ws.close()
+
+        if not audio:
+            raise RuntimeError("Voice Live returned no greeting audio")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        audio_path, meta_path = self._paths(key)
+        audio_path.write_bytes(audio)
+        meta_path.write_text(
+            json.dumps(
+                {
+                    "transcript": transcript,
+                    "sample_rate": GREETING_SAMPLE_RATE,
+                    "created": time.time(),
+                }
+            ),
+            encoding="utf-8",
+        )
+        greeting = PrerenderedGreeting(key, audio, transcript)
+        logger.info("[GreetingCache] Rendered greeting %s: %s", key, transcript)
+        return greeting
+
+    async def ensure(
+        self, session_update: Dict[str, Any], connect: Callable[[], Awaitable[Any]]
+    ) -> Optional[PrerenderedGreeting]:
+        """Loads the greeting, rendering it first if this configuration has none yet."""
+        try:
+            return self.load(session_update) or await self.render(
+                session_update, connect
+            )
+        except Exception:
+            logger.exception(
+                "[GreetingCache] Greeting unavailable; calls will use the live greeting"
+            )
+            return None
+
+    @staticmethod
+    async def _collect(ws) -> tuple:
+        chunks = []
+        transcript = ""
+        async for message in ws:
+            event = json.loads(message)
+            event_type = event.get("type")
+            if event_type == "response.audio.delta":
+                chunks.append(base64.b64decode(event["delta"]))
+            elif event_type == "response.audio_transcript.done":
+                transcript = event.get("transcript", "")
+            elif event_type == "response.done":
+                break
+            elif event_type == "error":
+                raise RuntimeError(
+                    f"Voice Live error while rendering greeting: {event}"
+                )
+        return b"".join(chunks), transcript
@@ -0,0 +1,152 @@
+"""Named Voice Live session profiles and their per-call assignment."""
+
+import copy
+import hashlib
+import json
+import logging
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.handler.acs_media_handler import load_system_prompt, session_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_FILE = (
+    Path(__file__).parent.parent.parent / "profiles" / "session_profiles.json"
+)
+
+ASSIGNMENT_MODES = ("fixed", "random", "caller")
+
+
+class SessionProfile:
+    """
+    One named session configuration.
+
+    A profile without a ``session`` block uses the built-in ``session_config()``.
+    Otherwise the block is sent as the ``session`` of ``session.update`` with
+    ``instructions`` taken from the inline text or from ``prompt_file``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session: Optional[Dict[str, Any]] = None,
+        instructions: Optional[str] = None,
+        prompt_file: Optional[str] = None,
+        weight: float = 1.0,
+        description: str = "",
+    ):
+        self.name = name
+        self.session = session
+        self.instructions = instructions
+        self.prompt_file = prompt_file
+        self.weight = weight
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "SessionProfile":
+        """Builds a profile from its entry in the profiles file."""
+        return cls(
+            name,
+            session=data.get("session"),
+            instructions=data.get("instructions"),
+            prompt_file=data.get("prompt_file"),
+            weight=float(data.get("weight", 1.0)),
+            description=data.get("description", ""),
+        )
+
+    def session_update(self) -> Dict[str, Any]:
+        """Returns a fresh ``session.update`` message for this profile (reads the prompt file)."""
+        if self.session is None:
+            return session_config()
+        session = copy.deepcopy(self.session)
+        if self.instructions is not None:
+            session["instructions"] = self.instructions
+        else:
+            session["instructions"] = load_system_prompt(
+                self.prompt_file or "grace_intake_agent.txt"
+            )
+        return {"type": "session.update", "session": session}
+
+
+class SessionProfiles:
+    """
+    Chooses a profile for each call.
+
+    Modes:
+        fixed: always ``SESSION_PROFILE``
+        random: weighted random choice per call
+        caller: weighted choice from a hash of the caller ID, so repeat callers
+            keep their profile; calls without a caller ID fall back to random
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, SessionProfile],
+        assignment: str = "fixed",
+        fixed: str = "default",
+    ):
+        if assignment not in ASSIGNMENT_MODES:
+            raise ValueError(
+                f"SESSION_PROFILE_ASSIGNMENT must be one of {ASSIGNMENT_MODES}, got {assignment!r}"
+            )
+        if fixed not in profiles:
+            raise ValueError(
+                f"Unknown session profile {fixed!r}; available: {sorted(profiles)}"
+            )
+        self.profiles = profiles
+        self.assignment = assignment
+        self.fixed = fixed
+        self.assigned: Counter = Counter()
+        self._names = list(profiles)
+        self._weights = [profiles[name].weight for name in self._names]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SessionProfiles":
+        """Loads SESSION_PROFILES_FILE (default server/profiles/session_profiles.json)."""
+        path = Path(config.get("SESSION_PROFILES_FILE") or DEFAULT_PROFILES_FILE)
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            profiles = {
+                name: SessionProfile.from_dict(name, data)
+                for name, data in entries.items()
+            }
+            logger.info(
+                "[SessionProfiles] Loaded profiles %s from %s",
+                ", ".join(profiles),
+                path,
+            )
+        else:
+            profiles = {"default": SessionProfile("default")}
+        return cls(
+            profiles,
+            assignment=config.get("SESSION_PROFILE_ASSIGNMENT", "fixed"),
+            fixed=config.get("SESSION_PROFILE", "default"),
+        )
+
+    def _weighted(self, fraction: float) -> SessionProfile:
+        threshold = fraction * sum(self._weights)
+        for name, weight in zip(self._names, self._weights):
+            threshold -= weight
+            if threshold < 0:
+                return self.profiles[name]
+        return self.profiles[self._names[-1]]
+
+    def assign(self, caller_id: Optional[str] = None) -> SessionProfile:
+        """Returns the profile for a new call."""
+        if self.assignment == "fixed":
+            profile = self.profiles[self.fixed]
+        elif self.assignment == "caller" and caller_id:
+            digest = hashlib.sha256(caller_id.encode("utf-8")).digest()
+            profile = self._weighted(int.from_bytes(digest[:8], "big") / 2**64)
+        else:
+            profile = self._weighted(random.random())
+        self.assigned[profile.name] += 1
+        return profile
+
+    def stats(self) -> Dict[str, Any]:
+        """Assignment mode and calls assigned per profile."""
+        return {"assignment": self.assignment, "assigned": dict(self.assigned)}
@@ -0,0 +1,41 @@
+"""Tracks the media sessions active on this instance."""
+
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry:
+    """Keeps active ``ACSMediaHandler`` instances keyed by session id."""
+
+    def __init__(self):
+        self._sessions: Dict[str, Any] = {}
+
+    def register(self, handler: Any) -> None:
+        """Adds a handler when its client WebSocket is accepted."""
+        self._sessions[handler.session_id] = handler
+        logger.debug(
+            "[SessionRegistry] Registered %s (%d active)",
+            handler.session_id,
+            len(self._sessions),
+        )
+
+    def unregister(self, handler: Any) -> None:
+        """Removes a handler once it has closed."""
+        self._sessions.pop(handler.session_id, None)
+        logger.debug(
+            "[SessionRegistry] Unregistered %s (%d active)",
+            handler.session_id,
+            len(self._sessions),
+        )
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Returns the handler for a session id, if active."""
+        return self._sessions.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._sessions.values()))
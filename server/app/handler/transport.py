@@ -0,0 +1,72 @@
+"""WebSocket transport settings for the Voice Live client and the server's own WebSockets."""
+
+import copy
+import json
+from typing import Any, Dict, NamedTuple
+
+from hypercorn.config import Config
+
+# Audio travels as base64 inside JSON, which permessage-deflate barely shrinks,
+# so negotiating compression only costs CPU and latency.
+TRANSPORT_PROFILES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "low_latency": {
+        "voicelive": {
+            "compression": None,
+            "max_size": 4 * 1024 * 1024,
+            "max_queue": 64,
+            "write_limit": 64 * 1024,
+            "ping_interval": 10,
+            "ping_timeout": 10,
+            "open_timeout": 5,
+            "close_timeout": 2,
+        },
+        "server": {
+            "websocket_max_message_size": 4 * 1024 * 1024,
+            "websocket_ping_interval": 10,
+        },
+    },
+    # websockets and Hypercorn defaults (permessage-deflate, 1 MiB messages, 20s pings)
+    "library_defaults": {
+        "voicelive": {},
+        "server": {},
+    },
+}
+
+
+class TransportProfile(NamedTuple):
+    """Keyword arguments for ``websockets`` connect and Hypercorn ``Config`` attributes."""
+
+    name: str
+    voicelive: Dict[str, Any]
+    server: Dict[str, Any]
+
+
+def transport_profile(config: Dict[str, Any]) -> TransportProfile:
+    """
+    Resolves TRANSPORT_PROFILE and applies TRANSPORT_OVERRIDES.
+
+    Overrides are JSON with optional ``voicelive`` and ``server`` objects,
+    e.g. ``{"voicelive": {"ping_interval": 5}}``.
+    """
+    name = config.get("TRANSPORT_PROFILE", "low_latency")
+    if name not in TRANSPORT_PROFILES:
+        raise ValueError(
+            f"Unknown TRANSPORT_PROFILE {name!r}; available: {sorted(TRANSPORT_PROFILES)}"
+        )
+    profile = copy.deepcopy(TRANSPORT_PROFILES[name])
+    overrides = config.get("TRANSPORT_OVERRIDES")
+    if overrides:
+        for section, values in json.loads(overrides).items():
+            if section not in profile:
+                raise ValueError(f"Unknown TRANSPORT_OVERRIDES section {section!r}")
+            profile[section].update(values)
+    return TransportProfile(name, profile["voicelive"], profile["server"])
+
+
+def hypercorn_config(profile: TransportProfile, bind: str) -> Config:
+    """Builds the Hypercorn configuration used when running server.py directly."""
+    hypercorn = Config()
+    hypercorn.bind = [bind]
+    for key, value in profile.server.items():
+        setattr(hypercorn, key, value)
+    return hypercorn
@@ -0,0 +1,53 @@
+"""Small TTL-bounded set used to deduplicate retried webhook deliveries."""
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TtlCache:
+    """
+    Remembers keys for ``ttl_seconds``, bounded to ``max_entries``.
+
+    Every key gets the same TTL, so insertion order is also expiry order and
+    expired keys can be dropped from the front in O(1) each.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def add(self, key: Hashable) -> bool:
+        """
+        Records a key.
+
+        Returns:
+            True if the key was new, False if it was already present and unexpired
+        """
+        now = time.monotonic()
+        self._purge(now)
+        if key in self._entries:
+            return False
+        self._entries[key] = now + self.ttl
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        """Forgets a key, e.g. when processing failed and a retry should be allowed."""
+        self._entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._purge(time.monotonic())
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self, now: float) -> None:
+        while self._entries:
+            key, expires = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[key]
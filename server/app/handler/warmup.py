@@ -0,0 +1,219 @@
+"""Startup warm-up: work moved off the import path and ahead of the first call."""
+
+import asyncio
+import concurrent.futures
+import importlib
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# SDKs imported on first use by the handlers; loading them in a thread at
+# startup keeps the import off the event loop once calls are arriving.
+# Answering a call and connecting its session needs these...
+CALL_PATH_SDK_MODULES = (
+    "azure.communication.callautomation.aio",
+    "azure.eventgrid",
+    "azure.identity.aio",
+    "httpx",
+)
+# ...while Blob Storage is only used when a call ends, so it loads after readiness
+POST_CALL_SDK_MODULES = ("azure.storage.blob.aio",)
+DEFERRED_SDK_MODULES = CALL_PATH_SDK_MODULES + POST_CALL_SDK_MODULES
+
+# Delays between attempts of a failed required stage; the last one repeats
+RETRY_DELAYS_SECONDS = (1, 2, 5, 10, 30)
+
+
+def import_modules(modules=DEFERRED_SDK_MODULES) -> None:
+    """Imports the given modules; run in a thread."""
+    for module in modules:
+        importlib.import_module(module)
+
+
+def start_imports(modules=CALL_PATH_SDK_MODULES) -> concurrent.futures.Future:
+    """
+    Starts importing the given modules in a daemon thread right away.
+
+    Called at server import so the imports overlap with the rest of startup
+    instead of waiting for the event loop; await the result with
+    ``asyncio.wrap_future``.
+    """
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def run() -> None:
+        try:
+            import_modules(modules)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    threading.Thread(target=run, name="sdk-imports", daemon=True).start()
+    return future
+
+
+class WarmupStage:
+    """One named warm-up step and its outcome."""
+
+    __slots__ = (
+        "name",
+        "func",
+        "required",
+        "after",
+        "status",
+        "elapsed_ms",
+        "attempts",
+        "error",
+        "done",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Union[None, Awaitable[Any]]],
+        required: bool,
+        after: Sequence[str],
+    ):
+        self.name = name
+        self.func = func
+        self.required = required
+        self.after = tuple(after)
+        self.status = "pending"
+        self.elapsed_ms: Optional[float] = None
+        self.attempts = 0
+        self.error: Optional[str] = None
+        # Set once the stage has succeeded; stages listing it in ``after`` wait for it
+        self.done = asyncio.Event()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the stage outcome for JSON output."""
+        result = {
+            "status": self.status,
+            "required": self.required,
+            "elapsed_ms": round(self.elapsed_ms, 1)
+            if self.elapsed_ms is not None
+            else None,
+            "attempts": self.attempts,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class StartupWarmup:
+    """
+    Runs registered stages once the server is listening.
+
+    Required stages run concurrently, each starting once the stages named in
+    its ``after`` have succeeded. The instance is ready when every required
+    stage has succeeded; failed required stages are retried with backoff, so
+    a transient failure (e.g. the identity endpoint not yet reachable) only
+    delays readiness. Optional stages run after the required ones and never
+    affect readiness.
+    """
+
+    def __init__(self):
+        self.stages: List[WarmupStage] = []
+        self.started: Optional[float] = None
+        self.ready_after_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Union[None, Awaitable[Any]]],
+        required: bool = True,
+        after: Sequence[str] = (),
+    ) -> None:
+        """
+        Registers a stage.
+
+        Args:
+            name: Stage name shown by the readiness endpoint
+            func: Function or coroutine function performing the stage
+            required: Whether readiness waits for the stage to succeed
+            after: Names of required stages that must succeed before this one starts
+        """
+        self.stages.append(WarmupStage(name, func, required, after))
+
+    @property
+    def ready(self) -> bool:
+        """Whether all required stages have succeeded."""
+        return self.ready_after_ms is not None
+
+    def start(self) -> None:
+        """Starts running the stages in the background."""
+        self.started = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancels stages still running or waiting for a retry."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_stage(self, stage: WarmupStage) -> bool:
+        if stage.after:
+            stage.status = "waiting"
+            by_name = {other.name: other for other in self.stages}
+            await asyncio.gather(*(by_name[name].done.wait() for name in stage.after))
+        stage.status = "running"
+        stage.attempts += 1
+        start = time.perf_counter()
+        try:
+            result = stage.func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            stage.status = "failed"
+            stage.error = f"{type(e).__name__}: {e}"
+            logger.exception(
+                "[StartupWarmup] Stage %s failed (attempt %d)",
+                stage.name,
+                stage.attempts,
+            )
+            return False
+        finally:
+            stage.elapsed_ms = (time.perf_counter() - start) * 1000
+        stage.status = "done"
+        stage.error = None
+        stage.done.set()
+        return True
+
+    async def _run_until_done(self, stage: WarmupStage) -> None:
+        retries = 0
+        while not await self._run_stage(stage):
+            await asyncio.sleep(
+                RETRY_DELAYS_SECONDS[min(retries, len(RETRY_DELAYS_SECONDS) - 1)]
+            )
+            retries += 1
+
+    async def _run(self) -> None:
+        required = [stage for stage in self.stages if stage.required]
+        await asyncio.gather(*(self._run_until_done(stage) for stage in required))
+
+        self.ready_after_ms = (time.perf_counter() - self.started) * 1000
+        logger.info(
+            "[StartupWarmup] Ready after %.0fms: %s",
+            self.ready_after_ms,
+            " ".join(f"{stage.name}={stage.elapsed_ms:.0f}ms" for stage in required),
+        )
+
+        for stage in self.stages:
+            if not stage.required:
+                await self._run_stage(stage)
+
+    def stats(self) -> Dict[str, Any]:
+        """Readiness and per-stage outcome for the readiness endpoint."""
+        return {
+            "ready": self.ready,
+            "ready_after_ms": round(self.ready_after_ms, 1)
+            if self.ready_after_ms is not None
+            else None,
+            "stages": {stage.name: stage.as_dict() for stage in self.stages},
+        }
@@ -0,0 +1,119 @@
+"""Incrementally maintained per-call conversation metrics for live dashboards."""
+
+import time
+from typing import Any, Dict, Optional
+
+# Gap between conversation events counted as a pause, matching conversation_analyzer.py
+PAUSE_THRESHOLD_SECONDS = 2.0
+
+
+class LiveCallMetrics:
+    """
+    Turn latency, pauses and barge-ins for one call, updated in O(1) per event.
+
+    Turn latency is measured from the user's ``speech_stopped`` to the first
+    assistant audio of the next response. Assistant playback is assumed to
+    run until the audio sent so far has been played at real time, so speech
+    starting before then counts as a barge-in.
+    """
+
+    __slots__ = (
+        "started",
+        "turns",
+        "latency_count",
+        "latency_total",
+        "latency_max",
+        "latency_last",
+        "pauses",
+        "longest_pause",
+        "barge_ins",
+        "last_event",
+        "_awaiting_response_since",
+        "_response_id",
+        "_speaking_until",
+    )
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.turns = 0
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last: Optional[float] = None
+        self.pauses = 0
+        self.longest_pause = 0.0
+        self.barge_ins = 0
+        self.last_event: Optional[float] = None
+        self._awaiting_response_since: Optional[float] = None
+        self._response_id: Optional[str] = None
+        self._speaking_until = 0.0
+
+    def _event(self, now: float) -> None:
+        if self.last_event is not None:
+            gap = now - self.last_event
+            if gap > PAUSE_THRESHOLD_SECONDS:
+                self.pauses += 1
+                if gap > self.longest_pause:
+                    self.longest_pause = gap
+        self.last_event = now
+
+    def speech_started(self) -> None:
+        """User started speaking."""
+        now = time.monotonic()
+        self._event(now)
+        if now < self._speaking_until:
+            self.barge_ins += 1
+            self._speaking_until = now
+
+    def speech_stopped(self) -> None:
+        """User stopped speaking; the next assistant audio closes the turn."""
+        now = time.monotonic()
+        self._event(now)
+        self.turns += 1
+        self._awaiting_response_since = now
+
+    def assistant_audio(self, response_id: Optional[str], seconds: float) -> None:
+        """Assistant audio of the given duration was sent to the caller."""
+        now = time.monotonic()
+        if response_id != self._response_id:
+            self._response_id = response_id
+            self._event(now)
+            if self._awaiting_response_since is not None:
+                latency = now - self._awaiting_response_since
+                self._awaiting_response_since = None
+                self.latency_count += 1
+                self.latency_total += latency
+                self.latency_last = latency
+                if latency > self.latency_max:
+                    self.latency_max = latency
+        self._speaking_until = max(self._speaking_until, now) + seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the current figures for JSON output."""
+        now = time.monotonic()
+        return {
+            "duration_seconds": round(now - self.started, 1),
+            "turns": self.turns,
+            "turn_latency": {
+                "count": self.latency_count,
+                "last_seconds": round(self.latency_last, 3)
+                if self.latency_last is not None
+                else None,
+                "avg_seconds": round(self.latency_total / self.latency_count, 3)
+                if self.latency_count
+                else None,
+                "max_seconds": round(self.latency_max, 3),
+            },
+            "awaiting_response_seconds": (
+                round(now - self._awaiting_response_since, 3)
+                if self._awaiting_response_since is not None
+                else None
+            ),
+            "pauses": self.pauses,
+            "longest_pause_seconds": round(self.longest_pause, 3),
+            "barge_ins": self.barge_ins,
+            "assistant_speaking": now < self._speaking_until,
+            "seconds_since_last_event": round(now - self.last_event, 1)
+            if self.last_event is not None
+            else None,
+        }
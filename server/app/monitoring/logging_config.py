@@ -0,0 +1,159 @@
+"""Non-blocking, structured logging with per-call context."""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Tuple
+
+# Fields attached to every record logged while handling a call
+CALL_CONTEXT_FIELDS = ("session_id", "call_connection_id")
+
+call_log_context: ContextVar[Dict[str, str]] = ContextVar(
+    "call_log_context", default={}
+)
+
+TEXT_FORMAT = "%(asctime)s %(name)s %(levelname)s [%(session_id)s %(call_connection_id)s]: %(message)s"
+
+
+def bind_call_context(**fields: str) -> Token:
+    """
+    Attaches call identifiers to log records from the current task onwards.
+
+    Tasks created afterwards inherit the context. Returns a token that can be
+    passed to ``call_log_context.reset`` to undo the binding.
+    """
+    merged = dict(call_log_context.get())
+    merged.update({key: value for key, value in fields.items() if value})
+    return call_log_context.set(merged)
+
+
+class CallContextFilter(logging.Filter):
+    """Copies the bound call context onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = call_log_context.get()
+        for field in CALL_CONTEXT_FIELDS:
+            setattr(record, field, context.get(field, "-"))
+        return True
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Token-bucket limit on DEBUG records, per logger and message template.
+
+    Per-frame debug messages on the media path would otherwise flood the
+    queue; records over the budget are dropped and counted.
+    """
+
+    def __init__(self, rate_per_second: float = 20.0, burst: float = 20.0):
+        super().__init__()
+        self.rate = rate_per_second
+        self.burst = burst
+        self.suppressed = 0
+        self._buckets: Dict[Tuple[str, Any], Tuple[float, float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, now)
+            self.suppressed += 1
+            return False
+        self._buckets[key] = (tokens - 1.0, now)
+        return True
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    Queue handler that keeps the message and its traceback apart.
+
+    The stock ``prepare`` folds the formatted traceback into ``msg``; here
+    ``msg`` stays the plain message and the traceback goes to ``exc_text``,
+    which the text formatter appends and the JSON formatter emits as its
+    own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        # Tracebacks hold frames that must not outlive the logging call
+        record.exc_info = None
+        return record
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CALL_CONTEXT_FIELDS:
+            value = getattr(record, field, "-")
+            if value != "-":
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(config: Dict[str, Any]) -> QueueListener:
+    """
+    Routes all logging through an in-memory queue drained by a background thread.
+
+    The event loop thread only formats the message and enqueues it; writing
+    to stderr happens on the listener thread. ``LOG_FORMAT`` selects ``text``
+    or ``json`` output and ``LOG_LEVEL`` the root level.
+    """
+    if config.get("LOG_FORMAT", "text") == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = TracebackQueueHandler(log_queue)
+    queue_handler.addFilter(
+        DebugRateLimitFilter(float(config.get("LOG_DEBUG_RATE_PER_SECOND", 20)))
+    )
+    queue_handler.addFilter(CallContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.get("LOG_LEVEL", "INFO"))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
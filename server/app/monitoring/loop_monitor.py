@@ -0,0 +1,98 @@
+"""Samples asyncio event loop lag so overload can be detected and reported."""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes a periodic sleeper.
+
+    Every ``interval_ms`` a background task sleeps and records how much later
+    than scheduled it resumed. All calls share one loop, so this lag is added
+    to every audio frame being forwarded at that moment. Samples above
+    ``warn_ms`` are logged; recent samples are kept for percentiles.
+    """
+
+    def __init__(
+        self,
+        interval_ms: int = 250,
+        smoothing: float = 0.2,
+        warn_ms: float = 100.0,
+        window: int = 240,
+    ):
+        self.interval = interval_ms / 1000.0
+        self.smoothing = smoothing
+        self.warn_ms = warn_ms
+        self.warn_count: int = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self.last_lag_ms: float = 0.0
+        self.smoothed_lag_ms: float = 0.0
+        self.max_lag_ms: float = 0.0
+        self.samples: int = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts sampling on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the sampling task."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                self.record(max(0.0, (loop.time() - expected) * 1000.0))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("[LoopLagMonitor] Sampling stopped unexpectedly")
+
+    def record(self, lag_ms: float) -> None:
+        """Adds one lag sample."""
+        self.samples += 1
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.smoothed_lag_ms += self.smoothing * (lag_ms - self.smoothed_lag_ms)
+        self._recent.append(lag_ms)
+        if self.warn_ms > 0 and lag_ms >= self.warn_ms:
+            self.warn_count += 1
+            logger.warning(
+                "[LoopLagMonitor] Event loop lag %.1f ms (smoothed %.1f ms)",
+                lag_ms,
+                self.smoothed_lag_ms,
+            )
+
+    def percentile(self, fraction: float) -> float:
+        """Returns a lag percentile (0-1) over the recent sample window."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns current lag figures in milliseconds."""
+        return {
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "smoothed_lag_ms": round(self.smoothed_lag_ms, 2),
+            "p50_lag_ms": round(self.percentile(0.5), 2),
+            "p99_lag_ms": round(self.percentile(0.99), 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "samples": self.samples,
+            "warnings": self.warn_count,
+        }
@@ -0,0 +1,35 @@
+"""Lightweight in-process metric primitives reported on GET /metrics."""
+
+from typing import Any, Dict
+
+
+class TimingStats:
+    """Count, cumulative and maximum duration of a repeated operation."""
+
+    __slots__ = ("count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        """Adds one observation."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the figures rounded for JSON output."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+def timing_table(stats: Dict[str, TimingStats]) -> Dict[str, Dict[str, Any]]:
+    """Converts a name -> TimingStats mapping for JSON output."""
+    return {name: timing.as_dict() for name, timing in sorted(stats.items())}
@@ -0,0 +1,144 @@
+"""Opt-in detector for event loop steps that block longer than a threshold."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frames kept from each captured stack, innermost last
+MAX_STACK_FRAMES = 20
+
+
+def describe_callback(handle: asyncio.Handle) -> str:
+    """Names the coroutine (for task steps) or function behind a loop callback."""
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", None) or repr(coro)
+        return f"Task {owner.get_name()} {name}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class SlowCallbackDetector:
+    """
+    Times every event loop callback and reports the ones over ``threshold_ms``.
+
+    ``asyncio.Handle._run`` is wrapped to time each step. A watchdog thread
+    snapshots the loop thread's stack while a step is still running past the
+    threshold, so the report shows where the loop was blocked (e.g. a file
+    write or a large ``json.dumps``), not where the coroutine later suspended.
+    """
+
+    def __init__(self, threshold_ms: float = 50.0, max_reports: int = 50):
+        self.threshold = threshold_ms / 1000.0
+        self.slow_count: int = 0
+        self.slow_total_ms: float = 0.0
+        self.by_callback: Counter = Counter()
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self._current: Optional[Tuple[asyncio.Handle, float]] = None
+        self._captured: Optional[Tuple[asyncio.Handle, List[str]]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._original_run = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def install(self) -> None:
+        """Starts timing callbacks on the current thread's event loop."""
+        if self._original_run is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._original_run = asyncio.events.Handle._run
+        original_run = self._original_run
+        detector = self
+        loop_thread_id = self._loop_thread_id
+
+        def _timed_run(handle):
+            if threading.get_ident() != loop_thread_id:
+                return original_run(handle)
+            start = time.perf_counter()
+            detector._current = (handle, start)
+            try:
+                return original_run(handle)
+            finally:
+                detector._current = None
+                elapsed = time.perf_counter() - start
+                if elapsed >= detector.threshold:
+                    detector._report(handle, elapsed)
+
+        asyncio.events.Handle._run = _timed_run
+        self._stop.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="slow-callback-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            "[SlowCallbackDetector] Installed with %.0f ms threshold",
+            self.threshold * 1000,
+        )
+
+    def uninstall(self) -> None:
+        """Restores the original callback runner and stops the watchdog."""
+        if self._original_run is None:
+            return
+        asyncio.events.Handle._run = self._original_run
+        self._original_run = None
+        self._stop.set()
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def _watch(self) -> None:
+        interval = max(self.threshold / 2, 0.005)
+        while not self._stop.wait(interval):
+            current = self._current
+            if current is None or time.perf_counter() - current[1] < self.threshold:
+                continue
+            captured = self._captured
+            if captured is not None and captured[0] is current[0]:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:]
+                self._captured = (current[0], stack)
+
+    def _report(self, handle: asyncio.Handle, elapsed: float) -> None:
+        description = describe_callback(handle)
+        captured = self._captured
+        stack = captured[1] if captured is not None and captured[0] is handle else None
+        self._captured = None
+
+        elapsed_ms = elapsed * 1000
+        self.slow_count += 1
+        self.slow_total_ms += elapsed_ms
+        self.by_callback[description] += 1
+        self.reports.append(
+            {
+                "callback": description,
+                "duration_ms": round(elapsed_ms, 2),
+                "wall_time": time.time(),
+                "stack": stack,
+            }
+        )
+        logger.warning(
+            "[SlowCallbackDetector] %s blocked the event loop for %.1f ms%s",
+            description,
+            elapsed_ms,
+            ("\n" + "".join(stack)) if stack else "",
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns slow-callback counters and the most recent reports."""
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "slow_callbacks": self.slow_count,
+            "slow_total_ms": round(self.slow_total_ms, 2),
+            "top_callbacks": self.by_callback.most_common(10),
+            "recent": list(self.reports)[-10:],
+        }
@@ -0,0 +1,128 @@
+"""Sampling profiler for the event loop thread with flame-graph output."""
+
+import logging
+import signal
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Coroutines that move audio between the client socket and Voice Live
+BRIDGE_FUNCTIONS = frozenset(
+    {
+        "acs_to_voicelive",
+        "web_to_voicelive",
+        "audio_to_voicelive",
+        "_sender_loop",
+        "_receiver_loop",
+        "voicelive_to_acs",
+    }
+)
+
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{Path(code.co_filename).name}:{name}"
+
+
+class StackSampler:
+    """
+    Periodically snapshots the event loop thread's Python stack.
+
+    When the loop runs on the main thread, samples are taken from a
+    ``SIGPROF`` interval timer, which fires on consumed CPU time and runs in
+    the sampled thread, so idle time in ``select`` is skipped and hot code is
+    not under-sampled while it holds the GIL. Otherwise a watcher thread
+    samples ``sys._current_frames()`` on a wall-clock interval.
+
+    Samples are aggregated as folded stacks (``root;caller;callee count``),
+    the input format of flamegraph.pl, speedscope and inferno. With a
+    ``session_handler``, only samples taken while one of that handler's
+    bridge coroutines is on the stack are kept.
+    """
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval_ms: float = 5.0,
+        session_handler: Optional[Any] = None,
+    ):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000.0
+        self.session_handler = session_handler
+        self.stacks: Counter = Counter()
+        self.total_samples: int = 0
+        self.kept_samples: int = 0
+        self.use_signal = (
+            hasattr(signal, "setitimer") and thread_id == threading.main_thread().ident
+        )
+        self._previous_handler = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def mode(self) -> str:
+        """``cpu`` for signal-driven sampling, ``wall`` for the watcher thread."""
+        return "cpu" if self.use_signal else "wall"
+
+    def start(self) -> None:
+        """Starts sampling; call from the sampled thread."""
+        if self.use_signal:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._watch, name="stack-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        if self.use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        else:
+            self._stop.set()
+            if self._thread:
+                self._thread.join(timeout=1.0)
+                self._thread = None
+
+    def _on_signal(self, signum, frame) -> None:
+        self._sample(frame)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self._sample(frame)
+
+    def _sample(self, frame) -> None:
+        self.total_samples += 1
+        labels = []
+        matched = self.session_handler is None
+        depth = 0
+        while frame is not None and depth < MAX_STACK_DEPTH:
+            if not matched and frame.f_code.co_name in BRIDGE_FUNCTIONS:
+                matched = frame.f_locals.get("self") is self.session_handler
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+            depth += 1
+        if not matched:
+            return
+        self.kept_samples += 1
+        labels.reverse()
+        self.stacks[";".join(labels)] += 1
+
+    def folded(self) -> str:
+        """Returns samples in folded-stack format, one stack per line."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
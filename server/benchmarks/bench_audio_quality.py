@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-frame cost of the audio quality meter on the media path.
+
+Feeds 20 ms caller frames (base64, as ACS sends them) through an
+AudioQualityMeter at several sampling rates and reports the CPU time per
+frame averaged over all frames, i.e. what each call pays per frame on the
+event loop.
+
+With --check, also meters calls with a known 40 dB SNR (speech at -20 dBFS,
+line noise at -60 dBFS between utterances), with and without gaps of digital
+silence, and exits non-zero if any estimate is off by more than
+SNR_TOLERANCE_DB. Digital silence, whether zeros or frames ACS marks silent,
+must not change the estimate.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_audio_quality
+    python -m benchmarks.bench_audio_quality --seconds 600 --sample-every 1 5 25
+    python -m benchmarks.bench_audio_quality --check
+"""
+
+import argparse
+import base64
+import sys
+import time
+
+import numpy as np
+
+from app.audio.quality import AudioQualityMeter
+
+SAMPLE_RATE = 24000
+FRAME_SAMPLES = SAMPLE_RATE // 50
+
+# Known-SNR check: speech and line noise RMS levels, and the allowed estimate error
+SPEECH_RMS_DBFS = -20.0
+NOISE_RMS_DBFS = -60.0
+SNR_TOLERANCE_DB = 3.0
+
+
+def gaussian_frame(rng: np.random.Generator, rms_dbfs: float) -> str:
+    """One 20 ms base64 frame of Gaussian noise at the given RMS level."""
+    rms = 32768.0 * 10.0 ** (rms_dbfs / 20.0)
+    samples = rng.standard_normal(FRAME_SAMPLES) * rms
+    return base64.b64encode(samples.astype("<i2").tobytes()).decode("ascii")
+
+
+def check_snr(seconds: float = 60.0) -> bool:
+    """Meters calls with a known SNR and prints the estimates; True if all are close."""
+    rng = np.random.default_rng(1)
+    zeros = base64.b64encode(bytes(FRAME_SAMPLES * 2)).decode("ascii")
+    expected = SPEECH_RMS_DBFS - NOISE_RMS_DBFS
+    # Each 2 s: 1 s of speech, 0.5 s of line noise, then 0.5 s of digital silence or more noise
+    cases = {
+        "line noise only": (None, False),
+        "digital zeros": (zeros, False),
+        "ACS silent frames": (zeros, True),
+    }
+    ok = True
+    for name, (gap, silent) in cases.items():
+        meter = AudioQualityMeter(sample_every=1)
+        for _ in range(int(seconds / 2)):
+            for _ in range(50):
+                meter.caller_audio(gaussian_frame(rng, SPEECH_RMS_DBFS))
+            for _ in range(25):
+                meter.caller_audio(gaussian_frame(rng, NOISE_RMS_DBFS))
+            for _ in range(25):
+                if gap is None:
+                    meter.caller_audio(gaussian_frame(rng, NOISE_RMS_DBFS))
+                else:
+                    meter.caller_audio(gap, silent)
+        summary = meter.summary()["caller"]
+        snr = summary["snr_db"]
+        passed = snr is not None and abs(snr - expected) <= SNR_TOLERANCE_DB
+        ok = ok and passed
+        print(
+            f"{name:18s} SNR ~{snr} dB (expected {expected:.0f}), "
+            f"silence {summary['silence_ratio']:.0%}  {'ok' if passed else 'FAIL'}"
+        )
+    return ok
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the audio quality meter.")
+    parser.add_argument(
+        "--seconds", type=float, default=300.0, help="Seconds of caller audio"
+    )
+    parser.add_argument("--sample-every", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero if the SNR estimate misses a known SNR",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [
+        base64.b64encode(
+            (rng.standard_normal(FRAME_SAMPLES) * 2000).astype("<i2").tobytes()
+        ).decode("ascii")
+        for _ in range(int(args.seconds * 50))
+    ]
+    for sample_every in args.sample_every:
+        meter = AudioQualityMeter(sample_every=sample_every)
+        start = time.process_time()
+        for frame in frames:
+            meter.caller_audio(frame)
+        cpu = time.process_time() - start
+        summary = meter.summary()["caller"]
+        print(
+            f"1 in {sample_every:<3d} frames: {cpu / len(frames) * 1e6:6.1f} us per frame, "
+            f"{cpu / args.seconds * 1e6:5.0f} us CPU per audio second  "
+            f"(level {summary['level_dbfs']} dBFS, SNR ~{summary['snr_db']} dB)"
+        )
+
+    if args.check:
+        print()
+        if not check_snr():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
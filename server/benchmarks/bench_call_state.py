@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-call overhead of the shared call-state store.
+
+Each simulated call performs the state accesses of a real one: two writes
+while answering, a read and a write when the media WebSocket arrives, and
+one status write per ACS callback. Time spent awaiting writes is summed per
+call and the read is timed separately; for the Redis backend the round trips
+per call show how write-behind batching amortizes writes across calls.
+
+By default the Redis backend runs against the RESP stand-in in a child
+process, so latency is loopback only; pass --redis-url for a real server.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_call_state
+    python -m benchmarks.bench_call_state --calls 5000 --rate 1000
+    python -m benchmarks.bench_call_state --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import uuid
+
+from app.handler.call_state import InMemoryCallStateStore, RedisCallStateStore
+
+CALLBACK_STATUSES = ("connected", "streaming", "streaming_stopped", "disconnected")
+
+
+async def simulate_call(store, call_index: int) -> tuple:
+    """Runs one call's state accesses; returns milliseconds awaited on writes and on the read."""
+    context_id = str(uuid.uuid4())
+    writes = 0.0
+
+    start = time.perf_counter()
+    await store.set(
+        context_id,
+        {
+            "caller_id": f"+1555{call_index:07d}",
+            "status": "answering",
+            "answered_by": "bench",
+        },
+    )
+    await store.set(
+        context_id, {"status": "answered", "call_connection_id": str(uuid.uuid4())}
+    )
+    writes += time.perf_counter() - start
+
+    # ACS opens the media WebSocket shortly after the answer, possibly on another replica
+    await asyncio.sleep(0.005)
+    start = time.perf_counter()
+    state = await store.get(context_id)
+    read = time.perf_counter() - start
+    assert state and state["status"] == "answered", state
+    start = time.perf_counter()
+    await store.set(
+        context_id,
+        {
+            "media_replica": "bench",
+            "session_id": str(uuid.uuid4()),
+            "profile": "default",
+        },
+    )
+    writes += time.perf_counter() - start
+
+    for status in CALLBACK_STATUSES:
+        await asyncio.sleep(0.001)
+        start = time.perf_counter()
+        await store.set(context_id, {"status": status})
+        writes += time.perf_counter() - start
+
+    return writes * 1000, read * 1000
+
+
+async def run_backend(name: str, store, calls: int, rate: float) -> None:
+    """Starts calls at ``rate`` per second and prints per-call overhead."""
+    await store.start()
+    # Open a connection first, as a serving replica would already have
+    await store.get("warm-up")
+    tasks = []
+    started = time.perf_counter()
+    try:
+        for i in range(calls):
+            tasks.append(asyncio.create_task(simulate_call(store, i)))
+            await asyncio.sleep(started + (i + 1) / rate - time.perf_counter())
+        results = await asyncio.gather(*tasks)
+    finally:
+        await store.close()
+    elapsed = time.perf_counter() - started
+
+    writes = sorted(result[0] for result in results)
+    reads = sorted(result[1] for result in results)
+    p99 = int(len(results) * 0.99) - 1
+    line = (
+        f"{name:<16} {calls} calls in {elapsed:.2f}s  "
+        f"writes/call avg {statistics.mean(writes) * 1000:.0f}us p99 {writes[p99] * 1000:.0f}us  "
+        f"read avg {statistics.mean(reads) * 1000:.0f}us p99 {reads[p99] * 1000:.0f}us"
+    )
+    if isinstance(store, RedisCallStateStore):
+        round_trips = store.flush_stats.count + store.read_stats.count
+        line += f"  round trips/call {round_trips / calls:.2f}"
+    print(line)
+
+
+async def run(args) -> None:
+    await run_backend("memory", InMemoryCallStateStore(), args.calls, args.rate)
+
+    standin = None
+    redis_url = args.redis_url
+    if not redis_url:
+        # A separate process, as a real server would be, so it does not compete for the GIL
+        standin = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "benchmarks.resp_standin",
+            stdout=asyncio.subprocess.PIPE,
+        )
+        redis_url = (await standin.stdout.readline()).decode().strip()
+    try:
+        for flush_ms in args.flush_ms:
+            await run_backend(
+                f"redis flush={flush_ms:g}ms",
+                RedisCallStateStore(
+                    redis_url,
+                    flush_interval_ms=flush_ms,
+                    key_prefix=f"bench:{uuid.uuid4()}:",
+                ),
+                args.calls,
+                args.rate,
+            )
+    finally:
+        if standin:
+            standin.terminate()
+            await standin.wait()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the shared call-state store."
+    )
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument(
+        "--rate", type=float, default=200.0, help="New calls per second"
+    )
+    parser.add_argument("--flush-ms", type=float, nargs="+", default=[0.0, 2.0])
+    parser.add_argument(
+        "--redis-url", help="Real Redis server instead of the local stand-in"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark Voice Live message parsing: json.loads versus the audio delta fast path.
+
+Messages come from the Voice Live side of recorded call captures
+(CALL_CAPTURE_DIR); without captures a synthetic stream of 100ms audio
+deltas with occasional control events is used. Fast-path results are
+checked against a full parse before timing.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_event_parsing
+    python -m benchmarks.bench_event_parsing captures/*.vlcap --repeat 20
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+from typing import Callable, List
+
+from app.handler import event_parser
+from app.handler.call_capture import DIRECTION_VOICELIVE_IN, CallCaptureReader
+
+
+def synthesize_stream(seconds: float, delta_ms: int = 100) -> List[str]:
+    """Audio deltas at 24 kHz PCM16, with a control event every 50 deltas."""
+    messages = []
+    payload = base64.b64encode(os.urandom(24000 * 2 * delta_ms // 1000)).decode("ascii")
+    for i in range(int(seconds * 1000 / delta_ms)):
+        if i % 50 == 0:
+            messages.append(
+                json.dumps(
+                    {
+                        "type": "response.audio_transcript.delta",
+                        "event_id": f"event_{i}",
+                        "response_id": f"resp_{i // 50}",
+                        "delta": "Hello there",
+                    }
+                )
+            )
+        messages.append(
+            json.dumps(
+                {
+                    "type": "response.audio.delta",
+                    "event_id": f"event_{i}_a",
+                    "response_id": f"resp_{i // 50}",
+                    "item_id": f"item_{i // 50}",
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": payload,
+                }
+            )
+        )
+    return messages
+
+
+def load_captures(paths: List[str]) -> List[str]:
+    """Returns the text messages Voice Live sent in the given captures."""
+    messages = []
+    for path in paths:
+        reader = CallCaptureReader(path)
+        messages.extend(
+            record.payload
+            for record in reader
+            if record.direction == DIRECTION_VOICELIVE_IN
+            and isinstance(record.payload, str)
+        )
+        reader.close()
+    return messages
+
+
+def verify(messages: List[str]) -> int:
+    """Checks the fast path against json.loads; returns the number of fast-path hits."""
+    hits = 0
+    for message in messages:
+        full = json.loads(message)
+        fast = event_parser.parse_voicelive_event(message)
+        if full.get("type") == event_parser.AUDIO_DELTA_TYPE:
+            hits += "event_id" not in fast
+            for key in ("type", "response_id", "item_id", "delta"):
+                assert fast.get(key) == full.get(
+                    key
+                ), f"{key} mismatch in {message[:120]}"
+        else:
+            assert fast == full, f"mismatch in {message[:120]}"
+    return hits
+
+
+def time_parser(parse: Callable, messages: List[str], repeat: int) -> float:
+    """Returns microseconds per message."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            parse(message)
+    return (time.perf_counter() - start) / (repeat * len(messages)) * 1e6
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark Voice Live message parsing."
+    )
+    parser.add_argument(
+        "captures", nargs="*", help="Capture files to take Voice Live messages from"
+    )
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=120.0,
+        help="Seconds of synthetic audio without captures",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Passes over the message set"
+    )
+    args = parser.parse_args()
+
+    messages = (
+        load_captures(args.captures)
+        if args.captures
+        else synthesize_stream(args.seconds)
+    )
+    if not messages:
+        parser.error("no Voice Live text messages found in the captures")
+    hits = verify(messages)
+
+    total_kb = sum(len(message) for message in messages) / 1024
+    print(
+        f"Messages:               {len(messages)} ({total_kb:.0f} KiB), {hits} on the fast path"
+    )
+    print(
+        f"json.loads:             {time_parser(json.loads, messages, args.repeat):.2f} us/message"
+    )
+    if event_parser.orjson is not None:
+        print(
+            f"orjson.loads:           {time_parser(event_parser.orjson.loads, messages, args.repeat):.2f} us/message"
+        )
+    print(
+        f"parse_voicelive_event:  {time_parser(event_parser.parse_voicelive_event, messages, args.repeat):.2f} us/message"
+    )
+
+
+if __name__ == "__main__":
+    main()
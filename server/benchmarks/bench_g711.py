@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark and accuracy-check the mu-law codec used by /web/ws?codec=mulaw.
+
+Accuracy: every one of the 256 codes must decode and re-encode to itself
+(except 0x7F, negative zero, which comes back as 0xFF), every PCM16 sample
+must round-trip within half a quantization step of its segment, and a
+-12 dBFS tone must keep the SNR G.711 is specified for. Throughput is
+reported per direction for 20 ms web frames and for one long buffer; the
+wire size shows the bandwidth saved against PCM16. With --check, exits
+non-zero when accuracy regresses.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_g711
+    python -m benchmarks.bench_g711 --check
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.audio.g711 import MULAW_BIAS, MULAW_CLIP, mulaw_decode, mulaw_encode
+
+SAMPLE_RATE = 24000
+MIN_TONE_SNR_DB = 35.0
+TONE_HZ = 1000.0
+
+
+def check_codes() -> bool:
+    """Whether decoding then re-encoding each code is lossless."""
+    codes = np.arange(256, dtype=np.uint8)
+    again = np.frombuffer(mulaw_encode(mulaw_decode(codes.tobytes())), dtype=np.uint8)
+    expected = codes.copy()
+    expected[0x7F] = 0xFF
+    return bool((again == expected).all())
+
+
+def max_error_ratio() -> float:
+    """Largest round-trip error over all PCM16 samples, relative to half the step of their segment."""
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    decoded = np.frombuffer(
+        mulaw_decode(mulaw_encode(samples.astype("<i2").tobytes())), dtype="<i2"
+    )
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP)
+    exponent = np.clip(
+        np.floor(np.log2(magnitude + MULAW_BIAS)).astype(np.int32) - 7, 0, 7
+    )
+    half_step = (1 << (exponent + 3)) / 2
+    error = np.abs(np.clip(samples, -MULAW_CLIP, MULAW_CLIP) - decoded)
+    return float((error / half_step).max())
+
+
+def tone_snr_db(seconds: float = 1.0) -> float:
+    """SNR of a -12 dBFS tone after a round trip."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    tone = (8000 * np.sin(2 * np.pi * TONE_HZ * t)).astype("<i2")
+    decoded = np.frombuffer(mulaw_decode(mulaw_encode(tone.tobytes())), dtype="<i2")
+    noise = decoded.astype(np.float64) - tone
+    return float(
+        10 * np.log10((tone.astype(np.float64) ** 2).mean() / (noise**2).mean())
+    )
+
+
+def throughput(seconds: float, frame_ms: int) -> dict:
+    """Audio seconds processed per CPU second in each direction."""
+    rng = np.random.default_rng(0)
+    pcm = (
+        (rng.standard_normal(int(SAMPLE_RATE * seconds)) * 4000)
+        .clip(-32768, 32767)
+        .astype("<i2")
+        .tobytes()
+    )
+    frame_bytes = SAMPLE_RATE * frame_ms // 1000 * 2
+    frames = [pcm[i : i + frame_bytes] for i in range(0, len(pcm), frame_bytes)]
+
+    start = time.process_time()
+    encoded = [mulaw_encode(frame) for frame in frames]
+    encode_cpu = time.process_time() - start
+    start = time.process_time()
+    for frame in encoded:
+        mulaw_decode(frame)
+    decode_cpu = time.process_time() - start
+
+    start = time.process_time()
+    whole = mulaw_encode(pcm)
+    mulaw_decode(whole)
+    bulk_cpu = time.process_time() - start
+    return {
+        "encode_x": seconds / encode_cpu,
+        "decode_x": seconds / decode_cpu,
+        "bulk_x": seconds / bulk_cpu,
+        "ratio": len(whole) / len(pcm),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the mu-law codec.")
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=600.0,
+        help="Seconds of audio to encode and decode",
+    )
+    parser.add_argument(
+        "--frame-ms", type=int, default=20, help="Web frame size in milliseconds"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Exit non-zero if accuracy regresses"
+    )
+    args = parser.parse_args()
+
+    codes_ok = check_codes()
+    error_ratio = max_error_ratio()
+    snr = tone_snr_db()
+    print(
+        f"codes round-trip: {codes_ok}, max error {error_ratio:.2f} x half step, tone SNR {snr:.1f} dB"
+    )
+
+    result = throughput(args.seconds, args.frame_ms)
+    print(
+        f"{args.frame_ms} ms frames: encode {result['encode_x']:.0f}x real time, "
+        f"decode {result['decode_x']:.0f}x real time; one buffer: {result['bulk_x']:.0f}x round trip; "
+        f"wire size {result['ratio']:.0%} of PCM16 ({SAMPLE_RATE * result['ratio'] * 2 / 1000:.0f} kB/s)"
+    )
+
+    if args.check and not (codes_ok and error_ratio <= 1.0 and snr >= MIN_TONE_SNR_DB):
+        print(
+            f"Accuracy regression: expected lossless codes, error <= half step and SNR >= {MIN_TONE_SNR_DB} dB"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark EventGrid IncomingCall batch throughput against a fake CallAutomationClient.
+
+Each fake answer_call waits --answer-latency-ms to stand in for the ACS
+round trip. Every batch is delivered twice to exercise redelivery
+deduplication; only the first delivery should answer.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_incoming_call
+    python -m benchmarks.bench_incoming_call --batch-size 20 --batches 50
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from app.handler.acs_event_handler import AcsEventHandler
+
+FAKE_CONNECTION_STRING = (
+    "endpoint=https://bench.communication.azure.com/;accesskey=YmVuY2g="
+)
+
+
+class FakeCallAutomationClient:
+    """Records answer_call invocations after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.answered = 0
+
+    async def answer_call(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.answered += 1
+
+        class Result:
+            call_connection_id = str(uuid.uuid4())
+
+        return Result()
+
+
+def incoming_call_event() -> dict:
+    """A minimal Microsoft.Communication.IncomingCall EventGrid event."""
+    return {
+        "id": str(uuid.uuid4()),
+        "eventType": "Microsoft.Communication.IncomingCall",
+        "subject": "bench",
+        "dataVersion": "1.0",
+        "eventTime": "2025-01-01T00:00:00Z",
+        "data": {
+            "from": {
+                "kind": "phoneNumber",
+                "phoneNumber": {"value": "+15550100"},
+                "rawId": "4:+15550100",
+            },
+            "incomingCallContext": str(uuid.uuid4()),
+        },
+    }
+
+
+async def run(batch_size: int, batches: int, latency: float) -> None:
+    config = {"ACS_CONNECTION_STRING": FAKE_CONNECTION_STRING, "ACS_DEV_TUNNEL": ""}
+    handler = AcsEventHandler(config)
+    client = FakeCallAutomationClient(latency)
+    handler.acs_client = client
+
+    deliveries = [
+        [incoming_call_event() for _ in range(batch_size)] for _ in range(batches)
+    ]
+    start = time.perf_counter()
+    for batch in deliveries:
+        await handler.process_incoming_call(batch, "https://bench.example", config)
+        await handler.process_incoming_call(batch, "https://bench.example", config)
+    elapsed = time.perf_counter() - start
+
+    expected = batch_size * batches
+    print(
+        f"Calls answered:     {client.answered} of {expected} ({2 * expected} deliveries)"
+    )
+    print(f"Elapsed:            {elapsed:.2f}s")
+    print(f"Throughput:         {client.answered / elapsed:.0f} calls/s")
+    print(f"Serial lower bound: {expected * latency:.2f}s")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark IncomingCall batch processing."
+    )
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--answer-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args.batch_size, args.batches, args.answer_latency_ms / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
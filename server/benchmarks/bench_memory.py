@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Measure memory per concurrent call and per conversation log event with tracemalloc.
+
+Handlers are built and attached to a stub client socket exactly as the ACS
+route does, without connecting to Voice Live, so the figures cover the
+per-call state this process holds. A full outbound queue is measured
+separately since it only fills while Voice Live is slow.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --calls 500 --events 200
+"""
+
+import argparse
+import asyncio
+import base64
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from app.handler.acs_media_handler import ACSMediaHandler
+
+
+class StubSocket:
+    """Client WebSocket stand-in; nothing is sent during the measurement."""
+
+    async def send(self, message) -> None:
+        pass
+
+
+def measure(allocate) -> int:
+    """Returns bytes still allocated after running allocate() (its result is kept alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = allocate()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return size
+
+
+async def run(calls: int, events: int, frame_ms: int) -> None:
+    with tempfile.TemporaryDirectory() as logs_dir:
+        config = {
+            "AZURE_VOICE_LIVE_ENDPOINT": "https://bench.example",
+            "VOICE_LIVE_MODEL": "bench",
+            "AZURE_VOICE_LIVE_API_KEY": "bench",
+            "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID": "",
+            "ACS_AUDIO_FORMAT": "pcm24KMono",
+            "CONVERSATION_LOG_DIR": logs_dir,
+        }
+
+        # Warm-up: the first handlers pay for one-off module and class state
+        handlers = []
+        for _ in range(calls):
+            handler = ACSMediaHandler(config)
+            await handler.init_incoming_websocket(StubSocket(), is_raw_audio=False)
+            handlers.append(handler)
+        del handlers
+
+        def make_handlers():
+            created = [ACSMediaHandler(config) for _ in range(calls)]
+            for handler in created:
+                # init_incoming_websocket only assigns attributes here (no capture, no resampling)
+                handler.incoming_websocket = StubSocket()
+                handler.is_raw_audio = False
+            return created
+
+        per_call = measure(make_handlers) / calls
+
+        handler = ACSMediaHandler(config)
+
+        def log_events():
+            for i in range(events):
+                if i % 4 == 0:
+                    handler._log_conversation_event(
+                        "speech_started",
+                        "user",
+                        "User started speaking",
+                        {"audio_start_ms": i * 1000},
+                    )
+                elif i % 4 == 1:
+                    handler._log_conversation_event(
+                        "speech_stopped", "user", "User stopped speaking"
+                    )
+                elif i % 4 == 2:
+                    handler._log_conversation_event(
+                        "transcript",
+                        "user",
+                        "I'd like to ask about the program",
+                        {"item_id": f"item_{i}"},
+                    )
+                else:
+                    handler._log_conversation_event(
+                        "transcript",
+                        "assistant",
+                        "Of course, happy to help. Could I start with your name?",
+                        {"response_id": f"resp_{i}", "item_id": f"item_{i}"},
+                    )
+            return handler.conversation_log
+
+        per_event = measure(log_events) / events
+
+        frame = base64.b64encode(os.urandom(24000 * 2 * frame_ms // 1000)).decode(
+            "ascii"
+        )
+        queue_handler = ACSMediaHandler(config)
+
+        def fill_queue():
+            while not queue_handler.send_queue.full():
+                queue_handler.send_queue.put_nowait(
+                    '{"type": "input_audio_buffer.append", "audio": "' + frame + '"}'
+                )
+            return queue_handler.send_queue
+
+        full_queue = measure(fill_queue)
+
+    print(f"Per concurrent call:     {per_call / 1024:.1f} KiB ({calls} handlers)")
+    print(f"Per conversation event:  {per_event:.0f} bytes ({events} events)")
+    print(
+        f"Full send queue:         {full_queue / 1024:.1f} KiB ({queue_handler.send_queue.maxsize} x {frame_ms}ms frames)"
+    )
+    for concurrent in (100, 500, 1000):
+        steady = concurrent * (per_call + per_event * 200)
+        worst = steady + concurrent * full_queue
+        print(
+            f"{concurrent:5d} calls, 200 events: {steady / 2 ** 20:7.1f} MiB steady, "
+            f"{worst / 2 ** 20:7.1f} MiB with every send queue full"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Measure per-call and per-event memory."
+    )
+    parser.add_argument(
+        "--calls", type=int, default=500, help="Concurrent handlers to create"
+    )
+    parser.add_argument(
+        "--events", type=int, default=2000, help="Conversation events to log"
+    )
+    parser.add_argument(
+        "--frame-ms", type=int, default=20, help="Audio per queued ACS frame"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.events, args.frame_ms))
+
+
+if __name__ == "__main__":
+    main()
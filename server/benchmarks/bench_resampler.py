@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark and quality-check the ACS <-> Voice Live streaming resampler.
+
+Reports CPU cost per second of audio for 16 kHz -> 24 kHz (inbound) and
+24 kHz -> 16 kHz (outbound), plus the SNR of a resampled test tone and
+whether frame-by-frame output matches one-shot output (no boundary clicks).
+With --check, exits non-zero when quality regresses.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_resampler
+    python -m benchmarks.bench_resampler --check
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.audio.resampler import StreamingResampler
+
+MIN_SNR_DB = 60.0
+TONE_HZ = 1000.0
+
+
+def tone(sample_rate: int, seconds: float) -> bytes:
+    """A -12 dBFS sine tone as PCM16 bytes."""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (8000 * np.sin(2 * np.pi * TONE_HZ * t)).astype("<i2").tobytes()
+
+
+def tone_snr_db(audio: bytes, sample_rate: int) -> float:
+    """SNR of a resampled tone against its least-squares sine fit, ignoring filter edges."""
+    samples = np.frombuffer(audio, dtype="<i2").astype(np.float64)[200:-200]
+    t = (np.arange(samples.size) + 200) / sample_rate
+    basis = np.stack(
+        [np.sin(2 * np.pi * TONE_HZ * t), np.cos(2 * np.pi * TONE_HZ * t)], axis=1
+    )
+    coeffs, *_ = np.linalg.lstsq(basis, samples, rcond=None)
+    fitted = basis @ coeffs
+    return float(10 * np.log10(fitted.var() / (samples - fitted).var()))
+
+
+def run(in_rate: int, out_rate: int, seconds: float, frame_ms: int) -> dict:
+    """Resamples a tone frame by frame and returns timing and quality figures."""
+    audio = tone(in_rate, seconds)
+    frame_bytes = in_rate * frame_ms // 1000 * 2
+    frames = [audio[i : i + frame_bytes] for i in range(0, len(audio), frame_bytes)]
+
+    resampler = StreamingResampler(in_rate, out_rate)
+    start = time.process_time()
+    streamed = b"".join(resampler.process(frame) for frame in frames)
+    cpu = time.process_time() - start
+
+    one_shot = StreamingResampler(in_rate, out_rate).process(audio)
+    return {
+        "cpu_us_per_audio_second": cpu / seconds * 1e6,
+        "snr_db": tone_snr_db(streamed, out_rate),
+        "seamless": streamed == one_shot,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the streaming resampler.")
+    parser.add_argument(
+        "--seconds", type=float, default=60.0, help="Seconds of audio per direction"
+    )
+    parser.add_argument(
+        "--frame-ms", type=int, default=20, help="ACS media frame size in milliseconds"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Exit non-zero if quality regresses"
+    )
+    args = parser.parse_args()
+
+    ok = True
+    for label, in_rate, out_rate in (
+        ("inbound", 16000, 24000),
+        ("outbound", 24000, 16000),
+    ):
+        result = run(in_rate, out_rate, args.seconds, args.frame_ms)
+        print(
+            f"{label:9s} {in_rate} -> {out_rate} Hz: "
+            f"{result['cpu_us_per_audio_second']:.0f} us CPU per audio second, "
+            f"SNR {result['snr_db']:.1f} dB, seamless={result['seamless']}"
+        )
+        ok = ok and result["seamless"] and result["snr_db"] >= MIN_SNR_DB
+
+    if args.check and not ok:
+        print(
+            f"Quality regression: expected seamless output and SNR >= {MIN_SNR_DB} dB"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
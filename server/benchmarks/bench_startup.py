@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: module import time and time until /healthz and /readyz answer 200.
+
+Each run starts a fresh interpreter serving the app on a free localhost port
+and polls both endpoints. The "eager" variant imports the deferred SDKs
+(app.handler.warmup.DEFERRED_SDK_MODULES) before the app, which is how the
+server started before they were made lazy.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+FAKE_CONNECTION_STRING = (
+    "endpoint=https://bench.communication.azure.com/;accesskey=YmVuY2g="
+)
+
+SERVE_SNIPPET = """
+import time
+started = time.perf_counter()
+{preload}
+import asyncio
+import server
+print(json.dumps({{"import_ms": (time.perf_counter() - started) * 1000}}), flush=True)
+from app.handler.transport import hypercorn_config
+from hypercorn.asyncio import serve
+asyncio.run(serve(server.app, hypercorn_config(server.transport, "127.0.0.1:{port}")))
+"""
+
+EAGER_PRELOAD = "from app.handler.warmup import import_modules; import_modules()"
+
+
+def free_port() -> int:
+    """Returns a localhost port that is currently unused."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status(url: str) -> int:
+    """Returns the HTTP status of a GET, or 0 if the server is not accepting connections."""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def run_once(eager: bool, timeout: float, verbose: bool) -> dict:
+    """Starts one server process and returns its import, live and ready times in milliseconds."""
+    port = free_port()
+    code = "import json\n" + SERVE_SNIPPET.format(
+        preload=EAGER_PRELOAD if eager else "", port=port
+    )
+    env = dict(
+        os.environ,
+        ACS_CONNECTION_STRING=os.environ.get(
+            "ACS_CONNECTION_STRING", FAKE_CONNECTION_STRING
+        ),
+        LOG_LEVEL="WARNING",
+        QUART_DEBUG="false",
+    )
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=None if verbose else subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        result = json.loads(process.stdout.readline())
+        base = f"http://127.0.0.1:{port}"
+        while "live_ms" not in result or "ready_ms" not in result:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"server not ready after {timeout}s: {result}")
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if "live_ms" not in result and status(f"{base}/healthz") == 200:
+                result["live_ms"] = elapsed_ms
+            if "live_ms" in result and status(f"{base}/readyz") == 200:
+                result["ready_ms"] = (time.perf_counter() - started) * 1000
+            time.sleep(0.005)
+        return result
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark server cold start.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the server processes' logs"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'variant':<8} {'import':>10} {'/healthz':>10} {'/readyz':>10}   (median of {args.runs} runs, ms)"
+    )
+    for variant, eager in (("lazy", False), ("eager", True)):
+        runs = [run_once(eager, args.timeout, args.verbose) for _ in range(args.runs)]
+        print(
+            f"{variant:<8} "
+            + " ".join(
+                f"{statistics.median(run[key] for run in runs):>10.0f}"
+                for key in ("import_ms", "live_ms", "ready_ms")
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compare CPU and forwarding latency of the WebSocket transport profiles.
+
+For each profile in TRANSPORT_PROFILES a web-client session runs against the
+local Voice Live stand-in in echo mode: every audio frame sent to Voice Live
+comes back as a response.audio.delta and is forwarded to the client socket.
+Latency is measured from handing a frame to the handler until its echo
+reaches the client. CPU covers both ends of the link, since the stand-in
+runs in this process.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_transport
+    python -m benchmarks.bench_transport --frames 2000 --frame-ms 20 --pace
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from app.handler.acs_media_handler import ACSMediaHandler
+from app.handler.transport import TRANSPORT_PROFILES, transport_profile
+from benchmarks.voicelive_standin import VoiceLiveStandIn
+
+
+class TimestampSocket:
+    """Client socket stand-in that timestamps forwarded audio."""
+
+    def __init__(self):
+        self.received: List[float] = []
+
+    async def send(self, message) -> None:
+        if isinstance(message, (bytes, bytearray)):
+            self.received.append(time.perf_counter())
+
+
+def speech_like_frames(
+    count: int, frame_ms: int, sample_rate: int = 24000
+) -> List[bytes]:
+    """Noisy tone frames; like real speech they compress poorly once base64-encoded."""
+    rng = np.random.default_rng(0)
+    samples = sample_rate * frame_ms // 1000
+    t = np.arange(samples * count) / sample_rate
+    signal = 4000 * np.sin(2 * np.pi * 180 * t) + rng.normal(0, 1500, t.size)
+    pcm = np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+    return [pcm[i * samples * 2 : (i + 1) * samples * 2] for i in range(count)]
+
+
+async def run_profile(
+    name: str, frames: List[bytes], frame_ms: int, pace: bool
+) -> dict:
+    profile = transport_profile({"TRANSPORT_PROFILE": name})
+    standin = VoiceLiveStandIn(echo=True)
+    await standin.start()
+    with tempfile.TemporaryDirectory() as logs_dir:
+        handler = ACSMediaHandler(
+            {
+                "AZURE_VOICE_LIVE_ENDPOINT": standin.endpoint,
+                "VOICE_LIVE_MODEL": "bench",
+                "AZURE_VOICE_LIVE_API_KEY": "bench",
+                "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID": "",
+                "CONVERSATION_LOG_DIR": logs_dir,
+                "VOICELIVE_CONNECT_OPTIONS": profile.voicelive,
+            }
+        )
+        socket = TimestampSocket()
+        await handler.init_incoming_websocket(socket, is_raw_audio=True)
+        await handler.connect()
+        extensions = [type(ext).__name__ for ext in handler.ws.protocol.extensions]
+
+        sent: List[float] = []
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for frame in frames:
+            sent.append(time.perf_counter())
+            await handler.web_to_voicelive(frame)
+            if pace:
+                await asyncio.sleep(frame_ms / 1000)
+            else:
+                await asyncio.sleep(0)
+        deadline = time.perf_counter() + 5
+        while len(socket.received) < len(frames) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        await handler.close()
+    await standin.stop()
+
+    latencies = np.array([(r - s) * 1000 for s, r in zip(sent, socket.received)])
+    return {
+        "extensions": ", ".join(extensions) or "none",
+        "echoed": len(socket.received),
+        "cpu_per_frame_us": cpu / len(frames) * 1e6,
+        "wall": wall,
+        "p50": float(np.percentile(latencies, 50)) if latencies.size else float("nan"),
+        "p99": float(np.percentile(latencies, 99)) if latencies.size else float("nan"),
+    }
+
+
+async def run(frames: int, frame_ms: int, pace: bool) -> None:
+    audio = speech_like_frames(frames, frame_ms)
+    print(f"{frames} frames of {frame_ms}ms, {'paced' if pace else 'unpaced'}")
+    print(
+        f"{'Profile':18s} {'Extensions':24s} {'Echoed':>7s} {'CPU/frame':>10s} {'p50':>8s} {'p99':>8s}"
+    )
+    for name in TRANSPORT_PROFILES:
+        result = await run_profile(name, audio, frame_ms, pace)
+        print(
+            f"{name:18s} {result['extensions']:24s} {result['echoed']:7d} "
+            f"{result['cpu_per_frame_us']:8.0f}us {result['p50']:6.2f}ms {result['p99']:6.2f}ms"
+        )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark WebSocket transport profiles."
+    )
+    parser.add_argument(
+        "--frames", type=int, default=1000, help="Audio frames to send per profile"
+    )
+    parser.add_argument("--frame-ms", type=int, default=20, help="Audio per frame")
+    parser.add_argument(
+        "--pace",
+        action="store_true",
+        help="Send frames in real time instead of back to back",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show handler logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    asyncio.run(run(args.frames, args.frame_ms, args.pace))
+
+
+if __name__ == "__main__":
+    main()
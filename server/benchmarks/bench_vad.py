@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CPU cost of the /web/ws energy VAD per second of audio.
+
+Usage (from the server/ directory):
+    python -m benchmarks.bench_vad
+    python -m benchmarks.bench_vad --seconds 600 --chunk-ms 170
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.audio.vad import EnergyVad
+
+
+def synthesize_speech_like(seconds: float, sample_rate: int) -> np.ndarray:
+    """Alternating 1.5s bursts of tone+noise and 3s of low-level noise."""
+    rng = np.random.default_rng(0)
+    total = int(seconds * sample_rate)
+    t = np.arange(total) / sample_rate
+    signal = rng.normal(0, 20, total)
+    voiced = (t % 4.5) < 1.5
+    signal[voiced] += 6000 * np.sin(2 * np.pi * 220 * t[voiced]) + rng.normal(
+        0, 800, voiced.sum()
+    )
+    return np.clip(signal, -32768, 32767).astype("<i2")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark EnergyVad CPU cost.")
+    parser.add_argument(
+        "--seconds", type=float, default=300.0, help="Seconds of audio to process"
+    )
+    parser.add_argument(
+        "--chunk-ms", type=int, default=170, help="Chunk size in milliseconds"
+    )
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    audio = synthesize_speech_like(args.seconds, args.sample_rate).tobytes()
+    chunk_bytes = args.sample_rate * args.chunk_ms // 1000 * 2
+    chunks = [audio[i : i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+
+    vad = EnergyVad(sample_rate=args.sample_rate)
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    for chunk in chunks:
+        vad.process(chunk)
+    cpu = time.process_time() - start_cpu
+    wall = time.perf_counter() - start_wall
+
+    stats = vad.stats()
+    print(
+        f"Audio processed:        {args.seconds:.0f}s in {len(chunks)} chunks of {args.chunk_ms}ms"
+    )
+    print(f"CPU per audio second:   {cpu / args.seconds * 1e6:.1f} us")
+    print(f"Wall per chunk:         {wall / len(chunks) * 1e6:.1f} us")
+    print(f"Bytes forwarded:        {stats['bytes_out'] / stats['bytes_in']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
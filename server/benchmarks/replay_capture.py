@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded call capture through ACSMediaHandler against the local Voice Live stand-in.
+
+Captures are written when CALL_CAPTURE_DIR is set. Client frames are fed to
+the handler and Voice Live messages are played by the stand-in at their
+recorded offsets (divided by --speed), so the traffic shape of a production
+call can be reproduced offline and forwarding latency compared across changes.
+
+Usage (from the server/ directory):
+    python -m benchmarks.replay_capture captures/capture_20250101_120000_abcd1234.vlcap
+    python -m benchmarks.replay_capture <capture> --speed 4
+    python -m benchmarks.replay_capture <capture> --speed 0      # as fast as possible
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from app.handler.acs_media_handler import ACSMediaHandler
+from app.handler.call_capture import (
+    DIRECTION_CLIENT_IN,
+    DIRECTION_VOICELIVE_IN,
+    CallCaptureReader,
+)
+from benchmarks.voicelive_standin import VoiceLiveStandIn
+
+
+class RecordingSocket:
+    """Stands in for the client WebSocket and timestamps what the handler sends."""
+
+    def __init__(self):
+        self.audio_sent: List[float] = []
+        self.control_sent: int = 0
+
+    async def send(self, message) -> None:
+        if isinstance(message, (bytes, bytearray)) or '"AudioData"' in message[:32]:
+            self.audio_sent.append(time.perf_counter())
+        else:
+            self.control_sent += 1
+
+
+def describe_latencies(label: str, pairs: List[Tuple[float, float]]) -> None:
+    """Prints percentile figures for (sent, received) timestamp pairs."""
+    if not pairs:
+        print(f"{label:28s} no samples")
+        return
+    latencies = sorted((received - sent) * 1000 for sent, received in pairs)
+
+    def pick(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    print(
+        f"{label:28s} n={len(latencies)} p50={pick(0.5):.2f}ms p99={pick(0.99):.2f}ms max={latencies[-1]:.2f}ms"
+    )
+
+
+async def replay(path: Path, speed: float) -> None:
+    reader = CallCaptureReader(path)
+    metadata = reader.metadata
+    records = list(reader)
+    client_frames = [
+        (r.offset, r.payload) for r in records if r.direction == DIRECTION_CLIENT_IN
+    ]
+    voicelive_messages = [
+        (r.offset, r.payload) for r in records if r.direction == DIRECTION_VOICELIVE_IN
+    ]
+
+    standin = VoiceLiveStandIn(script=voicelive_messages, speed=speed)
+    await standin.start()
+
+    with tempfile.TemporaryDirectory() as logs_dir:
+        config = {
+            "AZURE_VOICE_LIVE_ENDPOINT": standin.endpoint,
+            "VOICE_LIVE_MODEL": "replay",
+            "AZURE_VOICE_LIVE_API_KEY": "replay",
+            "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID": "",
+            "ACS_AUDIO_FORMAT": metadata.get("acs_audio_format", "pcm24KMono"),
+            "CONVERSATION_LOG_DIR": logs_dir,
+        }
+        handler = ACSMediaHandler(config)
+        socket = RecordingSocket()
+        is_raw_audio = metadata.get("is_raw_audio", False)
+        await handler.init_incoming_websocket(
+            socket, is_raw_audio=is_raw_audio, codec=metadata.get("web_codec", "pcm16")
+        )
+        forward = handler.web_to_voicelive if is_raw_audio else handler.acs_to_voicelive
+
+        standin.start_clock()
+        start = standin.clock_start
+        await handler.connect()
+
+        forwarded: List[float] = []
+        for offset, payload in client_frames:
+            if speed > 0:
+                delay = start + offset / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            before = handler.send_queue.qsize()
+            sent_at = time.perf_counter()
+            await forward(payload)
+            if handler.send_queue.qsize() > before:
+                forwarded.append(sent_at)
+
+        # Let the remaining scripted Voice Live traffic play out
+        last_offset = voicelive_messages[-1][0] if voicelive_messages else 0.0
+        remaining = (
+            start + (last_offset / speed if speed > 0 else 0.0) - time.perf_counter()
+        )
+        await asyncio.sleep(max(remaining, 0.0) + 0.5)
+        elapsed = time.perf_counter() - start
+        await handler.close()
+
+    await standin.stop()
+    reader.close()
+
+    appends = [
+        t
+        for t, event_type in standin.received
+        if event_type == "input_audio_buffer.append"
+    ]
+    deltas = [
+        t for t, event_type in standin.sent if event_type == "response.audio.delta"
+    ]
+
+    print(f"Capture:                     {path.name} ({metadata.get('session_id')})")
+    print(
+        f"Client frames / VL messages: {len(client_frames)} / {len(voicelive_messages)}"
+    )
+    print(f"Replay time:                 {elapsed:.2f}s at speed {speed or 'max'}")
+    describe_latencies(
+        "Client -> Voice Live",
+        list(zip(forwarded, appends)) if len(forwarded) == len(appends) else [],
+    )
+    describe_latencies(
+        "Voice Live -> client audio", list(zip(deltas, socket.audio_sent))
+    )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Replay a call capture against the Voice Live stand-in."
+    )
+    parser.add_argument("capture", help="Path to a .vlcap capture file")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Playback speed multiplier (0 = no pacing)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show handler logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(replay(Path(args.capture), args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Local stand-in for a Redis server, for benchmarking the shared call-state store.
+
+Speaks RESP2 over TCP and implements only the commands the call-state store
+uses (HSET, HGETALL, EXPIRE, DEL, PING). HELLO is refused as by a pre-6.0
+server; other connection setup commands such as CLIENT SETINFO and SELECT
+are acknowledged with +OK. Expiry is checked lazily
+on read.
+
+Run it as its own process so server work does not share the GIL with the
+client being measured:
+    python -m benchmarks.resp_standin --port 6379
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+
+class RespStandIn:
+    """In-process TCP server speaking enough of the Redis protocol."""
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        """redis:// URL to use as CALL_STATE_REDIS_URL."""
+        port = self._server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def start(self) -> None:
+        """Starts listening on localhost (an ephemeral port unless one was given)."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+
+    async def stop(self) -> None:
+        """Stops the server."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                writer.write(self._execute(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        header = await reader.readline()
+        if not header:
+            return None
+        if not header.startswith(b"*"):
+            return header.split()
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _live(self, key: bytes) -> Optional[Dict[bytes, bytes]]:
+        expires = self.expires.get(key)
+        if expires is not None and expires < time.monotonic():
+            self.hashes.pop(key, None)
+            self.expires.pop(key, None)
+        return self.hashes.get(key)
+
+    def _execute(self, command: List[bytes]) -> bytes:
+        self.commands += 1
+        name = command[0].upper()
+        if name == b"HELLO":
+            # Like a pre-6.0 server, so clients fall back to RESP2
+            return b"-ERR unknown command 'HELLO'\r\n"
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"HSET":
+            fields = self._live(command[1])
+            if fields is None:
+                fields = self.hashes[command[1]] = {}
+            added = 0
+            for i in range(2, len(command) - 1, 2):
+                added += command[i] not in fields
+                fields[command[i]] = command[i + 1]
+            return b":%d\r\n" % added
+        if name == b"HGETALL":
+            fields = self._live(command[1]) or {}
+            parts = [b"*%d\r\n" % (2 * len(fields))]
+            for field, value in fields.items():
+                parts.append(
+                    b"$%d\r\n%s\r\n$%d\r\n%s\r\n"
+                    % (len(field), field, len(value), value)
+                )
+            return b"".join(parts)
+        if name == b"EXPIRE":
+            if self._live(command[1]) is None:
+                return b":0\r\n"
+            self.expires[command[1]] = time.monotonic() + int(command[2])
+            return b":1\r\n"
+        if name == b"DEL":
+            removed = 0
+            for key in command[1:]:
+                removed += self._live(key) is not None
+                self.hashes.pop(key, None)
+                self.expires.pop(key, None)
+            return b":%d\r\n" % removed
+        return b"+OK\r\n"
+
+
+async def serve_forever(port: int) -> None:
+    """Serves until cancelled, printing the URL once listening."""
+    standin = RespStandIn(port)
+    await standin.start()
+    print(standin.url, flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Minimal RESP2 server for call-state benchmarks."
+    )
+    parser.add_argument(
+        "--port", type=int, default=0, help="Port to listen on (default: ephemeral)"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve_forever(args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
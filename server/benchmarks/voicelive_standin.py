@@ -0,0 +1,100 @@
+"""
+Local stand-in for the Voice Live realtime WebSocket, for benchmarks and replay.
+
+Point ``AZURE_VOICE_LIVE_ENDPOINT`` at ``standin.endpoint`` (an http:// URL)
+and ``ACSMediaHandler`` connects to it instead of Azure. The stand-in can
+play a scripted list of Voice Live messages at their recorded offsets, echo
+every ``input_audio_buffer.append`` back as a ``response.audio.delta``, or both.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from websockets.asyncio.server import serve
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceLiveStandIn:
+    """In-process WebSocket server speaking enough of the Voice Live protocol."""
+
+    def __init__(
+        self,
+        script: Optional[List[Tuple[float, str]]] = None,
+        speed: float = 1.0,
+        echo: bool = False,
+        serve_kwargs: Optional[dict] = None,
+    ):
+        # Parse message types up front so playback timing is not skewed by JSON decoding
+        self.script = [
+            (offset, message, json.loads(message).get("type"))
+            for offset, message in script or []
+        ]
+        self.speed = speed
+        self.echo = echo
+        self.serve_kwargs = serve_kwargs or {}
+        self.clock_start: Optional[float] = None
+        # (perf_counter, message type) for every message sent or received
+        self.sent: List[Tuple[float, str]] = []
+        self.received: List[Tuple[float, str]] = []
+        self._server = None
+
+    @property
+    def endpoint(self) -> str:
+        """HTTP endpoint to use as AZURE_VOICE_LIVE_ENDPOINT."""
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def start(self) -> None:
+        """Starts listening on an ephemeral localhost port."""
+        self._server = await serve(self._handle, "127.0.0.1", 0, **self.serve_kwargs)
+
+    async def stop(self) -> None:
+        """Stops the server and closes open connections."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_clock(self) -> None:
+        """Marks time zero for scripted playback; defaults to connection time."""
+        self.clock_start = time.perf_counter()
+
+    async def _handle(self, ws) -> None:
+        if self.clock_start is None:
+            self.start_clock()
+        playback = asyncio.create_task(self._play_script(ws)) if self.script else None
+        try:
+            async for message in ws:
+                event = json.loads(message)
+                event_type = event.get("type")
+                self.received.append((time.perf_counter(), event_type))
+                if self.echo and event_type == "input_audio_buffer.append":
+                    reply = json.dumps(
+                        {
+                            "type": "response.audio.delta",
+                            "response_id": "standin",
+                            "delta": event["audio"],
+                        }
+                    )
+                    await self._send(ws, reply, "response.audio.delta")
+        except Exception:
+            logger.debug("[VoiceLiveStandIn] Connection closed", exc_info=True)
+        finally:
+            if playback:
+                playback.cancel()
+
+    async def _play_script(self, ws) -> None:
+        for offset, message, event_type in self.script:
+            if self.speed > 0:
+                delay = self.clock_start + offset / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._send(ws, message, event_type)
+
+    async def _send(self, ws, message: str, event_type: Optional[str]) -> None:
+        self.sent.append((time.perf_counter(), event_type))
+        await ws.send(message)
@@ -7,6 +7,9 @@ Usage:
     python conversation_analyzer.py <log_file.json>          # Analyze specific conversation
     python conversation_analyzer.py --list                   # List all available logs
     python conversation_analyzer.py --summary               # Show quick summary only
+    python conversation_analyzer.py --compare-profiles      # Compare response times between session profiles
+    python conversation_analyzer.py --export-table events.npz  # Flatten all logs into a columnar table
+    python conversation_analyzer.py --fleet [events.npz]    # Fleet-wide statistics (from a table or all logs)
 """
 
 import argparse
@@ -16,6 +19,43 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
+
+
+# Per-conversation audio quality columns of the event table -> (direction, field) in the log's audio_quality
+AUDIO_QUALITY_COLUMNS = {
+    "session_caller_level": ("caller", "level_dbfs"),
+    "session_caller_snr": ("caller", "snr_db"),
+    "session_caller_clipping": ("caller", "clipping_ratio"),
+    "session_caller_silence": ("caller", "silence_ratio"),
+    "session_assistant_level": ("assistant", "level_dbfs"),
+}
+
+# Caller SNR bands (lower bound in dB, label) for comparing response times by input quality
+SNR_BANDS = ((-np.inf, "< 15 dB"), (15.0, "15-25 dB"), (25.0, ">= 25 dB"))
+
+# Caller clipping ratio above which a conversation counts as clipped
+CLIPPING_RATIO_THRESHOLD = 0.001
+
+
+def compute_response_times(conversation: List[Dict]) -> List[float]:
+    """Seconds from each user speech_stopped to the next assistant transcript."""
+    response_times = []
+    for i, event in enumerate(conversation):
+        if event["event_type"] == "speech_stopped" and event["speaker"] == "user":
+            # Find next assistant transcript
+            for j in range(i + 1, len(conversation)):
+                if (
+                    conversation[j]["event_type"] == "transcript"
+                    and conversation[j]["speaker"] == "assistant"
+                ):
+                    response_time = (
+                        conversation[j]["elapsed_seconds"] - event["elapsed_seconds"]
+                    )
+                    response_times.append(response_time)
+                    break
+    return response_times
+
 
 class ConversationAnalyzer:
     """Analyzes conversation logs with timing and interaction patterns."""
@@ -47,6 +87,7 @@ class ConversationAnalyzer:
         print(f"Duration:      {self.data['session_duration_seconds']:.2f} seconds")
         print(f"Total Events:  {self.data['total_events']}")
         print(f"Model:         {self.data['model']}")
+        print(f"Profile:       {self.data.get('profile', 'default')}")
         print("=" * 80)
         print()
 
@@ -95,31 +136,26 @@ class ConversationAnalyzer:
         assistant_transcripts = [e for e in transcripts if e["speaker"] == "assistant"]
 
         # Calculate response times (time between user stopping speech and assistant responding)
-        response_times = []
-        for i, event in enumerate(conversation):
-            if event["event_type"] == "speech_stopped" and event["speaker"] == "user":
-                # Find next assistant transcript
-                for j in range(i + 1, len(conversation)):
-                    if (conversation[j]["event_type"] == "transcript" and
-                            conversation[j]["speaker"] == "assistant"):
-                        response_time = (conversation[j]["elapsed_seconds"] -
-                                         event["elapsed_seconds"])
-                        response_times.append(response_time)
-                        break
+        response_times = compute_response_times(conversation)
 
         # Calculate pauses
-        all_delays = [e.get("time_since_last_event", 0) for e in conversation
-                      if e.get("time_since_last_event")]
+        all_delays = [
+            e.get("time_since_last_event", 0)
+            for e in conversation
+            if e.get("time_since_last_event")
+        ]
         significant_pauses = [d for d in all_delays if d > 2.0]
 
         return {
             "total_user_turns": len(user_transcripts),
             "total_assistant_turns": len(assistant_transcripts),
-            "avg_response_time": sum(response_times) / len(response_times) if response_times else 0,
+            "avg_response_time": sum(response_times) / len(response_times)
+            if response_times
+            else 0,
             "min_response_time": min(response_times) if response_times else 0,
             "max_response_time": max(response_times) if response_times else 0,
             "significant_pauses_count": len(significant_pauses),
-            "longest_pause": max(significant_pauses) if significant_pauses else 0
+            "longest_pause": max(significant_pauses) if significant_pauses else 0,
         }
 
     def print_analysis(self) -> None:
@@ -130,12 +166,32 @@ class ConversationAnalyzer:
         print("-" * 80)
         print(f"User turns:              {stats['total_user_turns']}")
         print(f"Assistant turns:         {stats['total_assistant_turns']}")
-        print(f"\nResponse Times:")
+        print("\nResponse Times:")
         print(f"  Average:               {stats['avg_response_time']:.2f}s")
         print(f"  Fastest:               {stats['min_response_time']:.2f}s")
         print(f"  Slowest:               {stats['max_response_time']:.2f}s")
         print(f"\nPauses (>2s):            {stats['significant_pauses_count']}")
         print(f"Longest pause:           {stats['longest_pause']:.2f}s")
+
+        quality = self.data.get("audio_quality") if self.data else None
+        if quality:
+            print(
+                f"\nAudio Quality (1 in {quality.get('sample_every', 1)} frames analyzed):"
+            )
+            for direction in ("caller", "assistant"):
+                figures = quality.get(direction) or {}
+                parts = [f"{figures.get('frames_analyzed', 0)} frames"]
+                if figures.get("level_dbfs") is not None:
+                    parts.append(f"level {figures['level_dbfs']:.1f} dBFS")
+                if "peak_dbfs" in figures:
+                    parts.append(f"peak {figures['peak_dbfs']:.1f} dBFS")
+                if "clipping_ratio" in figures:
+                    parts.append(f"clipping {figures['clipping_ratio']:.2%}")
+                if "silence_ratio" in figures:
+                    parts.append(f"silence {figures['silence_ratio']:.0%}")
+                if figures.get("snr_db") is not None:
+                    parts.append(f"SNR ~{figures['snr_db']:.0f} dB")
+                print(f"  {direction.capitalize():22s} {', '.join(parts)}")
         print("-" * 80)
 
     def export_transcript(self, output_path: Path) -> None:
@@ -143,11 +199,12 @@ class ConversationAnalyzer:
         if not self.data or "conversation" not in self.data:
             return
 
-        transcripts = [e for e in self.data["conversation"]
-                       if e["event_type"] == "transcript"]
+        transcripts = [
+            e for e in self.data["conversation"] if e["event_type"] == "transcript"
+        ]
 
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(f"Conversation Transcript\n")
+            f.write("Conversation Transcript\n")
             f.write(f"Session: {self.data['session_id']}\n")
             f.write(f"Date: {self.data['session_start']}\n")
             f.write(f"Duration: {self.data['session_duration_seconds']:.2f}s\n")
@@ -189,18 +246,336 @@ def list_logs(logs_dir: Path) -> None:
             with open(log_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
-            session_start = datetime.fromisoformat(data["session_start"]).strftime("%Y-%m-%d %H:%M:%S")
+            session_start = datetime.fromisoformat(data["session_start"]).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
             duration = data["session_duration_seconds"]
             events = data["total_events"]
 
             print(f"{log_file.name}")
-            print(f"  Date: {session_start} | Duration: {duration:.1f}s | Events: {events}")
+            print(
+                f"  Date: {session_start} | Duration: {duration:.1f}s | Events: {events}"
+            )
         except Exception:
             print(f"{log_file.name} (error reading file)")
 
     print("-" * 80)
 
 
+def compare_profiles(logs_dir: Path) -> None:
+    """Compare response-time distributions between session profiles across all logs."""
+    table = build_event_table(sorted(logs_dir.glob("conversation_*.json")))
+    if not len(table["session_ids"]):
+        print("No conversation logs found.")
+        return
+    # Same per-profile figures as the fleet statistics
+    by_profile = fleet_statistics(table)["by_profile"]
+
+    print("\nRESPONSE TIMES BY SESSION PROFILE")
+    print("-" * 80)
+    print(
+        f"{'Profile':20s} {'Calls':>6s} {'Turns':>6s} {'Mean':>7s} {'p50':>7s} {'p90':>7s} {'p99':>7s} {'Max':>7s}"
+    )
+    medians = {}
+    for profile, entry in sorted(by_profile.items()):
+        if not entry["responses"]:
+            print(f"{profile:20s} {entry['conversations']:6d} {0:6d}   (no responses)")
+            continue
+        pct = entry["percentiles"]
+        medians[profile] = pct[50]
+        print(
+            f"{profile:20s} {entry['conversations']:6d} {entry['responses']:6d} "
+            f"{entry['mean']:6.2f}s {pct[50]:6.2f}s {pct[90]:6.2f}s "
+            f"{pct[99]:6.2f}s {entry['max']:6.2f}s"
+        )
+
+    baseline = "default" if "default" in medians else next(iter(sorted(medians)), None)
+    if baseline and len(medians) > 1:
+        print(f"\nMedian vs {baseline}:")
+        for profile, median in sorted(medians.items()):
+            if profile != baseline:
+                delta = median - medians[baseline]
+                print(
+                    f"  {profile:20s} {delta:+.2f}s ({delta / medians[baseline]:+.0%})"
+                    if medians[baseline]
+                    else f"  {profile:20s} {delta:+.2f}s"
+                )
+    print("-" * 80)
+
+
+def build_event_table(log_files: List[Path]) -> Dict[str, np.ndarray]:
+    """
+    Flatten conversation logs into typed columns, one row per event.
+
+    Event types, speakers, sessions and profiles are dictionary-encoded: the
+    row columns hold integer codes into the matching ``*_names`` arrays.
+    Missing gaps (the first event of a session) are NaN, as are the
+    per-session audio quality columns of logs without an audio_quality summary.
+    """
+    session_ids, profiles = [], []
+    quality_cols: Dict[str, list] = {column: [] for column in AUDIO_QUALITY_COLUMNS}
+    event_types: Dict[str, int] = {}
+    speakers: Dict[str, int] = {}
+    profile_codes: Dict[str, int] = {}
+    session_col, event_col, speaker_col, elapsed_col, gap_col = [], [], [], [], []
+
+    for log_file in log_files:
+        try:
+            with open(log_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            print(f"Skipping {log_file.name} (error reading file)")
+            continue
+        session = len(session_ids)
+        session_ids.append(data.get("session_id", log_file.stem))
+        profiles.append(
+            profile_codes.setdefault(data.get("profile", "default"), len(profile_codes))
+        )
+        quality = data.get("audio_quality") or {}
+        for column, (direction, field) in AUDIO_QUALITY_COLUMNS.items():
+            value = (quality.get(direction) or {}).get(field)
+            quality_cols[column].append(np.nan if value is None else value)
+        for event in data.get("conversation", []):
+            session_col.append(session)
+            event_col.append(
+                event_types.setdefault(event["event_type"], len(event_types))
+            )
+            speaker_col.append(speakers.setdefault(event["speaker"], len(speakers)))
+            elapsed_col.append(event["elapsed_seconds"])
+            gap = event.get("time_since_last_event")
+            gap_col.append(np.nan if gap is None else gap)
+
+    return {
+        "session": np.asarray(session_col, dtype=np.int32),
+        "event_type": np.asarray(event_col, dtype=np.int8),
+        "speaker": np.asarray(speaker_col, dtype=np.int8),
+        "elapsed": np.asarray(elapsed_col, dtype=np.float64),
+        "gap": np.asarray(gap_col, dtype=np.float64),
+        "session_ids": np.asarray(session_ids, dtype=str),
+        "session_profile": np.asarray(profiles, dtype=np.int16),
+        "event_type_names": np.asarray(list(event_types), dtype=str),
+        "speaker_names": np.asarray(list(speakers), dtype=str),
+        "profile_names": np.asarray(list(profile_codes), dtype=str),
+        **{
+            column: np.asarray(values, dtype=np.float64)
+            for column, values in quality_cols.items()
+        },
+    }
+
+
+def save_event_table(table: Dict[str, np.ndarray], output_path: Path) -> None:
+    """Write the table as compressed .npz, or as Parquet when the path ends in .parquet (needs pyarrow)."""
+    if output_path.suffix == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print(
+                "Parquet export needs pyarrow (pip install pyarrow); use a .npz path instead."
+            )
+            sys.exit(1)
+        rows = table["session"]
+        columns = {
+            "session_id": pa.DictionaryArray.from_arrays(
+                rows, table["session_ids"].tolist()
+            ),
+            "profile": pa.DictionaryArray.from_arrays(
+                table["session_profile"][rows].astype(np.int32),
+                table["profile_names"].tolist(),
+            ),
+            "event_type": pa.DictionaryArray.from_arrays(
+                table["event_type"], table["event_type_names"].tolist()
+            ),
+            "speaker": pa.DictionaryArray.from_arrays(
+                table["speaker"], table["speaker_names"].tolist()
+            ),
+            "elapsed": table["elapsed"],
+            "gap": table["gap"],
+        }
+        for column in AUDIO_QUALITY_COLUMNS:
+            if column in table:
+                columns[column.replace("session_", "", 1)] = table[column][rows]
+        pq.write_table(pa.table(columns), output_path)
+    else:
+        np.savez_compressed(output_path, **table)
+    print(
+        f"Exported {len(table['elapsed'])} events from {len(table['session_ids'])} conversations to {output_path}"
+    )
+
+
+def load_event_table(path: Path) -> Dict[str, np.ndarray]:
+    """Load a table written by save_event_table in .npz format."""
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _code(names: np.ndarray, name: str) -> int:
+    matches = np.flatnonzero(names == name)
+    return int(matches[0]) if len(matches) else -1
+
+
+def fleet_response_times(table: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Response time after every user speech_stopped, computed without Python loops.
+
+    Same rule as compute_response_times: each stop pairs with the next
+    assistant transcript in the same conversation. Returns one row per
+    answered stop with its session index and the response time.
+    """
+    user = _code(table["speaker_names"], "user")
+    assistant = _code(table["speaker_names"], "assistant")
+    stopped = np.flatnonzero(
+        (table["event_type"] == _code(table["event_type_names"], "speech_stopped"))
+        & (table["speaker"] == user)
+    )
+    replies = np.flatnonzero(
+        (table["event_type"] == _code(table["event_type_names"], "transcript"))
+        & (table["speaker"] == assistant)
+    )
+    if len(stopped) == 0 or len(replies) == 0:
+        return np.empty(0, dtype=[("session", np.int32), ("seconds", np.float64)])
+
+    position = np.searchsorted(replies, stopped, side="right")
+    answered = position < len(replies)
+    stopped = stopped[answered]
+    following = replies[position[answered]]
+    same_session = table["session"][following] == table["session"][stopped]
+    stopped, following = stopped[same_session], following[same_session]
+
+    result = np.empty(
+        len(stopped), dtype=[("session", np.int32), ("seconds", np.float64)]
+    )
+    result["session"] = table["session"][stopped]
+    result["seconds"] = table["elapsed"][following] - table["elapsed"][stopped]
+    return result
+
+
+def fleet_statistics(
+    table: Dict[str, np.ndarray], bin_seconds: float = 0.5, max_seconds: float = 10.0
+) -> Dict:
+    """Response-time percentiles and histogram, pause counts and per-profile breakdown."""
+    responses = fleet_response_times(table)
+    seconds = responses["seconds"]
+    gaps = table["gap"]
+    edges = np.append(np.arange(0.0, max_seconds + bin_seconds, bin_seconds), np.inf)
+    counts, _ = np.histogram(seconds, bins=edges)
+    percentiles = (50, 90, 95, 99)
+
+    by_profile = {}
+    response_profiles = table["session_profile"][responses["session"]]
+    for code, name in enumerate(table["profile_names"]):
+        profile_seconds = seconds[response_profiles == code]
+        by_profile[str(name)] = {
+            "conversations": int(np.count_nonzero(table["session_profile"] == code)),
+            "responses": int(len(profile_seconds)),
+            "mean": float(profile_seconds.mean()) if len(profile_seconds) else 0.0,
+            "max": float(profile_seconds.max()) if len(profile_seconds) else 0.0,
+            "percentiles": dict(
+                zip(percentiles, np.percentile(profile_seconds, percentiles).tolist())
+            )
+            if len(profile_seconds)
+            else {},
+        }
+
+    # Tables exported before audio quality was logged have no quality columns
+    by_snr = {}
+    clipping = {}
+    if "session_caller_snr" in table and np.any(~np.isnan(table["session_caller_snr"])):
+        snr = table["session_caller_snr"]
+        response_snr = snr[responses["session"]]
+        lows = [low for low, _ in SNR_BANDS] + [np.inf]
+        for (low, label), high in zip(SNR_BANDS, lows[1:]):
+            band_seconds = seconds[(response_snr >= low) & (response_snr < high)]
+            by_snr[label] = {
+                "conversations": int(np.count_nonzero((snr >= low) & (snr < high))),
+                "responses": int(len(band_seconds)),
+                "median": float(np.median(band_seconds)) if len(band_seconds) else None,
+            }
+        clipped = table["session_caller_clipping"] > CLIPPING_RATIO_THRESHOLD
+        clipped_seconds = seconds[clipped[responses["session"]]]
+        clipping = {
+            "conversations": int(np.count_nonzero(clipped)),
+            "median": float(np.median(clipped_seconds))
+            if len(clipped_seconds)
+            else None,
+        }
+
+    return {
+        "conversations": int(len(table["session_ids"])),
+        "events": int(len(table["elapsed"])),
+        "responses": int(len(seconds)),
+        "mean": float(seconds.mean()) if len(seconds) else 0.0,
+        "percentiles": dict(
+            zip(percentiles, np.percentile(seconds, percentiles).tolist())
+        )
+        if len(seconds)
+        else {},
+        "histogram": (edges, counts),
+        "pauses": int(np.count_nonzero(gaps > 2.0)),
+        "longest_pause": float(np.nanmax(gaps)) if np.any(~np.isnan(gaps)) else 0.0,
+        "by_profile": by_profile,
+        "by_caller_snr": by_snr,
+        "clipped_callers": clipping,
+    }
+
+
+def print_fleet_statistics(stats: Dict) -> None:
+    """Print fleet-wide statistics from fleet_statistics."""
+    print("\nFLEET STATISTICS")
+    print("-" * 80)
+    print(f"Conversations:           {stats['conversations']}")
+    print(f"Events:                  {stats['events']}")
+    print(f"Responses:               {stats['responses']}")
+    if stats["percentiles"]:
+        print(f"\nResponse Times (mean {stats['mean']:.2f}s):")
+        for pct, value in stats["percentiles"].items():
+            print(f"  p{pct:<21d} {value:.2f}s")
+
+        edges, counts = stats["histogram"]
+        peak = counts.max() or 1
+        print("\nResponse Time Histogram:")
+        for low, high, count in zip(edges[:-1], edges[1:], counts):
+            label = (
+                f"{low:4.1f}-{high:4.1f}s" if np.isfinite(high) else f"{low:4.1f}s+    "
+            )
+            print(f"  {label} {count:8d} {'#' * int(40 * count / peak)}")
+
+    print(f"\nPauses (>2s):            {stats['pauses']}")
+    print(f"Longest pause:           {stats['longest_pause']:.2f}s")
+
+    if len(stats["by_profile"]) > 1:
+        print("\nBy Profile:")
+        for name, profile in stats["by_profile"].items():
+            figures = " ".join(
+                f"p{pct}={value:.2f}s" for pct, value in profile["percentiles"].items()
+            )
+            print(
+                f"  {name:20s} {profile['conversations']:6d} calls {profile['responses']:7d} responses  {figures}"
+            )
+
+    if stats["by_caller_snr"]:
+        print("\nBy Caller SNR:")
+        for label, band in stats["by_caller_snr"].items():
+            median = (
+                f"median {band['median']:.2f}s"
+                if band["median"] is not None
+                else "no responses"
+            )
+            print(
+                f"  {label:20s} {band['conversations']:6d} calls {band['responses']:7d} responses  {median}"
+            )
+        clipped = stats["clipped_callers"]
+        median = (
+            f", median response {clipped['median']:.2f}s"
+            if clipped["median"] is not None
+            else ""
+        )
+        print(
+            f"  Clipped callers (>{CLIPPING_RATIO_THRESHOLD:.1%} samples): {clipped['conversations']}{median}"
+        )
+    print("-" * 80)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -209,35 +584,71 @@ def main():
     parser.add_argument(
         "log_file",
         nargs="?",
-        help="Path to conversation log JSON file (defaults to most recent)"
+        help="Path to conversation log JSON file (defaults to most recent)",
     )
     parser.add_argument(
-        "--list",
-        action="store_true",
-        help="List all available conversation logs"
+        "--list", action="store_true", help="List all available conversation logs"
     )
     parser.add_argument(
-        "--summary",
+        "--summary", action="store_true", help="Show summary statistics only"
+    )
+    parser.add_argument(
+        "--compare-profiles",
         action="store_true",
-        help="Show summary statistics only"
+        help="Compare response-time distributions between session profiles",
     )
     parser.add_argument(
-        "--export",
+        "--export-table",
         metavar="OUTPUT",
-        help="Export clean transcript to text file"
+        help="Flatten all logs into a columnar table (.npz, or .parquet with pyarrow)",
+    )
+    parser.add_argument(
+        "--fleet",
+        nargs="?",
+        const="",
+        metavar="TABLE",
+        help="Fleet-wide statistics from an exported .npz table, or from all logs if omitted",
+    )
+    parser.add_argument(
+        "--logs-dir",
+        help="Conversation logs directory (defaults to server/conversation_logs)",
+    )
+    parser.add_argument(
+        "--export", metavar="OUTPUT", help="Export clean transcript to text file"
     )
 
     args = parser.parse_args()
 
     # Find logs directory
     script_dir = Path(__file__).parent
-    logs_dir = script_dir / "conversation_logs"
+    logs_dir = (
+        Path(args.logs_dir) if args.logs_dir else script_dir / "conversation_logs"
+    )
 
     # Handle --list option
     if args.list:
         list_logs(logs_dir)
         return
 
+    if args.compare_profiles:
+        compare_profiles(logs_dir)
+        return
+
+    if args.export_table:
+        save_event_table(
+            build_event_table(sorted(logs_dir.glob("conversation_*.json"))),
+            Path(args.export_table),
+        )
+        return
+
+    if args.fleet is not None:
+        if args.fleet:
+            table = load_event_table(Path(args.fleet))
+        else:
+            table = build_event_table(sorted(logs_dir.glob("conversation_*.json")))
+        print_fleet_statistics(fleet_statistics(table))
+        return
+
     # Determine which log file to analyze
     if args.log_file:
         log_path = Path(args.log_file)
@@ -1,11 +1,47 @@
 import asyncio
+import hmac
+import json
 import logging
+import math
 import os
+import threading
+import time
+from urllib.parse import urlparse
 
+from app.audio.recorder import CallRecorder
+from app.audio.resampler import validate_acs_audio_format
+from app.audio.vad import EnergyVad
 from app.handler.acs_event_handler import AcsEventHandler
-from app.handler.acs_media_handler import ACSMediaHandler
+from app.handler.acs_media_handler import (
+    ACSMediaHandler,
+    dispatch_stats,
+    open_voicelive_connection,
+    voicelive_headers,
+)
+from app.handler.admission_control import AdmissionController
+from app.handler.call_state import REPLICA_NAME
+from app.handler.credentials import close_credentials
+from app.handler.greeting_cache import GreetingCache
+from app.handler.session_profiles import SessionProfiles
+from app.handler.transport import hypercorn_config, transport_profile
+from app.handler.session_registry import SessionRegistry
+from app.handler.warmup import (
+    CALL_PATH_SDK_MODULES,
+    POST_CALL_SDK_MODULES,
+    StartupWarmup,
+    import_modules,
+    start_imports,
+)
+from app.monitoring.logging_config import bind_call_context, configure_logging
+from app.monitoring.loop_monitor import LoopLagMonitor
+from app.monitoring.slow_callbacks import SlowCallbackDetector
+from app.monitoring.stack_profiler import StackSampler
 from dotenv import load_dotenv
-from quart import Quart, request, websocket
+from hypercorn.asyncio import serve
+from quart import Quart, Response, request, websocket
+
+# SDKs used to answer calls load in a thread while the rest of startup runs; the sdk_imports stage awaits them
+sdk_imports = start_imports()
 
 load_dotenv()
 
@@ -19,13 +55,212 @@ app.config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"] = os.getenv(
     "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID", ""
 )
 app.config["AZURE_STORAGE_ACCOUNT_URL"] = os.getenv("AZURE_STORAGE_ACCOUNT_URL", "")
-app.config["AZURE_STORAGE_CONTAINER"] = os.getenv("AZURE_STORAGE_CONTAINER", "conversation-logs")
+app.config["AZURE_STORAGE_CONTAINER"] = os.getenv(
+    "AZURE_STORAGE_CONTAINER", "conversation-logs"
+)
+app.config["CONVERSATION_LOG_DIR"] = os.getenv("CONVERSATION_LOG_DIR", "")
+app.config["CALL_CAPTURE_DIR"] = os.getenv("CALL_CAPTURE_DIR", "")
+app.config["RECORDING_DIR"] = os.getenv("RECORDING_DIR", "")
+app.config["RECORDING_FORMAT"] = os.getenv("RECORDING_FORMAT", "wav").lower()
+app.config["RECORDING_QUEUE_CHUNKS"] = int(os.getenv("RECORDING_QUEUE_CHUNKS", "2000"))
+app.config["RECORDING_UPLOAD"] = (
+    os.getenv("RECORDING_UPLOAD", "false").lower() == "true"
+)
+app.config["VOICELIVE_SEND_QUEUE_SIZE"] = int(
+    os.getenv("VOICELIVE_SEND_QUEUE_SIZE", "100")
+)
+app.config["GREETING_CACHE_DIR"] = os.getenv("GREETING_CACHE_DIR", "")
+app.config["CALLER_CONTEXT_URL"] = os.getenv("CALLER_CONTEXT_URL", "")
+app.config["CALLER_CONTEXT_TIMEOUT_SECONDS"] = float(
+    os.getenv("CALLER_CONTEXT_TIMEOUT_SECONDS", "2")
+)
+app.config["SESSION_PROFILES_FILE"] = os.getenv("SESSION_PROFILES_FILE", "")
+app.config["SESSION_PROFILE"] = os.getenv("SESSION_PROFILE", "default")
+app.config["SESSION_PROFILE_ASSIGNMENT"] = os.getenv(
+    "SESSION_PROFILE_ASSIGNMENT", "fixed"
+).lower()
+app.config["CALL_SETUP_PREPARE"] = (
+    os.getenv("CALL_SETUP_PREPARE", "true").lower() == "true"
+)
+app.config["CALL_SETUP_TTL_SECONDS"] = float(os.getenv("CALL_SETUP_TTL_SECONDS", "60"))
+app.config["CALL_STATE_BACKEND"] = os.getenv("CALL_STATE_BACKEND", "memory").lower()
+app.config["CALL_STATE_REDIS_URL"] = os.getenv("CALL_STATE_REDIS_URL", "")
+app.config["CALL_STATE_TTL_SECONDS"] = float(
+    os.getenv("CALL_STATE_TTL_SECONDS", "3600")
+)
+app.config["CALL_STATE_FLUSH_MS"] = float(os.getenv("CALL_STATE_FLUSH_MS", "2"))
+app.config["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "INFO").upper()
+app.config["LOG_FORMAT"] = os.getenv("LOG_FORMAT", "text").lower()
+app.config["LOG_DEBUG_RATE_PER_SECOND"] = float(
+    os.getenv("LOG_DEBUG_RATE_PER_SECOND", "20")
+)
+# Checked here so a typo fails startup instead of every call
+app.config["ACS_AUDIO_FORMAT"] = validate_acs_audio_format(
+    os.getenv("ACS_AUDIO_FORMAT", "pcm24KMono")
+)
+app.config["EVENTGRID_DEDUPE_TTL_SECONDS"] = float(
+    os.getenv("EVENTGRID_DEDUPE_TTL_SECONDS", "600")
+)
+app.config["ACS_FETCH_CALL_PROPERTIES"] = (
+    os.getenv("ACS_FETCH_CALL_PROPERTIES", "false").lower() == "true"
+)
+app.config["CALLBACK_QUEUE_SIZE"] = int(os.getenv("CALLBACK_QUEUE_SIZE", "1000"))
+app.config["CALLBACK_WORKERS"] = int(os.getenv("CALLBACK_WORKERS", "4"))
+app.config["MAX_CONCURRENT_SESSIONS"] = int(os.getenv("MAX_CONCURRENT_SESSIONS", "0"))
+app.config["MAX_LOOP_LAG_MS"] = float(os.getenv("MAX_LOOP_LAG_MS", "0"))
+app.config["ADMISSION_PENDING_TTL_SECONDS"] = float(
+    os.getenv("ADMISSION_PENDING_TTL_SECONDS", "30")
+)
+app.config["ADMISSION_REDIRECT_TARGET"] = os.getenv("ADMISSION_REDIRECT_TARGET", "")
+app.config["LOOP_LAG_SAMPLE_INTERVAL_MS"] = int(
+    os.getenv("LOOP_LAG_SAMPLE_INTERVAL_MS", "250")
+)
+app.config["LOOP_LAG_WARN_MS"] = float(os.getenv("LOOP_LAG_WARN_MS", "100"))
+app.config["SLOW_CALLBACK_DETECTOR_ENABLED"] = (
+    os.getenv("SLOW_CALLBACK_DETECTOR_ENABLED", "false").lower() == "true"
+)
+app.config["SLOW_CALLBACK_THRESHOLD_MS"] = float(
+    os.getenv("SLOW_CALLBACK_THRESHOLD_MS", "50")
+)
+app.config["ADMIN_API_KEY"] = os.getenv("ADMIN_API_KEY", "")
+app.config["MAX_PROFILE_SECONDS"] = float(os.getenv("MAX_PROFILE_SECONDS", "60"))
+app.config["AUDIO_QUALITY_SAMPLE_EVERY"] = int(
+    os.getenv("AUDIO_QUALITY_SAMPLE_EVERY", "5")
+)
+app.config["AUDIO_QUALITY_SILENCE_DBFS"] = float(
+    os.getenv("AUDIO_QUALITY_SILENCE_DBFS", "-50")
+)
+app.config["WEB_FRAME_MS"] = int(os.getenv("WEB_FRAME_MS", "20"))
+app.config["WEB_VAD_ENABLED"] = os.getenv("WEB_VAD_ENABLED", "true").lower() == "true"
+app.config["WEB_VAD_THRESHOLD_DBFS"] = float(os.getenv("WEB_VAD_THRESHOLD_DBFS", "-50"))
+app.config["WEB_VAD_HANGOVER_MS"] = int(os.getenv("WEB_VAD_HANGOVER_MS", "600"))
+app.config["WEB_VAD_PREFIX_PADDING_MS"] = int(
+    os.getenv("WEB_VAD_PREFIX_PADDING_MS", "300")
+)
+
+app.config["TRANSPORT_PROFILE"] = os.getenv("TRANSPORT_PROFILE", "low_latency")
+app.config["TRANSPORT_OVERRIDES"] = os.getenv("TRANSPORT_OVERRIDES", "")
+app.config["QUART_DEBUG"] = os.getenv("QUART_DEBUG", "true").lower() == "true"
+
+log_listener = configure_logging(app.config)
+
+transport = transport_profile(app.config)
+app.config["VOICELIVE_CONNECT_OPTIONS"] = transport.voicelive
+
+session_registry = SessionRegistry()
+loop_monitor = LoopLagMonitor(
+    app.config["LOOP_LAG_SAMPLE_INTERVAL_MS"], warn_ms=app.config["LOOP_LAG_WARN_MS"]
+)
+slow_callback_detector = (
+    SlowCallbackDetector(app.config["SLOW_CALLBACK_THRESHOLD_MS"])
+    if app.config["SLOW_CALLBACK_DETECTOR_ENABLED"]
+    else None
+)
+admission = AdmissionController(app.config, session_registry, loop_monitor)
+session_profiles = SessionProfiles.from_config(app.config)
+acs_handler = AcsEventHandler(app.config, admission, session_profiles)
+profile_lock = asyncio.Lock()
+recorder = CallRecorder.from_config(app.config)
+greeting_cache = (
+    GreetingCache(app.config["GREETING_CACHE_DIR"])
+    if app.config["GREETING_CACHE_DIR"]
+    else None
+)
+# Session profile name -> cached greeting for its prompt and voice
+profile_greetings = {}
+
+
+async def prepare_greetings():
+    """Loads the cached greeting for each profile's prompt and voice, rendering it if needed."""
+    for profile in session_profiles.profiles.values():
+        greeting = await greeting_cache.ensure(
+            await asyncio.to_thread(profile.session_update),
+            lambda: open_voicelive_connection(
+                app.config["AZURE_VOICE_LIVE_ENDPOINT"],
+                app.config["VOICE_LIVE_MODEL"],
+                app.config["AZURE_VOICE_LIVE_API_KEY"],
+                app.config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"],
+                transport.voicelive,
+            ),
+        )
+        if greeting:
+            profile_greetings[profile.name] = greeting
+
+
+async def warm_prompts():
+    """Reads every profile's prompt so the first calls find it cached."""
+    for profile in session_profiles.profiles.values():
+        await asyncio.to_thread(profile.session_update)
+
+
+async def resolve_voicelive_host():
+    """Resolves the Voice Live host so the first connection skips the DNS lookup."""
+    host = urlparse(app.config["AZURE_VOICE_LIVE_ENDPOINT"]).hostname
+    await asyncio.get_running_loop().getaddrinfo(host, 443)
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s"
+
+async def finish_sdk_imports():
+    """Waits for the imports started at module import, repeating them in a thread if they failed."""
+    if sdk_imports.done() and sdk_imports.exception() is not None:
+        await asyncio.to_thread(import_modules, CALL_PATH_SDK_MODULES)
+    else:
+        await asyncio.wrap_future(sdk_imports)
+
+
+# Runs once the server is listening; /readyz reports ready when the required stages are done.
+# Required stages run concurrently; those using the deferred SDKs wait for sdk_imports.
+warmup = StartupWarmup()
+warmup.add("sdk_imports", finish_sdk_imports)
+warmup.add("acs_client", lambda: acs_handler.acs_client, after=("sdk_imports",))
+if app.config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"]:
+    warmup.add(
+        "voicelive_credential",
+        lambda: voicelive_headers(
+            None, app.config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"]
+        ),
+        after=("sdk_imports",),
+    )
+warmup.add("prompts", warm_prompts)
+if app.config["CALLER_CONTEXT_URL"]:
+    warmup.add(
+        "caller_context_client", acs_handler.call_setups.prepare, after=("sdk_imports",)
+    )
+if app.config["AZURE_VOICE_LIVE_ENDPOINT"]:
+    warmup.add("voicelive_dns", resolve_voicelive_host, required=False)
+warmup.add(
+    "storage_sdk",
+    lambda: asyncio.to_thread(import_modules, POST_CALL_SDK_MODULES),
+    required=False,
 )
+if greeting_cache:
+    # Rendering can take a few seconds; calls use the live greeting until it is ready
+    warmup.add("greetings", prepare_greetings, required=False)
+
+
+@app.before_serving
+async def start_monitoring():
+    """Starts background monitors and the warm-up on the serving event loop."""
+    loop_monitor.start()
+    await acs_handler.call_state.start()
+    acs_handler.start_callback_workers()
+    if slow_callback_detector:
+        slow_callback_detector.install()
+    warmup.start()
 
-acs_handler = AcsEventHandler(app.config)
+
+@app.after_serving
+async def stop_monitoring():
+    """Stops background monitors."""
+    await warmup.stop()
+    await loop_monitor.stop()
+    await acs_handler.stop_callback_workers()
+    await acs_handler.call_setups.close()
+    await acs_handler.call_state.close()
+    await close_credentials()
+    if recorder:
+        await asyncio.to_thread(recorder.close)
+    if slow_callback_detector:
+        slow_callback_detector.uninstall()
 
 
 @app.route("/acs/incomingcall", methods=["POST"])
@@ -48,8 +283,41 @@ async def acs_ws():
     """WebSocket endpoint for ACS to send audio to Voice Live."""
     logger = logging.getLogger("acs_ws")
     logger.info("Incoming ACS WebSocket connection")
-    handler = ACSMediaHandler(app.config)
+    context_id = websocket.args.get("context")
+    setup = acs_handler.call_setups.claim(context_id)
+    if setup:
+        profile = setup.profile
+    else:
+        # The call may have been answered by another replica; keep the profile it chose
+        call_state = (
+            await acs_handler.call_state.get(context_id) if context_id else None
+        ) or {}
+        profile = session_profiles.profiles.get(
+            call_state.get("profile")
+        ) or session_profiles.assign(call_state.get("caller_id"))
+    handler = ACSMediaHandler(
+        app.config,
+        greeting=profile_greetings.get(profile.name),
+        setup=setup,
+        profile=profile,
+        recorder=recorder,
+    )
+    bind_call_context(
+        session_id=handler.session_id,
+        call_connection_id=websocket.headers.get("x-ms-call-connection-id", ""),
+    )
+    if context_id:
+        await acs_handler.call_state.set(
+            context_id,
+            {
+                "media_replica": REPLICA_NAME,
+                "session_id": handler.session_id,
+                "profile": profile.name,
+            },
+        )
     await handler.init_incoming_websocket(websocket, is_raw_audio=False)
+    session_registry.register(handler)
+    admission.session_started()
     asyncio.create_task(handler.connect())
     try:
         while True:
@@ -58,6 +326,7 @@ async def acs_ws():
     except Exception:
         logger.exception("ACS WebSocket connection closed")
     finally:
+        session_registry.unregister(handler)
         await handler.close()
 
 
@@ -66,8 +335,17 @@ async def web_ws():
     """WebSocket endpoint for web clients to send audio to Voice Live."""
     logger = logging.getLogger("web_ws")
     logger.info("Incoming Web WebSocket connection")
-    handler = ACSMediaHandler(app.config)
-    await handler.init_incoming_websocket(websocket, is_raw_audio=True)
+    handler = ACSMediaHandler(
+        app.config, profile=session_profiles.assign(), recorder=recorder
+    )
+    bind_call_context(session_id=handler.session_id)
+    await handler.init_incoming_websocket(
+        websocket,
+        is_raw_audio=True,
+        input_vad=EnergyVad.from_config(app.config, "WEB"),
+        codec=websocket.args.get("codec", "pcm16").lower(),
+    )
+    session_registry.register(handler)
     asyncio.create_task(handler.connect())
     try:
         while True:
@@ -76,9 +354,174 @@ async def web_ws():
     except Exception:
         logger.exception("Web WebSocket connection closed")
     finally:
+        session_registry.unregister(handler)
         await handler.close()
 
 
+@app.route("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests."""
+    return {"status": "ok"}
+
+
+@app.route("/readyz")
+async def readyz():
+    """Readiness: 200 once the startup warm-up has finished its required stages, 503 before."""
+    return warmup.stats(), 200 if warmup.ready else 503
+
+
+@app.route("/metrics")
+async def metrics():
+    """Returns instance load, admission and event loop health as JSON."""
+    result = {
+        "admission": admission.stats(),
+        "event_loop": loop_monitor.stats(),
+        "acs_callbacks": acs_handler.callback_stats(),
+        "voicelive_dispatch": dispatch_stats(),
+        "call_setup": acs_handler.call_setups.stats(),
+        "call_state": acs_handler.call_state.stats(),
+        "session_profiles": session_profiles.stats(),
+    }
+    if recorder:
+        result["recording"] = recorder.stats()
+    if slow_callback_detector:
+        result["slow_callbacks"] = slow_callback_detector.stats()
+    return result
+
+
+def admin_denied():
+    """Returns an error response unless the request carries the admin API key."""
+    admin_key = app.config["ADMIN_API_KEY"]
+    if not admin_key:
+        return Response(status=404)
+    if not hmac.compare_digest(request.headers.get("x-admin-key", ""), admin_key):
+        return Response(status=403)
+    return None
+
+
+def query_number(name: str, default: float):
+    """Returns a numeric query parameter, or None if it is not a finite number."""
+    try:
+        value = float(request.args.get(name, default))
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+@app.route("/admin/sessions")
+async def admin_sessions():
+    """Lists active media sessions that can be profiled."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    return {
+        "sessions": [
+            {
+                "session_id": handler.session_id,
+                "is_raw_audio": handler.is_raw_audio,
+                "session_start": handler.session_start_time.isoformat(),
+            }
+            for handler in session_registry
+        ]
+    }
+
+
+@app.route("/admin/sessions/stream")
+async def admin_sessions_stream():
+    """
+    Streams live per-call metrics for active sessions as Server-Sent Events.
+
+    Query parameters: ``interval_ms`` between updates (default 1000, minimum
+    100) and an optional ``session_id`` to follow a single call.
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+
+    interval_ms = query_number("interval_ms", 1000)
+    if interval_ms is None:
+        return {"error": "interval_ms must be a number"}, 400
+    interval = max(interval_ms, 100.0) / 1000
+    session_id = request.args.get("session_id")
+
+    async def events():
+        while True:
+            if session_id:
+                handler = session_registry.get(session_id)
+                if handler is None:
+                    yield "event: ended\ndata: {}\n\n"
+                    return
+                handlers = [handler]
+            else:
+                handlers = list(session_registry)
+            payload = {
+                "timestamp": time.time(),
+                "event_loop": loop_monitor.stats(),
+                "sessions": [handler.live_snapshot() for handler in handlers],
+            }
+            yield f"data: {json.dumps(payload)}\n\n"
+            await asyncio.sleep(interval)
+
+    response = Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.timeout = None
+    return response
+
+
+@app.route("/admin/profile", methods=["POST"])
+async def admin_profile():
+    """
+    Samples the event loop thread and returns folded stacks for a flame graph.
+
+    Query parameters: ``seconds`` (default 10), ``interval_ms`` (default 5) and
+    an optional ``session_id`` to keep only samples from that call's media bridge.
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+
+    seconds = query_number("seconds", 10)
+    interval_ms = query_number("interval_ms", 5)
+    if seconds is None or seconds <= 0:
+        return {"error": "seconds must be a positive number"}, 400
+    if interval_ms is None:
+        return {"error": "interval_ms must be a number"}, 400
+    seconds = min(seconds, app.config["MAX_PROFILE_SECONDS"])
+    interval_ms = max(interval_ms, 1.0)
+    session_id = request.args.get("session_id")
+    handler = None
+    if session_id:
+        handler = session_registry.get(session_id)
+        if handler is None:
+            return {"error": f"No active session {session_id}"}, 404
+
+    if profile_lock.locked():
+        return {"error": "A profile is already being captured"}, 409
+
+    logger = logging.getLogger("admin_profile")
+    async with profile_lock:
+        logger.info("Profiling %s for %.1fs", session_id or "process", seconds)
+        sampler = StackSampler(threading.get_ident(), interval_ms, handler)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+
+    return Response(
+        sampler.folded(),
+        mimetype="text/plain",
+        headers={
+            "X-Profile-Mode": sampler.mode,
+            "X-Profile-Samples": str(sampler.total_samples),
+            "X-Profile-Kept-Samples": str(sampler.kept_samples),
+        },
+    )
+
+
 @app.route("/")
 async def index():
     """Serves the static index page."""
@@ -86,4 +529,6 @@ async def index():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=8000)
+    # Served through Hypercorn directly so the transport profile applies to the ACS and web WebSockets
+    app.debug = app.config["QUART_DEBUG"]
+    asyncio.run(serve(app, hypercorn_config(transport, "0.0.0.0:8000")))
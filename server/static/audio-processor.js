@@ -1,27 +1,119 @@
+// Seconds of audio the playback ring holds; Voice Live streams faster than real time
+const DEFAULT_CAPACITY_SECONDS = 60;
+// Render quanta between level reports (128 frames each, ~107 ms at 24 kHz)
+const REPORT_INTERVAL_QUANTA = 20;
+// Audio arriving this soon after the ring ran dry means playback stalled mid-response
+const UNDERRUN_GAP_SECONDS = 0.5;
+
+// G.711 mu-law code -> sample in [-1, 1]
+const MULAW_DECODE = new Float32Array(256);
+for (let i = 0; i < 256; i++) {
+  const code = ~i & 0xFF;
+  const exponent = (code >> 4) & 0x07;
+  const magnitude = ((((code & 0x0F) << 3) + 0x84) << exponent) - 0x84;
+  MULAW_DECODE[i] = (code & 0x80 ? -magnitude : magnitude) / 0x8000;
+}
+
 class RingBufferProcessor extends AudioWorkletProcessor {
-  constructor() {
+  constructor(options) {
     super();
-    this.buffer = new Float32Array(0);
+    const seconds = options?.processorOptions?.capacitySeconds || DEFAULT_CAPACITY_SECONDS;
+    this.ring = new Float32Array(Math.ceil(seconds * sampleRate));
+    this.readIndex = 0;
+    this.writeIndex = 0;
+    this.available = 0;
+    this.underruns = 0;
+    this.overruns = 0;
+    this.quanta = 0;
+    this.playing = false;
+    // Frame at which the ring last ran dry mid-quantum, or -1
+    this.dryFrame = -1;
+
     this.port.onmessage = e => {
-      if (e.data.pcm) {
-        const next = new Float32Array(this.buffer.length + e.data.pcm.length);
-        next.set(this.buffer);
-        next.set(e.data.pcm, this.buffer.length);
-        this.buffer = next;
+      if (e.data.audio) {
+        this.write(e.data.audio, e.data.codec);
       } else if (e.data.clear) {
-        this.buffer = new Float32Array(0);
+        this.readIndex = this.writeIndex;
+        this.available = 0;
+        this.dryFrame = -1;
+        this.report();
       }
     };
   }
 
+  // Decodes PCM16 or mu-law audio straight into the ring
+  write(buffer, codec) {
+    if (this.dryFrame >= 0 && currentFrame - this.dryFrame < UNDERRUN_GAP_SECONDS * sampleRate) {
+      this.underruns++;
+    }
+    this.dryFrame = -1;
+    const mulaw = codec === 'mulaw';
+    const input = mulaw ? new Uint8Array(buffer) : new Int16Array(buffer);
+    const capacity = this.ring.length;
+    // Full: drop the oldest audio rather than the newest
+    const start = Math.max(0, input.length - capacity);
+    const count = input.length - start;
+    const free = capacity - this.available;
+    if (count > free) {
+      const dropped = count - free;
+      this.readIndex = (this.readIndex + dropped) % capacity;
+      this.available -= dropped;
+    }
+    if (start > 0 || count > free) {
+      this.overruns++;
+    }
+
+    let index = this.writeIndex;
+    for (let i = start; i < input.length; i++) {
+      if (mulaw) {
+        this.ring[index] = MULAW_DECODE[input[i]];
+      } else {
+        const s = input[i];
+        this.ring[index] = s / (s < 0 ? 0x8000 : 0x7FFF);
+      }
+      if (++index === capacity) index = 0;
+    }
+    this.writeIndex = index;
+    this.available += count;
+  }
+
+  report() {
+    this.port.postMessage({
+      bufferedMs: (this.available / sampleRate) * 1000,
+      underruns: this.underruns,
+      overruns: this.overruns,
+    });
+  }
+
   process(_, outputs) {
     const out = outputs[0][0];
-    if (this.buffer.length >= out.length) {
-      out.set(this.buffer.subarray(0, out.length));
-      this.buffer = this.buffer.subarray(out.length);
-    } else {
-      out.fill(0);
-      this.buffer = new Float32Array(0);
+    const count = Math.min(out.length, this.available);
+    const capacity = this.ring.length;
+
+    // Copy in at most two runs, around the end of the ring
+    const first = Math.min(count, capacity - this.readIndex);
+    out.set(this.ring.subarray(this.readIndex, this.readIndex + first));
+    if (count > first) {
+      out.set(this.ring.subarray(0, count - first), first);
+    }
+    this.readIndex = (this.readIndex + count) % capacity;
+    this.available -= count;
+
+    // Underrun: play what there is and pad with silence instead of discarding it
+    if (count < out.length) {
+      out.fill(0, count);
+    }
+    // Counted as an underrun only if more audio follows soon, not at the end of a response
+    if (count > 0 && this.available === 0) {
+      this.dryFrame = currentFrame;
+    }
+    const wasPlaying = this.playing;
+    this.playing = this.available > 0;
+
+    // Report while playing and whenever playback starts or stops
+    if ((this.playing && ++this.quanta >= REPORT_INTERVAL_QUANTA) || wasPlaying !== this.playing) {
+      this.quanta = 0;
+      this.report();
     }
     return true;
   }
@@ -1 +1,67 @@
-// (file intentionally reverted to empty as part of rollback)
\ No newline at end of file
+// Frame length used when the page does not pass one (20 ms at 24 kHz)
+const DEFAULT_FRAME_SAMPLES = 480;
+
+// Converts one float sample in [-1, 1] to PCM16, as the server expects
+function toInt16(sample) {
+  const s = Math.max(-1, Math.min(1, sample));
+  return s < 0 ? s * 0x8000 : s * 0x7FFF;
+}
+
+// G.711 mu-law encoding of one PCM16 sample
+function toMulaw(sample) {
+  const sign = sample < 0 ? 0x80 : 0;
+  const magnitude = Math.min(Math.abs(sample) | 0, 32635) + 0x84;
+  let exponent = 7;
+  for (let mask = 0x4000; (magnitude & mask) === 0 && exponent > 0; mask >>= 1) exponent--;
+  const mantissa = (magnitude >> (exponent + 3)) & 0x0F;
+  return ~(sign | (exponent << 4) | mantissa) & 0xFF;
+}
+
+class RecorderProcessor extends AudioWorkletProcessor {
+  constructor(options) {
+    super();
+    const opts = options?.processorOptions || {};
+    this.frameSamples = opts.frameSamples || DEFAULT_FRAME_SAMPLES;
+    this.mulaw = opts.codec === 'mulaw';
+    this.frame = this.newFrame();
+    this.filled = 0;
+    this.stopped = false;
+
+    // Sent when the microphone stops; a partial frame is discarded
+    this.port.onmessage = e => {
+      if (e.data?.stop) {
+        this.stopped = true;
+        this.port.close();
+      }
+    };
+  }
+
+  newFrame() {
+    return this.mulaw ? new Uint8Array(this.frameSamples) : new Int16Array(this.frameSamples);
+  }
+
+  // Encodes each render quantum into fixed-size frames and posts every full one
+  process(inputs) {
+    if (this.stopped) {
+      // Lets the audio thread drop the processor
+      return false;
+    }
+    const input = inputs[0]?.[0];
+    if (!input) {
+      return true;
+    }
+    for (let i = 0; i < input.length; i++) {
+      const sample = toInt16(input[i]);
+      this.frame[this.filled++] = this.mulaw ? toMulaw(sample) : sample;
+      if (this.filled === this.frameSamples) {
+        // Transferred to the page, which sends it on the socket as is
+        this.port.postMessage(this.frame.buffer, [this.frame.buffer]);
+        this.frame = this.newFrame();
+        this.filled = 0;
+      }
+    }
+    return true;
+  }
+}
+
+registerProcessor('recorder-processor', RecorderProcessor);